@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Concurrent MCP load generator for the stateless HTTP app.
+
+Simulated MCP clients issue a weighted mix of tool calls over Streamable HTTP
+against the local RePORTER stand-in (bench/stub_server.py). With --workers 0 the
+ASGI app runs in this process; otherwise it is served by uvicorn with that many
+worker processes. Reports throughput and p50/p95/p99 latency for every
+combination of worker count and concurrency.
+
+Usage:
+    PYTHONPATH=src python -m bench.load_test --concurrency 1,8,32 --workers 0,2 --duration 30
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from bench.run_bench import BENCH_DIR, DEFAULT_PORT, configure_environment, stub_server
+from bench.stub_server import SyntheticProjects, INSTITUTES, FISCAL_YEARS
+
+DEFAULT_MIX = "search_projects=4,get_search_summary=2,get_project_information=2,get_portfolio_crosstab=1"
+
+CROSSTAB_FIELDS = ["agency_ic_admin", "fiscal_year", "funding_mechanism", "org_state", "award_type"]
+
+
+def parse_mix(mix: str) -> dict:
+    """Parse 'tool=weight,...' into {tool: weight}."""
+    weights = {}
+    for item in mix.split(","):
+        tool, _, weight = item.partition("=")
+        weights[tool.strip()] = float(weight or 1)
+    return weights
+
+
+def tool_arguments(tool: str, rng: random.Random, projects: SyntheticProjects) -> dict:
+    """Random but plausible arguments for one call, so calls spread over many queries."""
+
+    years = sorted(rng.sample(FISCAL_YEARS, rng.randint(1, len(FISCAL_YEARS))))
+    search_params = {"years": years}
+    if rng.random() < 0.5:
+        search_params["agencies"] = [rng.choice(INSTITUTES)[0]]
+
+    if tool == "get_project_information":
+        ids = [projects.project_num(rng.randrange(projects.n)) for _ in range(rng.randint(1, 10))]
+        return {"project_ids": ids, "include_fields": ["ProjectNum", "AwardAmount", "Organization", "PrincipalInvestigators"]}
+    if tool == "get_portfolio_crosstab":
+        row, col = rng.sample(CROSSTAB_FIELDS, 2)
+        return {"search_params": search_params, "row_field": row, "col_field": col}
+    if tool == "get_search_summary":
+        return {"search_params": search_params, "percentiles": [50, 90]}
+
+    return {"search_params": search_params}
+
+
+def percentile(sorted_values: list[float], q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "calls": len(values),
+        "p50_s": round(percentile(values, 50), 4) if values else None,
+        "p95_s": round(percentile(values, 95), 4) if values else None,
+        "p99_s": round(percentile(values, 99), 4) if values else None,
+    }
+
+
+@contextlib.asynccontextmanager
+async def mcp_endpoint(workers: int, port: int):
+    """
+    Serve the MCP app for the duration of the block.
+
+    Yields:
+        callable: Factory taking a client id and returning a fastmcp Client connected
+            to the app, which identifies itself with that id in X-Reporter-Client.
+    """
+
+    from fastmcp import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    if workers == 0:
+        from reporter.app import app
+
+        def http_client(headers=None, timeout=None, auth=None):
+            return httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                headers=headers, timeout=timeout, auth=auth,
+            )
+
+        async with app.router.lifespan_context(app):
+            yield lambda client_id: Client(StreamableHttpTransport(
+                "http://loadtest/mcp", headers={"X-Reporter-Client": client_id}, httpx_client_factory=http_client,
+            ))
+        return
+
+    cmd = [
+        sys.executable, "-m", "uvicorn", "reporter.app:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    env = {**os.environ, "PYTHONPATH": str(BENCH_DIR.parent / "src")}
+    process = subprocess.Popen(cmd, cwd=BENCH_DIR.parent, env=env, stdout=subprocess.DEVNULL)
+
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("MCP server did not start")
+                await asyncio.sleep(0.2)
+        yield lambda client_id: Client(StreamableHttpTransport(
+            f"http://127.0.0.1:{port}/mcp", headers={"X-Reporter-Client": client_id},
+        ))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def run_level(new_client, concurrency: int, duration: float, weights: dict, projects, seed: int):
+    """Drive the app with `concurrency` clients for `duration` seconds."""
+
+    tools = list(weights)
+    calls = []
+    deadline = time.monotonic() + duration
+
+    async def simulated_client(n: int):
+        rng = random.Random(seed * 1000 + n)
+        # each simulated client is its own admission session (see reporter.admission)
+        async with new_client(f"loadtest-{seed}-{n}") as client:
+            while time.monotonic() < deadline:
+                tool = rng.choices(tools, weights=[weights[t] for t in tools])[0]
+                arguments = tool_arguments(tool, rng, projects)
+                start = time.perf_counter()
+                try:
+                    result = await client.call_tool(tool, arguments, raise_on_error=False)
+                    ok = not result.is_error
+                except Exception:
+                    ok = False
+                calls.append((tool, time.perf_counter() - start, ok))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(simulated_client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ok_latencies = [seconds for _, seconds, ok in calls if ok]
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(ok_latencies) / elapsed, 2),
+        "errors": sum(not ok for _, _, ok in calls),
+        **latency_summary(ok_latencies),
+        "by_tool": {
+            tool: latency_summary([seconds for t, seconds, ok in calls if ok and t == tool])
+            for tool in tools
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-test the stateless MCP HTTP app against a local RePORTER stand-in"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        default="1,8,32",
+        help="Comma-separated numbers of simultaneous MCP clients (default: 1,8,32)"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        default="0",
+        help="Comma-separated uvicorn worker counts; 0 runs the ASGI app in-process (default: 0)"
+    )
+    parser.add_argument(
+        "-d", "--duration",
+        type=float,
+        default=20,
+        help="Seconds to run each level (default: 20)"
+    )
+    parser.add_argument(
+        "-m", "--mix",
+        default=DEFAULT_MIX,
+        help=f"Weighted tool mix as tool=weight,... (default: {DEFAULT_MIX})"
+    )
+    parser.add_argument(
+        "--projects",
+        type=int,
+        default=5000,
+        help="Synthetic projects served by the stub (default: 5000)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.1,
+        help="Stub latency per request in seconds (default: 0.1)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the server's response cache so every call reaches the stub"
+    )
+    parser.add_argument(
+        "-p", "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port for the stub server; the MCP server uses the next one (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the call mix (default: 0)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Output directory for results (default: bench/results)"
+    )
+
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    concurrency_levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+
+    configure_environment(args.port)
+    if args.no_cache:
+        os.environ["REPORTER_RESPONSE_CACHE_SIZE"] = "0"
+        os.environ["REPORTER_CUBE_CACHE_SIZE"] = "0"
+
+    projects = SyntheticProjects(args.projects)
+    results = []
+
+    print(f"{'workers':>7} {'clients':>7} {'calls/s':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'errors':>7}")
+    print("-" * 60)
+
+    async def run_workers(workers: int):
+        async with mcp_endpoint(workers, args.port + 1) as new_client:
+            for concurrency in concurrency_levels:
+                # keep the server's progress output out of the report
+                with contextlib.redirect_stdout(io.StringIO()):
+                    level = await run_level(new_client, concurrency, args.duration, weights, projects, args.seed)
+                level["workers"] = workers
+                results.append(level)
+                print(
+                    f"{workers:>7} {concurrency:>7} {level['throughput_per_s']:>9.2f} {level['p50_s'] or 0:>8.3f} "
+                    f"{level['p95_s'] or 0:>8.3f} {level['p99_s'] or 0:>8.3f} {level['errors']:>7}"
+                )
+
+    with stub_server(args.projects, args.port, args.latency, 0.0, 0):
+        for workers in worker_counts:
+            asyncio.run(run_workers(workers))
+
+    output_dir = Path(args.output) if args.output else BENCH_DIR / "results"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = output_dir / f"load_{timestamp}.json"
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "run_at": timestamp,
+            "config": {
+                "mix": weights,
+                "duration": args.duration,
+                "projects": args.projects,
+                "latency": args.latency,
+                "no_cache": args.no_cache,
+            },
+            "results": results,
+        }, f, indent=2)
+
+    print(f"\nResults saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
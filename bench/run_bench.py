@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""CLI entry point for offline performance benchmarks of the MCP tools.
+
+Starts the local RePORTER stand-in (bench/stub_server.py) for each portfolio size,
+calls every tool in-process and reports latency, upstream calls, peak memory and
+throughput. Needs no network access or API keys.
+
+Usage:
+    PYTHONPATH=src python -m bench.run_bench --sizes 100,10000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_PORT = 8765
+
+# Every matching project falls in these fiscal years (see stub_server.FISCAL_YEARS).
+BASE_SEARCH = {"years": [2022, 2023, 2024]}
+
+# Arguments each tool is benchmarked with; project_ids are filled in per portfolio size.
+SCENARIOS = {
+    "search_projects": {"search_params": BASE_SEARCH},
+    "get_search_summary": {"search_params": BASE_SEARCH, "percentiles": [50, 90]},
+    "find_project_ids": {"search_params": BASE_SEARCH},
+    "get_project_information": {"project_ids": None, "include_fields": ["ProjectNum", "AwardAmount", "Organization"]},
+    "get_portfolio_crosstab": {"search_params": BASE_SEARCH, "row_field": "agency_ic_admin", "col_field": "fiscal_year"},
+    "get_portfolio_cube": {
+        "search_params": BASE_SEARCH,
+        "dimensions": ["agency_ic_admin", "funding_mechanism"],
+        "metrics": ["count", "award_sum", "award_median"],
+    },
+    "get_portfolio_distribution": {"search_params": BASE_SEARCH, "field": "spending_categories_desc"},
+    "get_project_counts": {"search_params": BASE_SEARCH, "group_by": ["fiscal_year"]},
+}
+
+
+def configure_environment(port: int):
+    """Point the server at the stub and turn off background work; must run before importing reporter."""
+    os.environ["REPORTER_API_URL"] = f"http://127.0.0.1:{port}/v2/projects/search"
+    os.environ.setdefault("REPORTER_WARM_TOP_N", "0")
+    os.environ.setdefault("REPORTER_BASELINE_ENABLED", "0")
+    os.environ.setdefault("REPORTER_WORKLOAD_FILE", os.path.join(tempfile.gettempdir(), "reporter-bench-workload.json"))
+
+
+@contextlib.contextmanager
+def stub_server(size: int, port: int, latency: float, latency_per_record: float, result_window: int):
+    """Run the stub server in a subprocess for the duration of the block."""
+
+    cmd = [
+        sys.executable, "-m", "bench.stub_server",
+        "--projects", str(size), "--port", str(port),
+        "--latency", str(latency), "--latency-per-record", str(latency_per_record),
+        "--result-window", str(result_window),
+    ]
+    process = subprocess.Popen(cmd, cwd=BENCH_DIR.parent, stdout=subprocess.DEVNULL)
+
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Stub server exited with code {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Stub server did not start within 120 seconds")
+                time.sleep(0.2)
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def call_tool(name: str, arguments: dict, verbose: bool = False, trace_memory: bool = False):
+    """
+    Call one tool in-process with cold caches.
+
+    Returns:
+        dict: seconds, upstream usage, peak traced memory (if trace_memory) and error (if any)
+    """
+
+    from fastmcp import Client
+    from reporter.app import mcp
+    from reporter.cube import _portfolio_cache
+    from reporter.utils import upstream_usage, clear_response_cache
+
+    clear_response_cache()
+    _portfolio_cache.clear()
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    error = None
+
+    # the usage block must be open before the client starts the in-memory server session,
+    # whose tasks inherit this context
+    with output, upstream_usage() as usage:
+        async with Client(mcp) as client:
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(name, arguments, raise_on_error=False)
+                if result.is_error:
+                    error = result.content[0].text if result.content else "tool error"
+            except Exception as e:
+                error = str(e)
+            seconds = time.perf_counter() - start
+            peak = None
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_bytes": peak, "error": error, **usage}
+
+
+async def run_size(size: int, tools: list[str], repeat: int, verbose: bool):
+    """Benchmark every tool against a stub serving `size` matching projects."""
+
+    from bench.stub_server import SyntheticProjects
+
+    # same seed and size as the stub, so these project numbers exist there
+    projects = SyntheticProjects(size)
+    results = []
+
+    for tool in tools:
+        arguments = dict(SCENARIOS[tool])
+        if "project_ids" in arguments:
+            arguments["project_ids"] = [projects.project_num(i) for i in range(min(size, 50))]
+
+        runs = [await call_tool(tool, arguments, verbose) for _ in range(repeat)]
+        memory_run = await call_tool(tool, arguments, verbose, trace_memory=True)
+
+        seconds = [r["seconds"] for r in runs]
+        median = statistics.median(seconds)
+        results.append({
+            "tool": tool,
+            "projects": size,
+            "latency_median_s": round(median, 4),
+            "latency_min_s": round(min(seconds), 4),
+            "latency_max_s": round(max(seconds), 4),
+            "upstream_requests": runs[-1]["requests"],
+            "upstream_bytes": runs[-1]["bytes"],
+            "records": runs[-1]["records"],
+            "records_per_s": round(runs[-1]["records"] / median) if median else None,
+            "peak_memory_mb": round(memory_run["peak_bytes"] / (1024 * 1024), 2),
+            "error": runs[-1]["error"],
+        })
+        print(format_row(results[-1]))
+
+    return results
+
+
+def format_row(row: dict) -> str:
+    status = f"ERROR: {row['error'][:40]}" if row["error"] else ""
+    return (
+        f"{row['tool']:<28} {row['projects']:>8} {row['latency_median_s']:>10.3f} "
+        f"{row['upstream_requests']:>8} {row['upstream_bytes'] / 1e6:>9.1f} "
+        f"{row['peak_memory_mb']:>9.1f} {row['records_per_s'] or 0:>10} {status}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the MCP tools offline against a local RePORTER stand-in"
+    )
+    parser.add_argument(
+        "-s", "--sizes",
+        default="100,10000,100000",
+        help="Comma-separated numbers of matching projects (default: 100,10000,100000)"
+    )
+    parser.add_argument(
+        "-t", "--tools",
+        default=",".join(SCENARIOS),
+        help="Comma-separated tools to benchmark (default: all)"
+    )
+    parser.add_argument(
+        "-r", "--repeat",
+        type=int,
+        default=3,
+        help="Timed calls per tool and size; caches are cleared before each (default: 3)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Stub latency per request in seconds (default: 0.05)"
+    )
+    parser.add_argument(
+        "--latency-per-record",
+        type=float,
+        default=0.0,
+        help="Extra stub latency per returned record in seconds (default: 0)"
+    )
+    parser.add_argument(
+        "--result-window",
+        type=int,
+        default=0,
+        help="Make the stub reject offsets past this, like the live API's 15000 (default: no limit)"
+    )
+    parser.add_argument(
+        "-p", "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port for the stub server (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Output directory for results (default: bench/results)"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Show the server's progress output"
+    )
+
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    unknown = [t for t in tools if t not in SCENARIOS]
+    if unknown:
+        print(f"Error: Unknown tools {unknown}. Valid options: {list(SCENARIOS)}", file=sys.stderr)
+        sys.exit(1)
+
+    configure_environment(args.port)
+
+    print(f"{'tool':<28} {'projects':>8} {'median s':>10} {'requests':>8} {'MB recv':>9} {'peak MB':>9} {'records/s':>10}")
+    print("-" * 90)
+
+    results = []
+    for size in sizes:
+        with stub_server(size, args.port, args.latency, args.latency_per_record, args.result_window):
+            results += asyncio.run(run_size(size, tools, args.repeat, args.verbose))
+
+    output_dir = Path(args.output) if args.output else BENCH_DIR / "results"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = output_dir / f"bench_{timestamp}.json"
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "run_at": timestamp,
+            "config": {
+                "sizes": sizes,
+                "repeat": args.repeat,
+                "latency": args.latency,
+                "latency_per_record": args.latency_per_record,
+                "result_window": args.result_window,
+            },
+            "results": results,
+        }, f, indent=2)
+
+    print(f"\nResults saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Local stand-in for the NIH RePORTER /v2/projects/search endpoint, for offline benchmarks.
+
+Serves synthetic projects (generated deterministically from a seed) or records loaded
+from a JSON / NDJSON file, with configurable latency. Supports the criteria the MCP
+tools send: fiscal_years, agencies (+ is_agency_admin), funding_mechanisms,
+activity_codes, award_types, org_states, org_names, pi_names, project_nums (with *
+wildcards) and advanced_text_search. Other criteria are ignored.
+
+Usage:
+    python -m bench.stub_server --projects 10000 --port 8765 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from fnmatch import fnmatchcase
+from functools import lru_cache
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+FISCAL_YEARS = [2022, 2023, 2024]
+
+# (abbreviation, IC code, relative share of projects)
+INSTITUTES = [
+    ("NCI", "CA", 12), ("NIAID", "AI", 10), ("NHLBI", "HL", 8), ("NIGMS", "GM", 9),
+    ("NIA", "AG", 8), ("NIDDK", "DK", 6), ("NINDS", "NS", 6), ("NIMH", "MH", 5),
+    ("NICHD", "HD", 4), ("NIDA", "DA", 4), ("NIEHS", "ES", 2), ("NEI", "EY", 2),
+    ("NIAMS", "AR", 2), ("NHGRI", "HG", 1), ("NLM", "LM", 1), ("OD", "OD", 2),
+]
+
+IC_CODES = {ic: code for ic, code, _ in INSTITUTES}
+
+# mechanism code -> (label, activity codes, relative share)
+MECHANISMS = {
+    "RP": ("Non-SBIR/STTR", ["R01", "R21", "R35", "U01", "R03"], 70),
+    "SB": ("SBIR/STTR", ["R43", "R44"], 5),
+    "RC": ("Research Centers", ["P30", "P50", "U54"], 6),
+    "TR": ("Training, Individual", ["F31", "F32", "K99", "K01"], 10),
+    "TI": ("Training, Institutional", ["T32"], 5),
+    "OR": ("Other Research-Related", ["R13", "R25"], 4),
+}
+
+STATES = ["CA", "MA", "NY", "MD", "PA", "TX", "NC", "WA", "IL", "MI", "OH", "GA", "MN", "MO", "TN"]
+AWARD_TYPES = ["1", "2", "3", "5"]
+ORGANIZATION_TYPES = [("SCHOOLS OF MEDICINE", "20"), ("DOMESTIC HIGHER EDUCATION", "10"), ("RESEARCH INSTITUTES", "40")]
+
+TOPICS = [
+    ("cancer", "tumor"), ("aging", "alzheimer"), ("cardiac", "heart"), ("infection", "vaccine"),
+    ("neurons", "brain"), ("diabetes", "insulin"), ("genome", "sequencing"), ("addiction", "opioid"),
+    ("depression", "anxiety"), ("imaging", "microscopy"), ("immune", "antibody"), ("kidney", "renal"),
+]
+SPENDING_CATEGORIES = [
+    "Cancer", "Aging", "Cardiovascular", "Infectious Diseases", "Neurosciences", "Diabetes",
+    "Genetics", "Substance Abuse", "Mental Health", "Bioengineering", "Immunization", "Kidney Disease",
+]
+
+
+def snake_case(name: str) -> str:
+    """Turn an include_fields name into its response key, e.g. AgencyIcAdmin -> agency_ic_admin."""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+class SyntheticProjects:
+    """
+    Deterministic synthetic projects. Only the columns the stub filters on are held
+    in memory; full records are built on demand for the requested page.
+    """
+
+    def __init__(self, n: int, seed: int = 0):
+        rng = random.Random(seed)
+        ics = [ic for ic, _, _ in INSTITUTES]
+        mechanisms = list(MECHANISMS)
+
+        self.n = n
+        self.fiscal_year = [rng.choice(FISCAL_YEARS) for _ in range(n)]
+        self.ic = rng.choices(ics, weights=[w for _, _, w in INSTITUTES], k=n)
+        self.co_ic = [rng.choice(ics) if rng.random() < 0.15 else None for _ in range(n)]
+        self.mechanism = rng.choices(mechanisms, weights=[m[2] for m in MECHANISMS.values()], k=n)
+        self.activity_code = [rng.choice(MECHANISMS[m][1]) for m in self.mechanism]
+        self.award_type = rng.choices(AWARD_TYPES, weights=[20, 5, 3, 72], k=n)
+        self.org = [rng.randrange(400) for _ in range(n)]
+        self.topic = [rng.randrange(len(TOPICS)) for _ in range(n)]
+        self.award_amount = [int(rng.lognormvariate(12.6, 0.8)) for _ in range(n)]
+        self.pis = [(rng.randrange(max(n // 3, 1)), rng.randrange(max(n // 3, 1)) if rng.random() < 0.2 else None) for _ in range(n)]
+
+    def project_num(self, i: int) -> str:
+        return f"{self.award_type[i]}{self.activity_code[i]}{IC_CODES[self.ic[i]]}{i:06d}-{self.fiscal_year[i] - 2015:02d}"
+
+    def org_state(self, i: int) -> str:
+        return STATES[self.org[i] % len(STATES)]
+
+    def org_name(self, i: int) -> str:
+        return f"UNIVERSITY {self.org[i]:03d}"
+
+    def pi_names(self, i: int) -> list[str]:
+        return [f"INVESTIGATOR {pi}" for pi in self.pis[i] if pi is not None]
+
+    def text(self, i: int) -> str:
+        topic = TOPICS[self.topic[i]]
+        return f"{self.title(i)} {' '.join(topic)} mechanisms {self.activity_code[i]}".lower()
+
+    def title(self, i: int) -> str:
+        a, b = TOPICS[self.topic[i]]
+        return f"Study {i} of {a} and {b} in model systems"
+
+    def record(self, i: int) -> dict:
+        """Build the full API record for project i."""
+        fy = self.fiscal_year[i]
+        award = self.award_amount[i]
+        direct = int(award * 0.7)
+        ic = self.ic[i]
+        ic_code = IC_CODES[ic]
+        mechanism = self.mechanism[i]
+        topic = TOPICS[self.topic[i]]
+        org_type = ORGANIZATION_TYPES[self.org[i] % len(ORGANIZATION_TYPES)]
+        core = self.project_num(i)[1:].split("-")[0]
+
+        fundings = [{"code": ic_code, "abbreviation": ic, "name": ic, "total_cost": award, "fy": fy}]
+        if self.co_ic[i] and self.co_ic[i] != ic:
+            fundings[0]["total_cost"] = int(award * 0.8)
+            fundings.append({"code": "", "abbreviation": self.co_ic[i], "name": self.co_ic[i], "total_cost": award - int(award * 0.8), "fy": fy})
+
+        pis = [
+            {"profile_id": 1000 + pi, "first_name": "INVESTIGATOR", "last_name": str(pi),
+             "full_name": f"INVESTIGATOR {pi}", "is_contact_pi": k == 0}
+            for k, pi in enumerate(p for p in self.pis[i] if p is not None)
+        ]
+        categories = [SPENDING_CATEGORIES[self.topic[i]], SPENDING_CATEGORIES[(self.topic[i] + 6) % len(SPENDING_CATEGORIES)]]
+
+        return {
+            "appl_id": 10_000_000 + i,
+            "subproject_id": None,
+            "fiscal_year": fy,
+            "project_num": self.project_num(i),
+            "project_serial_num": f"{ic_code}{i:06d}",
+            "core_project_num": core,
+            "project_num_split": {"appl_type_code": self.award_type[i], "activity_code": self.activity_code[i],
+                                  "ic_code": ic_code, "serial_num": f"{i:06d}", "support_year": f"{fy - 2015:02d}"},
+            "organization": {"org_name": self.org_name(i), "org_city": f"CITY {self.org[i] % 97}",
+                             "org_state": self.org_state(i), "org_country": "UNITED STATES"},
+            "organization_type": {"name": org_type[0], "code": org_type[1], "is_other": False},
+            "award_type": self.award_type[i],
+            "activity_code": self.activity_code[i],
+            "award_amount": award,
+            "direct_cost_amt": direct,
+            "indirect_cost_amt": award - direct,
+            "is_active": fy == FISCAL_YEARS[-1],
+            "is_new": self.award_type[i] == "1",
+            "funding_mechanism": MECHANISMS[mechanism][0],
+            "mechanism_code_dc": mechanism,
+            "cfda_code": "93.393",
+            "cong_dist": f"{self.org_state(i)}-{self.org[i] % 20:02d}",
+            "geo_lat_lon": {"lat": 38.0 + self.org[i] % 10, "lon": -77.0 - self.org[i] % 40},
+            "principal_investigators": pis,
+            "contact_pi_name": pis[0]["full_name"] if pis else None,
+            "program_officers": [{"first_name": "OFFICER", "last_name": str(i % 50), "full_name": f"OFFICER {i % 50}"}],
+            "agency_code": "NIH",
+            "agency_ic_admin": {"code": ic_code, "abbreviation": ic, "name": ic},
+            "agency_ic_fundings": fundings,
+            "project_start_date": f"{fy - 1}-{(i % 12) + 1:02d}-01T00:00:00",
+            "project_end_date": f"{fy + 3}-{(i % 12) + 1:02d}-01T00:00:00",
+            "budget_start": f"{fy - 1}-{(i % 12) + 1:02d}-01T00:00:00",
+            "budget_end": f"{fy}-{(i % 12) + 1:02d}-01T00:00:00",
+            "award_notice_date": f"{fy - 1}-{(i % 12) + 1:02d}-15T00:00:00",
+            "date_added": f"{fy - 1}-{(i % 12) + 1:02d}-20T00:00:00",
+            "opportunity_number": f"PA-{fy % 100 - 1:02d}-{i % 300:03d}",
+            "full_study_section": {"name": f"Study Section {i % 40}"},
+            "project_title": self.title(i),
+            "abstract_text": f"This project investigates {topic[0]} and {topic[1]}. " * 20,
+            "phr_text": f"Understanding {topic[0]} will improve public health.",
+            "terms": f"<{topic[0]}><{topic[1]}><model><therapy>",
+            "pref_terms": f"{topic[0]};{topic[1]};Model;Therapy;Research",
+            "spending_categories": [self.topic[i], (self.topic[i] + 6) % len(SPENDING_CATEGORIES)],
+            "spending_categories_desc": "; ".join(categories),
+        }
+
+
+class RecordedProjects(SyntheticProjects):
+    """Projects loaded from a JSON list or NDJSON file of RePORTER API records."""
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        records = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+        if isinstance(records, dict):
+            records = records.get("results", [])
+
+        self.records = records
+        self.n = len(records)
+        self.fiscal_year = [r.get("fiscal_year") for r in records]
+        self.ic = [(r.get("agency_ic_admin") or {}).get("abbreviation") for r in records]
+        self.co_ic = [None] * self.n
+        self.mechanism = [r.get("mechanism_code_dc") for r in records]
+        self.activity_code = [r.get("activity_code") for r in records]
+        self.award_type = [r.get("award_type") for r in records]
+
+    def project_num(self, i):
+        return self.records[i].get("project_num") or ""
+
+    def org_state(self, i):
+        return (self.records[i].get("organization") or {}).get("org_state")
+
+    def org_name(self, i):
+        return (self.records[i].get("organization") or {}).get("org_name") or ""
+
+    def pi_names(self, i):
+        return [pi.get("full_name", "") for pi in self.records[i].get("principal_investigators") or []]
+
+    def text(self, i):
+        r = self.records[i]
+        return " ".join(str(r.get(k) or "") for k in ("project_title", "abstract_text", "terms")).lower()
+
+    def record(self, i):
+        return self.records[i]
+
+
+def matches(projects: SyntheticProjects, i: int, criteria: dict) -> bool:
+    """Check one project against the search criteria."""
+
+    if "fiscal_years" in criteria and projects.fiscal_year[i] not in criteria["fiscal_years"]:
+        return False
+
+    agencies = [a for a in criteria.get("agencies", []) if a != "NIH"]
+    if agencies:
+        ics = {projects.ic[i]} if criteria.get("is_agency_admin") else {projects.ic[i], projects.co_ic[i]}
+        if not ics & set(agencies):
+            return False
+
+    if "funding_mechanisms" in criteria and projects.mechanism[i] not in criteria["funding_mechanisms"]:
+        return False
+    if "activity_codes" in criteria and projects.activity_code[i] not in {a.upper() for a in criteria["activity_codes"]}:
+        return False
+    if "award_types" in criteria and projects.award_type[i] not in criteria["award_types"]:
+        return False
+    if "org_states" in criteria and projects.org_state(i) not in criteria["org_states"]:
+        return False
+    if "org_names" in criteria:
+        name = projects.org_name(i).lower()
+        if not any(org.lower() in name for org in criteria["org_names"]):
+            return False
+    if "pi_names" in criteria:
+        names = " | ".join(projects.pi_names(i)).lower()
+        if not any((pi.get("any_name") or "").lower() in names for pi in criteria["pi_names"]):
+            return False
+    if "project_nums" in criteria:
+        num = projects.project_num(i)
+        exact, patterns = criteria["project_nums"]
+        if num not in exact and not any(fnmatchcase(num, pattern) for pattern in patterns):
+            return False
+    if "advanced_text_search" in criteria:
+        search = criteria["advanced_text_search"]
+        words = search.get("search_text", "").lower().split()
+        text = projects.text(i)
+        found = [w.strip('"') in text for w in words]
+        if words and not (any(found) if search.get("operator") == "or" else all(found)):
+            return False
+
+    return True
+
+
+def create_app(projects: SyntheticProjects, latency: float = 0.0, latency_per_record: float = 0.0,
+               jitter: float = 0.0, result_window: int = 0, seed: int = 0) -> Starlette:
+    """
+    Build the stub ASGI app.
+
+    Args:
+        projects: Project source to serve.
+        latency (float): Seconds added to every response.
+        latency_per_record (float): Extra seconds per returned record.
+        jitter (float): Random extra latency, up to this many seconds.
+        result_window (int): Reject pages past this offset like RePORTER does (0: no limit).
+        seed (int): Seed for the latency jitter.
+    """
+
+    rng = random.Random(seed)
+    stats = {"requests": 0}
+
+    @lru_cache(maxsize=256)
+    def matching(criteria_key: str) -> list[int]:
+        criteria = json.loads(criteria_key)
+        if "project_nums" in criteria:
+            nums = criteria["project_nums"]
+            criteria["project_nums"] = ({n for n in nums if "*" not in n}, [n for n in nums if "*" in n])
+        return [i for i in range(projects.n) if matches(projects, i, criteria)]
+
+    async def search(request: Request) -> JSONResponse:
+        payload = await request.json()
+        stats["requests"] += 1
+
+        offset = int(payload.get("offset", 0))
+        limit = min(int(payload.get("limit", 50)), 500)
+        if result_window and offset + 1 > result_window:
+            return JSONResponse({"detail": f"offset must be less than {result_window}"}, status_code=400)
+
+        ids = matching(json.dumps(payload.get("criteria", {}), sort_keys=True))
+        page = ids[offset:offset + limit]
+
+        fields = {snake_case(f) for f in payload.get("include_fields") or []}
+        results = [
+            {k: v for k, v in projects.record(i).items() if not fields or k in fields}
+            for i in page
+        ]
+
+        delay = latency + latency_per_record * len(results) + (rng.random() * jitter if jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        return JSONResponse({
+            "meta": {"search_id": None, "total": len(ids), "offset": offset, "limit": limit},
+            "results": results,
+        })
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "healthy", "projects": projects.n, **stats})
+
+    return Starlette(routes=[
+        Route("/v2/projects/search", search, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the NIH RePORTER search API")
+    parser.add_argument("--projects", type=int, default=10000, help="Number of synthetic projects (default: 10000)")
+    parser.add_argument("--data", default=None, help="JSON or NDJSON file of recorded API records to serve instead")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data (default: 0)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--latency-per-record", type=float, default=0.0, help="Extra seconds per returned record (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in seconds (default: 0)")
+    parser.add_argument("--result-window", type=int, default=0, help="Reject offsets past this, like the live API's 15000 (default: no limit)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    projects = RecordedProjects(args.data) if args.data else SyntheticProjects(args.projects, args.seed)
+    print(f"Serving {projects.n} projects on http://{args.host}:{args.port}/v2/projects/search")
+
+    app = create_app(projects, args.latency, args.latency_per_record, args.jitter, args.result_window, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,144 @@ import argparse
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
-from mcp_data_check import run_evaluation
+from mcp_data_check import Evaluator, EvalResult
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+def tool_call_cost(tool_call: dict) -> dict:
+    """
+    Upstream cost of one tool call, read from its result.
+
+    Upstream requests and bytes are only known if the server runs with
+    REPORTER_REPORT_USAGE=1, which adds an upstream_usage notice to tool results. The
+    notice is also in the result's meta, but the MCP connector only returns content,
+    so it is read from its own content block here.
+    """
+
+    cost = {"upstream_requests": None, "upstream_bytes": None, "response_bytes": 0}
+
+    for block in tool_call.get("api_response") or []:
+        text = block.get("text", "") if isinstance(block, dict) else str(block)
+        cost["response_bytes"] += len(text.encode("utf-8"))
+        try:
+            usage = json.loads(text).get("upstream_usage")
+        except (ValueError, AttributeError):
+            usage = None
+        if usage:
+            cost["upstream_requests"] = (cost["upstream_requests"] or 0) + usage.get("requests", 0)
+            cost["upstream_bytes"] = (cost["upstream_bytes"] or 0) + usage.get("bytes", 0)
+
+    return cost
+
+
+def evaluate_question(evaluator: Evaluator, q: dict) -> dict:
+    """Answer and grade one question, recording its wall time and cost."""
+
+    start = time.perf_counter()
+    try:
+        model_response, time_to_answer, tools_called = evaluator.call_model_with_mcp(q["question"])
+        result = evaluator.evaluate_response(q["question"], q["expected_answer"], q["eval_type"], model_response)
+        result.time_to_answer = time_to_answer
+        result.tools_called = tools_called
+    except Exception as e:
+        result = EvalResult(
+            question=q["question"],
+            expected_answer=q["expected_answer"],
+            eval_type=q["eval_type"],
+            model_response="",
+            passed=False,
+            error=f"API call failed: {e}",
+        )
+
+    costs = [tool_call_cost(t) for t in result.tools_called]
+
+    def total(key):
+        values = [c[key] for c in costs if c[key] is not None]
+        return sum(values) if values else None
+
+    return {
+        **asdict(result),
+        "wall_time": round(time.perf_counter() - start, 3),
+        "tool_call_count": len(result.tools_called),
+        "upstream_requests": total("upstream_requests"),
+        "upstream_bytes": total("upstream_bytes"),
+        "response_bytes": total("response_bytes") or 0,
+    }
+
+
+def run_parallel_evaluation(questions_path, api_key, server_url, model, server_name, workers=1, verbose=False) -> dict:
+    """
+    Run the evaluation with up to `workers` questions in flight at once.
+
+    Returns results in the same shape as mcp_data_check.run_evaluation, with each
+    result also carrying wall_time, tool_call_count, upstream_requests,
+    upstream_bytes and response_bytes, and a summary of their totals.
+    """
+
+    evaluator = Evaluator(server_url=server_url, api_key=api_key, model=model, server_name=server_name)
+    questions = evaluator.load_questions(questions_path)
+
+    def run(indexed):
+        i, q = indexed
+        result = evaluate_question(evaluator, q)
+        if verbose:
+            status = "PASS" if result["passed"] else "FAIL"
+            print(f"[{i + 1}/{len(questions)}] {status} ({result['wall_time']:.1f}s, "
+                  f"{result['tool_call_count']} tool calls): {q['question'][:50]}...")
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, enumerate(questions)))
+
+    by_eval_type = {}
+    for r in results:
+        if r["error"] and r["error"].startswith("API call failed"):
+            continue
+        stats = by_eval_type.setdefault(r["eval_type"], {"total": 0, "passed": 0})
+        stats["total"] += 1
+        stats["passed"] += r["passed"]
+
+    total = len(results)
+    passed = sum(r["passed"] for r in results)
+
+    def cost_total(key):
+        values = [r[key] for r in results if r[key] is not None]
+        return sum(values) if values else None
+
+    return {
+        "summary": {
+            "total": total,
+            "passed": passed,
+            "failed": total - passed,
+            "pass_rate": passed / total if total > 0 else 0.0,
+            "by_eval_type": by_eval_type,
+            "cost": {
+                "wall_time": round(cost_total("wall_time"), 3) if results else 0,
+                "tool_calls": cost_total("tool_call_count") or 0,
+                "upstream_requests": cost_total("upstream_requests"),
+                "upstream_bytes": cost_total("upstream_bytes"),
+                "response_bytes": cost_total("response_bytes") or 0,
+            },
+        },
+        "results": results,
+        "metadata": {
+            "server_url": server_url,
+            "model": model,
+            "workers": workers,
+            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        },
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Evaluate MCP server accuracy against known questions and answers"
@@ -45,6 +173,12 @@ def main():
         default="nih-reporter",
         help="Name for the MCP server (default: nih-reporter)"
     )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Number of questions to evaluate concurrently (default: 1)"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -76,15 +210,16 @@ def main():
 
     # Run evaluation
     print(f"Loading questions from {questions_path}...")
-    print(f"Evaluating against {args.server_url}...")
+    print(f"Evaluating against {args.server_url} with {args.workers} worker(s)...")
     print("-" * 50)
 
-    results = run_evaluation(
-        questions_filepath=questions_path,
+    results = run_parallel_evaluation(
+        questions_path=questions_path,
         api_key=api_key,
         server_url=args.server_url,
         model=args.model,
         server_name=args.server_name,
+        workers=args.workers,
         verbose=args.verbose
     )
 
@@ -99,6 +234,15 @@ def main():
     print(f"Failed: {summary['failed']}")
     print(f"Pass rate: {summary['pass_rate']:.1%}")
 
+    cost = summary["cost"]
+    print(f"\nWall time: {cost['wall_time']:.1f}s across questions")
+    print(f"Tool calls: {cost['tool_calls']}")
+    if cost["upstream_requests"] is not None:
+        print(f"Upstream requests: {cost['upstream_requests']} ({cost['upstream_bytes'] / 1e6:.1f} MB)")
+    else:
+        print("Upstream requests: unknown (run the server with REPORTER_REPORT_USAGE=1)")
+    print(f"Tool response bytes: {cost['response_bytes']}")
+
     if summary.get("by_eval_type"):
         print("\nBy evaluation type:")
         for eval_type, stats in summary["by_eval_type"].items():
@@ -0,0 +1,196 @@
+import os
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_headers, get_http_request, get_access_token
+from reporter.metrics import ADMISSION_REJECTIONS
+from reporter.readiness import estimated_upstream_wait
+
+# Tools that download whole portfolios and are subject to admission control.
+HEAVY_TOOLS = {
+    "get_search_summary",
+    "get_portfolio_crosstab",
+    "get_portfolio_cube",
+    "get_portfolio_distribution",
+    "get_project_counts",
+    "export_projects",
+}
+
+# Heavy tool calls one session may run at once; further calls wait their turn.
+SESSION_MAX_CALLS = int(os.getenv("REPORTER_SESSION_MAX_CALLS", "2"))
+
+# Heavy tool calls one session may have waiting; past this they are rejected.
+SESSION_MAX_QUEUED = int(os.getenv("REPORTER_SESSION_MAX_QUEUED", "4"))
+
+# Heavy tool calls are rejected while the estimated wait for an upstream slot
+# exceeds this many seconds. 0 disables the check.
+ADMISSION_MAX_WAIT = float(os.getenv("REPORTER_ADMISSION_MAX_WAIT", "30"))
+
+# Header a client can send to identify itself across stateless requests.
+CLIENT_HEADER = "x-reporter-client"
+
+# Kinds of session key (see session_key) that name one client. Per-session limits
+# apply only to these; an address can be shared by many clients behind a proxy or
+# hosted connector, so address keys only order the upstream queue.
+IDENTIFIED_KINDS = {CLIENT_HEADER, "mcp-session-id", "user"}
+
+# Session of the current tool call; work outside tool calls (cache warming) has none.
+_session = ContextVar("session", default="")
+
+# session -> [running heavy calls, waiting heavy calls, condition]
+_sessions = {}
+
+
+def session_key() -> str:
+    """
+    Identify the client behind the current request, as "kind:value".
+
+    Uses an explicit CLIENT_HEADER, then the MCP session id, then the authenticated
+    principal, then the client address (the first X-Forwarded-For hop behind the
+    platform router). Returns "" outside an HTTP request (stdio).
+    """
+
+    headers = get_http_headers(include_all=True)
+    for name in (CLIENT_HEADER, "mcp-session-id"):
+        if headers.get(name):
+            return f"{name}:{headers[name]}"
+
+    token = get_access_token()
+    if token is not None:
+        return f"user:{token.claims.get('sub') or token.client_id}"
+
+    if headers.get("x-forwarded-for"):
+        return "ip:" + headers["x-forwarded-for"].split(",")[0].strip()
+    try:
+        client = get_http_request().client
+    except RuntimeError:
+        return ""
+    return f"ip:{client.host}" if client else ""
+
+
+def identified(session: str) -> bool:
+    """Whether a session key names one client (see IDENTIFIED_KINDS)."""
+    return session.split(":", 1)[0] in IDENTIFIED_KINDS
+
+
+def current_session() -> str:
+    return _session.get()
+
+
+class FairSlots:
+    """
+    A semaphore that hands free slots to waiting sessions in turn.
+
+    Waiters queue per session, and each release serves the session that has
+    waited longest since it was last served, so one session with many queued
+    requests cannot starve the others.
+    """
+
+    def __init__(self, slots: int):
+        self.free = slots
+        self.waiting = OrderedDict()
+
+    def locked(self) -> bool:
+        return self.free <= 0
+
+    async def acquire(self, session: str = ""):
+        if self.free > 0 and not self.waiting:
+            self.free -= 1
+            return
+
+        slot = asyncio.get_running_loop().create_future()
+        self.waiting.setdefault(session, deque()).append(slot)
+        try:
+            await slot
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                # handed a slot just as we were cancelled; pass it on
+                self.release()
+            else:
+                queue = self.waiting.get(session)
+                if queue is not None and slot in queue:
+                    queue.remove(slot)
+                    if not queue:
+                        del self.waiting[session]
+            raise
+
+    def release(self):
+        while self.waiting:
+            session, queue = next(iter(self.waiting.items()))
+            slot = queue.popleft()
+            if queue:
+                self.waiting.move_to_end(session)
+            else:
+                del self.waiting[session]
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self.free += 1
+
+
+def reject(tool: str, reason: str, message: str, retry_after: float):
+    ADMISSION_REJECTIONS.labels(tool, reason).inc()
+    raise ToolError(
+        f"Server busy: {message}. This is temporary; retry in about {max(1, round(retry_after))} seconds."
+    )
+
+
+@asynccontextmanager
+async def admit(tool: str, upstream_slots: int):
+    """
+    Run a tool call as part of its client's session, applying admission control to heavy tools.
+
+    A heavy call is rejected with a retryable ToolError when the estimated wait for
+    an upstream slot exceeds ADMISSION_MAX_WAIT. Calls from an identified session
+    (see identified) are also rejected when the session already has
+    SESSION_MAX_QUEUED calls waiting, and otherwise wait until it runs fewer than
+    SESSION_MAX_CALLS heavy calls. Calls known only by address are subject to the
+    global limit alone, though their upstream requests still take turns by address.
+
+    Args:
+        tool (str): Name of the tool being called.
+        upstream_slots (int): Upstream requests that may be in flight at once.
+    """
+
+    session = session_key()
+    token = _session.set(session)
+    try:
+        if tool not in HEAVY_TOOLS:
+            yield
+            return
+
+        wait = estimated_upstream_wait(upstream_slots)
+        if ADMISSION_MAX_WAIT and wait > ADMISSION_MAX_WAIT:
+            reject(tool, "queue_wait", f"estimated wait for NIH RePORTER is {wait:.0f}s (limit {ADMISSION_MAX_WAIT:g}s)", wait)
+
+        if not identified(session):
+            yield
+            return
+
+        state = _sessions.setdefault(session, [0, 0, asyncio.Condition()])
+        if state[0] >= SESSION_MAX_CALLS and state[1] >= SESSION_MAX_QUEUED:
+            reject(tool, "session_limit", f"this client already has {state[0]} heavy tool calls running and {state[1]} waiting", wait or 5)
+
+        condition = state[2]
+        state[1] += 1
+        try:
+            async with condition:
+                await condition.wait_for(lambda: state[0] < SESSION_MAX_CALLS)
+                state[0] += 1
+        finally:
+            state[1] -= 1
+            if not state[0] and not state[1]:
+                _sessions.pop(session, None)
+
+        try:
+            yield
+        finally:
+            async with condition:
+                state[0] -= 1
+                condition.notify()
+            if not state[0] and not state[1]:
+                _sessions.pop(session, None)
+    finally:
+        _session.reset(token)
@@ -2,10 +2,17 @@ import os
 from fastmcp import FastMCP
 from reporter.tools import register_tools
 from reporter.prompts import register_prompts
+from reporter.resources import register_resources
 from reporter.routes import register_routes
+from reporter.middleware import register_middleware
+from reporter.lifespan import lifespan
+from reporter.tracing import configure_tracing, traced_serializer
 
-# Initialize FastMCP server
-mcp = FastMCP("reporter")
+# Export trace spans if REPORTER_TRACE_EXPORTER is set
+configure_tracing()
+
+# Initialize FastMCP server (lifespan runs background tasks such as cache warming)
+mcp = FastMCP("reporter", lifespan=lifespan, tool_serializer=traced_serializer)
 
 # Register custom tools
 register_tools(mcp)
@@ -13,9 +20,15 @@ register_tools(mcp)
 # Register custom prompts
 register_prompts(mcp)
 
+# Register resources (exported and cached result sets)
+register_resources(mcp)
+
 # Register custom routes
 register_routes(mcp)
 
+# Register middleware wrapping every tool call
+register_middleware(mcp)
+
 # ASGI app for HTTP deployments — imported by uvicorn in all remote environments:
 #   cloud.gov:  Procfile/manifest.yaml  →  uvicorn ... --port $PORT
 #   Databricks: app.yaml               →  uvicorn ... --port $DATABRICKS_APP_PORT
@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import fcntl
+import asyncio
+import tempfile
+from datetime import date, datetime, timezone
+from reporter.models import SearchParams, IncludeField, FundingMechanism
+from reporter.utils import iter_pages, count_projects, get_shard_values, shard_params, background_priority
+from reporter.warmup import get_data_version
+
+# Dimensions of the materialized table, in row order.
+BASELINE_DIMENSIONS = ["fiscal_year", "agency_ic_admin", "activity_code", "funding_mechanism"]
+
+# Whether to build and serve the baseline table.
+BASELINE_ENABLED = os.getenv("REPORTER_BASELINE_ENABLED", "1") == "1"
+
+# Fiscal years covered by the table, e.g. "2023,2024,2025" (default: current and two previous).
+BASELINE_YEARS = os.getenv("REPORTER_BASELINE_YEARS", "")
+
+# Where the table is persisted, so every worker serves the same copy.
+BASELINE_FILE = os.getenv(
+    "REPORTER_BASELINE_FILE",
+    os.path.join(tempfile.gettempdir(), "reporter-baseline.json"),
+)
+
+# Rebuild the table when it is older than this many seconds, even without a data refresh.
+BASELINE_MAX_AGE = float(os.getenv("REPORTER_BASELINE_MAX_AGE", str(7 * 86400)))
+
+# Seconds between checks for a stale table.
+BASELINE_CHECK_INTERVAL = float(os.getenv("REPORTER_BASELINE_CHECK_INTERVAL", "3600"))
+
+# RePORTER will not page past this many results, so larger shards are split further.
+MAX_RESULT_WINDOW = 15000
+
+# Criteria keys the table can answer exactly.
+_BASELINE_CRITERIA = {"fiscal_years", "agencies", "is_agency_admin", "activity_codes", "funding_mechanisms"}
+
+# In-memory copy of the table: rows are [fiscal_year, ic, activity_code, mechanism code, count, funding].
+_table = {"rows": [], "years": [], "mechanism_labels": {}, "built_at": None, "data_version": None}
+_table_mtime = None
+
+
+def baseline_years():
+    """
+    Fiscal years covered by the baseline table.
+
+    Returns:
+        list[int]: REPORTER_BASELINE_YEARS, or the current fiscal year and the two before it.
+    """
+
+    if BASELINE_YEARS:
+        return [int(y) for y in BASELINE_YEARS.split(",") if y.strip()]
+
+    today = date.today()
+    current_fy = today.year + 1 if today.month >= 10 else today.year
+
+    return [current_fy - 2, current_fy - 1, current_fy]
+
+
+def load_baseline():
+    """
+    Reload the table from BASELINE_FILE if another worker has rebuilt it.
+
+    Returns:
+        dict: The current table.
+    """
+
+    global _table, _table_mtime
+
+    try:
+        mtime = os.path.getmtime(BASELINE_FILE)
+    except OSError:
+        return _table
+
+    if mtime != _table_mtime:
+        try:
+            with open(BASELINE_FILE, encoding="utf-8") as f:
+                _table = json.load(f)
+            _table_mtime = mtime
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not load baseline table: {e}")
+
+    return _table
+
+
+async def _shard_pages(search_params: SearchParams, include_fields: list[str]):
+    """Yield pages of a shard, splitting it by administering IC if it exceeds the result window."""
+
+    total, _ = await count_projects(search_params, use_cache=False)
+    if total == 0:
+        return
+
+    if total > MAX_RESULT_WINDOW and not search_params.is_agency_admin:
+        for ic in get_shard_values(search_params, "agency_ic_admin") or []:
+            async for page in _shard_pages(shard_params(search_params, "agency_ic_admin", ic), include_fields):
+                yield page
+        return
+
+    async for _, page in iter_pages(search_params, include_fields, use_cache=False):
+        yield page
+
+
+async def build_baseline(years: list[int] = None):
+    """
+    Rebuild the baseline table of counts and funding per
+    (fiscal_year, agency_ic_admin, activity_code, funding_mechanism).
+
+    Each fiscal year x funding mechanism is fetched as its own shard so the
+    table is keyed by the same mechanism codes SearchParams filters on.
+
+    Args:
+        years (list[int]): Fiscal years to cover (default: baseline_years()).
+
+    Returns:
+        dict: The new table.
+    """
+
+    global _table, _table_mtime
+
+    years = years or baseline_years()
+    cells = {}
+    mechanism_labels = {}
+    include_fields = [
+        IncludeField.AGENCY_IC_ADMIN.value,
+        IncludeField.ACTIVITY_CODE.value,
+        IncludeField.FUNDING_MECHANISM.value,
+        IncludeField.AWARD_AMOUNT.value,
+    ]
+
+    async def build_shard(year, mechanism):
+        search_params = SearchParams(years=[year], funding_mechanisms=[mechanism])
+        async for page in _shard_pages(search_params, include_fields):
+            for r in page.get("results", []):
+                if not isinstance(r, dict):
+                    continue
+                if r.get("funding_mechanism"):
+                    mechanism_labels[mechanism.value] = r["funding_mechanism"]
+                key = (year, r.get("agency_ic_admin"), r.get("activity_code"), mechanism.value)
+                cell = cells.setdefault(key, [0, 0])
+                cell[0] += 1
+                cell[1] += r.get("award_amount") or 0
+
+    data_version = await get_data_version()
+    with background_priority():
+        await asyncio.gather(*(build_shard(y, m) for y in years for m in FundingMechanism))
+
+    table = {
+        "rows": [list(key) + cell for key, cell in cells.items()],
+        "years": years,
+        "mechanism_labels": mechanism_labels,
+        "built_at": time.time(),
+        "data_version": data_version,
+    }
+
+    tmp_path = f"{BASELINE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    os.replace(tmp_path, BASELINE_FILE)
+
+    _table = table
+    _table_mtime = os.path.getmtime(BASELINE_FILE)
+    print(f"Built baseline table for {years}: {len(table['rows'])} rows")
+
+    return table
+
+
+def baseline_lookup(search_params: SearchParams, group_by: list[str] = None):
+    """
+    Answer a count/funding question from the baseline table, if its criteria map exactly onto it.
+
+    Criteria may only use years (all covered by the table), agencies (NIH, or specific
+    ICs with is_agency_admin set), activity_codes and funding_mechanisms.
+
+    Args:
+        search_params (SearchParams): Search parameters of the question.
+        group_by (list[str]): Baseline dimensions to break the totals down by.
+
+    Returns:
+        dict | None: None if the table cannot answer exactly, otherwise:
+            - total_projects, total_funding
+            - groups: list of {dimension: value, ..., "count": N, "total_funding": X}
+            - baseline_as_of: ISO timestamp of the table build
+            - baseline_age_seconds: Age of the table
+    """
+
+    if not BASELINE_ENABLED:
+        return None
+
+    table = load_baseline()
+    if not table["rows"]:
+        return None
+
+    criteria = search_params.to_api_criteria()
+    if set(criteria) - _BASELINE_CRITERIA:
+        return None
+
+    years = criteria.get("fiscal_years")
+    if not years or not set(years) <= set(table["years"]):
+        return None
+
+    # without agencies the API also searches non-NIH HHS agencies, which the table does not cover;
+    # specific ICs only match the table's administering IC when is_agency_admin is set
+    agencies = criteria.get("agencies")
+    if not agencies:
+        return None
+    if agencies == ["NIH"]:
+        ics = None
+    elif criteria.get("is_agency_admin"):
+        ics = set(agencies)
+    else:
+        return None
+
+    activity_codes = {a.upper() for a in criteria.get("activity_codes", [])}
+    mechanisms = set(criteria.get("funding_mechanisms", []))
+
+    group_idx = [BASELINE_DIMENSIONS.index(d) for d in group_by or []]
+    labels = table["mechanism_labels"]
+    mechanism_idx = BASELINE_DIMENSIONS.index("funding_mechanism")
+
+    total_projects = 0
+    total_funding = 0
+    groups = {}
+    for row in table["rows"]:
+        fy, ic, activity_code, mechanism, count, funding = row
+        if fy not in years:
+            continue
+        if ics is not None and ic not in ics:
+            continue
+        if activity_codes and activity_code not in activity_codes:
+            continue
+        if mechanisms and mechanism not in mechanisms:
+            continue
+
+        total_projects += count
+        total_funding += funding
+
+        if group_idx:
+            key = tuple(labels.get(row[i], row[i]) if i == mechanism_idx else row[i] for i in group_idx)
+            group = groups.setdefault(key, [0, 0])
+            group[0] += count
+            group[1] += funding
+
+    built_at = table["built_at"]
+
+    return {
+        "total_projects": total_projects,
+        "total_funding": total_funding,
+        "groups": [
+            {**dict(zip(group_by, key)), "count": count, "total_funding": funding}
+            for key, (count, funding) in sorted(groups.items(), key=lambda g: g[1][0], reverse=True)
+        ],
+        "baseline_as_of": datetime.fromtimestamp(built_at, timezone.utc).isoformat(),
+        "baseline_age_seconds": round(time.time() - built_at),
+    }
+
+
+async def run_baseline_refresher():
+    """
+    Keep the baseline table current: rebuild it after a RePORTER data refresh or
+    once it is older than BASELINE_MAX_AGE.
+
+    Only one worker rebuilds at a time; the others pick up the new file.
+    """
+
+    while True:
+        try:
+            table = load_baseline()
+            stale = (
+                not table["rows"]
+                or table["years"] != baseline_years()
+                or time.time() - table["built_at"] > BASELINE_MAX_AGE
+                or table["data_version"] != await get_data_version()
+            )
+            if stale:
+                with open(f"{BASELINE_FILE}.lock", "w") as lock:
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        pass  # another worker is rebuilding
+                    else:
+                        try:
+                            # skip if another worker finished a rebuild while we checked
+                            if load_baseline()["built_at"] == table["built_at"]:
+                                await build_baseline()
+                        finally:
+                            fcntl.flock(lock, fcntl.LOCK_UN)
+        except Exception as e:
+            print(f"Baseline refresh failed: {e}")
+
+        await asyncio.sleep(BASELINE_CHECK_INTERVAL)
@@ -0,0 +1,89 @@
+import json
+import time
+import hashlib
+from collections import OrderedDict
+
+
+def fingerprint(*parts) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+
+    Dict key order does not affect the result, so two equivalent API criteria
+    produce the same fingerprint.
+
+    Args:
+        *parts: Values to hash (dicts, lists, strings, numbers).
+
+    Returns:
+        str: Hex digest identifying the parts.
+    """
+
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after a time to live.
+
+    If max_bytes is set, the cache also evicts entries to keep their total size
+    under max_bytes. A value's size is sizeof(value), len() by default (e.g. for bytes).
+    """
+
+    def __init__(self, max_entries: int = 32, ttl: float = 3600, max_bytes: int = None, sizeof=len):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def _size(self, value):
+        return self.sizeof(value) if self.max_bytes is not None else 0
+
+    def _pop(self, key):
+        value, _ = self._entries.pop(key)
+        self.nbytes -= self._size(value)
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return (value, age in seconds) for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age > self.ttl:
+            self._pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value, age
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries if full."""
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (value, time.monotonic())
+        self.nbytes += self._size(value)
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._entries) > 1
+        ):
+            self._pop(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.nbytes = 0
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
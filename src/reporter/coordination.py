@@ -0,0 +1,406 @@
+import os
+import time
+import uuid
+import fcntl
+import json
+import asyncio
+
+# Where upstream rate-limit tokens and in-flight request ownership are shared:
+#   local - this process only (single worker, stdio, tests)
+#   file  - every worker on the node, through lock files in COORDINATION_DIR
+#   redis - every worker that uses REDIS_URL (any Redis-compatible store)
+COORDINATION = os.getenv("REPORTER_COORDINATION", "local").lower()
+
+COORDINATION_BACKENDS = ["local", "file", "redis"]
+
+# Shared directory for the file backend.
+COORDINATION_DIR = os.getenv("REPORTER_COORDINATION_DIR", "/tmp/reporter-coordination")
+
+# Redis URL for the redis backend (requires the 'redis' extra).
+REDIS_URL = os.getenv("REPORTER_REDIS_URL", "redis://localhost:6379/0")
+
+# Upstream requests per second allowed across everything sharing the backend; 0 disables.
+RATE_LIMIT = float(os.getenv("REPORTER_RATE_LIMIT", "0"))
+
+# Requests that may be sent back to back after an idle period.
+RATE_LIMIT_BURST = float(os.getenv("REPORTER_RATE_LIMIT_BURST", "4"))
+
+# A request owner that has not renewed its claim for this many seconds is presumed
+# dead, and waiters stop waiting for it. Live owners renew every third of it.
+FLIGHT_TIMEOUT = float(os.getenv("REPORTER_FLIGHT_TIMEOUT", "120"))
+
+# Seconds a finished request's response stays available to waiting workers.
+RESULT_TTL = 30
+
+# How often workers waiting on another worker's request check for its response.
+POLL_INTERVAL = 0.05
+
+if COORDINATION not in COORDINATION_BACKENDS:
+    raise ValueError(f"Invalid REPORTER_COORDINATION '{COORDINATION}'. Valid options: {COORDINATION_BACKENDS}")
+
+
+def refill(tokens: float, updated: float, now: float) -> tuple[float, float]:
+    """
+    Take one token from a token bucket holding `tokens` as of `updated`.
+
+    Returns:
+        tuple: (tokens left, seconds to wait before retrying; 0 if a token was taken)
+    """
+
+    tokens = min(RATE_LIMIT_BURST, tokens + (now - updated) * RATE_LIMIT)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / RATE_LIMIT
+
+
+class Coordinator:
+    """
+    Shares upstream rate-limit tokens and in-flight request ownership.
+
+    Subclasses store the token bucket and the flights somewhere every
+    participating worker can see; this class implements the protocol.
+    """
+
+    async def acquire_token(self):
+        """Wait for a rate-limit token (returns at once if RATE_LIMIT is 0)."""
+
+        if RATE_LIMIT <= 0:
+            return
+        while (wait := await self._take_token()) > 0:
+            await asyncio.sleep(wait)
+
+    async def single_flight(self, key: str, fetch):
+        """
+        Run fetch() for key unless another worker already is, then share its result.
+
+        Waiters that see the owner finish without a result (it failed), or stop
+        renewing its claim for FLIGHT_TIMEOUT (it died), fetch for themselves.
+
+        Args:
+            key (str): Request fingerprint.
+            fetch: Coroutine function returning the response body (bytes).
+
+        Returns:
+            tuple: (response body, whether it came from another worker's request)
+        """
+
+        if await self._claim(key):
+            heartbeat = asyncio.create_task(self._keep_claim(key))
+            try:
+                body = await fetch()
+                await self._publish(key, body)
+                return body, False
+            finally:
+                heartbeat.cancel()
+                await self._release(key)
+
+        # the owner renews its claim while it fetches, so wait as long as the claim holds
+        await self._wait(key)
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            body = await self._result(key)
+            if body is not None:
+                return body, True
+            if not await self._claimed(key):
+                break
+
+        return await fetch(), False
+
+    async def _wait(self, key):
+        """Register interest in another worker's flight (backends that always publish need not)."""
+
+    async def _keep_claim(self, key):
+        """Renew the claim on key while its fetch runs, so a slow fetch is not presumed dead."""
+
+        while True:
+            await asyncio.sleep(FLIGHT_TIMEOUT / 3)
+            try:
+                await self._refresh(key)
+            except Exception as e:
+                print(f"Could not renew claim on in-flight request: {e}")
+
+
+class LocalCoordinator(Coordinator):
+    """In-process coordination: one token bucket and one future per in-flight key."""
+
+    def __init__(self):
+        self._tokens = RATE_LIMIT_BURST
+        self._updated = time.monotonic()
+        self._flights = {}
+
+    async def _take_token(self):
+        now = time.monotonic()
+        self._tokens, wait = refill(self._tokens, self._updated, now)
+        self._updated = now
+        return wait
+
+    async def single_flight(self, key, fetch):
+        flight = self._flights.get(key)
+        if flight is not None:
+            try:
+                return await asyncio.shield(flight), True
+            except Exception:
+                return await fetch(), False
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            body = await fetch()
+        except BaseException:
+            # failed or cancelled: waiters fetch for themselves
+            flight.set_exception(RuntimeError("In-flight request did not complete"))
+            flight.exception()  # retrieved, even if nobody was waiting
+            raise
+        finally:
+            del self._flights[key]
+
+        flight.set_result(body)
+        return body, False
+
+
+class FileCoordinator(Coordinator):
+    """
+    Coordination between the workers on one node through files in COORDINATION_DIR.
+
+    The token bucket is a small JSON file updated under an exclusive flock. A flight
+    is owned by whoever creates <key>.lock (holding its owner id); its response is
+    published as <key>.body, only if a waiter has marked <key>.waiting. Old
+    responses are pruned on claims, at most once per RESULT_TTL.
+    """
+
+    def __init__(self, directory: str = COORDINATION_DIR):
+        self.directory = directory
+        self.owner = uuid.uuid4().hex
+        self._pruned = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    async def _take_token(self):
+        # flock blocks until the other workers let go, so wait for it off the event loop
+        return await asyncio.to_thread(self._take_token_locked)
+
+    def _take_token_locked(self):
+        with open(self._path("tokens.lock"), "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self._path("tokens.json")) as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {"tokens": RATE_LIMIT_BURST, "updated": time.time()}
+                now = time.time()
+                tokens, wait = refill(state["tokens"], state["updated"], now)
+                with open(self._path("tokens.json"), "w") as f:
+                    json.dump({"tokens": tokens, "updated": now}, f)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return wait
+
+    def _expired(self, path, ttl):
+        try:
+            return time.time() - os.path.getmtime(path) > ttl
+        except FileNotFoundError:
+            return True
+
+    def _owns(self, key):
+        try:
+            with open(self._path(f"{key}.lock")) as f:
+                return f.read() == self.owner
+        except FileNotFoundError:
+            return False
+
+    # Every file operation below runs in a thread, off the event loop.
+
+    async def _claim(self, key):
+        return await asyncio.to_thread(self._claim_sync, key)
+
+    def _claim_sync(self, key):
+        if time.time() - self._pruned > RESULT_TTL:
+            self._prune()
+
+        lock = self._path(f"{key}.lock")
+        if not self._create_lock(lock):
+            if not self._expired(lock, FLIGHT_TIMEOUT):
+                return False
+            # the owner died or hung; take over its flight. Takeovers are serialized
+            # and re-check the lock, so two workers that both saw it expire cannot
+            # both win; a fresh claim in between wins the O_EXCL create instead.
+            with open(self._path("takeover.lock"), "a+") as guard:
+                fcntl.flock(guard, fcntl.LOCK_EX)
+                try:
+                    if not self._expired(lock, FLIGHT_TIMEOUT):
+                        return False
+                    stale = f"{lock}.{self.owner}.stale"
+                    try:
+                        os.rename(lock, stale)
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+                    if not self._create_lock(lock):
+                        return False
+                finally:
+                    fcntl.flock(guard, fcntl.LOCK_UN)
+
+        # drop a previous flight's response so waiters only see this one's
+        try:
+            os.remove(self._path(f"{key}.body"))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _create_lock(self, lock):
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.owner)
+        return True
+
+    async def _wait(self, key):
+        await asyncio.to_thread(self._wait_sync, key)
+
+    def _wait_sync(self, key):
+        # tells the owner someone wants its response
+        with open(self._path(f"{key}.waiting"), "a"):
+            pass
+
+    async def _claimed(self, key):
+        return not await asyncio.to_thread(self._expired, self._path(f"{key}.lock"), FLIGHT_TIMEOUT)
+
+    async def _refresh(self, key):
+        await asyncio.to_thread(self._refresh_sync, key)
+
+    def _refresh_sync(self, key):
+        if self._owns(key):
+            os.utime(self._path(f"{key}.lock"))
+
+    async def _publish(self, key, body):
+        await asyncio.to_thread(self._publish_sync, key, body)
+
+    def _publish_sync(self, key, body):
+        # responses nobody waits for are not written; a worker that starts waiting
+        # after this check sees the claim released and fetches for itself
+        if not os.path.exists(self._path(f"{key}.waiting")):
+            return
+        path = self._path(f"{key}.body")
+        tmp_path = f"{path}.{self.owner}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    async def _result(self, key):
+        return await asyncio.to_thread(self._result_sync, key)
+
+    def _result_sync(self, key):
+        path = self._path(f"{key}.body")
+        if self._expired(path, RESULT_TTL):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def _release(self, key):
+        await asyncio.to_thread(self._release_sync, key)
+
+    def _release_sync(self, key):
+        # a hung owner whose flight was taken over must not remove the new owner's lock
+        if not self._owns(key):
+            return
+        for suffix in ("lock", "waiting"):
+            try:
+                os.remove(self._path(f"{key}.{suffix}"))
+            except FileNotFoundError:
+                pass
+
+    def _prune(self):
+        """Delete responses older than RESULT_TTL and waiter marks of dead flights."""
+
+        self._pruned = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith(".body"):
+                ttl = RESULT_TTL
+            elif name.endswith((".waiting", ".stale", ".tmp")):
+                ttl = FLIGHT_TIMEOUT
+            else:
+                continue
+            if self._expired(self._path(name), ttl):
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+
+
+class RedisCoordinator(Coordinator):
+    """Coordination through a Redis-compatible store shared by any number of workers and nodes."""
+
+    # Token bucket in a hash; returns the seconds to wait (as a string), "0" if a token was taken
+    TAKE_TOKEN = """
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - (tonumber(state[2]) or now)) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], 3600)
+    return tostring(wait)
+    """
+
+    # Delete the flight lock only if this worker still owns it
+    RELEASE = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+    return 0
+    """
+
+    # Extend the flight lock only if this worker still owns it
+    REFRESH = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('PEXPIRE', KEYS[1], ARGV[2]) end
+    return 0
+    """
+
+    def __init__(self, url: str = REDIS_URL):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ValueError("REPORTER_COORDINATION=redis requires the redis package (install the 'redis' extra)")
+
+        self.redis = redis.from_url(url)
+        self.owner = uuid.uuid4().hex
+        self._take_token_script = self.redis.register_script(self.TAKE_TOKEN)
+        self._release_script = self.redis.register_script(self.RELEASE)
+        self._refresh_script = self.redis.register_script(self.REFRESH)
+
+    async def _take_token(self):
+        wait = await self._take_token_script(
+            keys=["reporter:tokens"], args=[RATE_LIMIT, RATE_LIMIT_BURST, time.time()]
+        )
+        return float(wait)
+
+    async def _claim(self, key):
+        claimed = await self.redis.set(f"reporter:flight:{key}", self.owner, nx=True, px=int(FLIGHT_TIMEOUT * 1000))
+        if claimed:
+            await self.redis.delete(f"reporter:result:{key}")
+        return bool(claimed)
+
+    async def _claimed(self, key):
+        return bool(await self.redis.exists(f"reporter:flight:{key}"))
+
+    async def _refresh(self, key):
+        await self._refresh_script(keys=[f"reporter:flight:{key}"], args=[self.owner, int(FLIGHT_TIMEOUT * 1000)])
+
+    async def _publish(self, key, body):
+        await self.redis.set(f"reporter:result:{key}", body, px=int(RESULT_TTL * 1000))
+
+    async def _result(self, key):
+        return await self.redis.get(f"reporter:result:{key}")
+
+    async def _release(self, key):
+        await self._release_script(keys=[f"reporter:flight:{key}"], args=[self.owner])
+
+
+COORDINATORS = {"local": LocalCoordinator, "file": FileCoordinator, "redis": RedisCoordinator}
+
+coordinator = COORDINATORS[COORDINATION]()
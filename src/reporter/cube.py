@@ -0,0 +1,258 @@
+import os
+import asyncio
+import statistics
+from itertools import product
+from reporter.cache import TTLCache, fingerprint
+from reporter.models import SearchParams, IncludeField
+from reporter.metrics import CACHE_LOOKUPS
+from reporter.tracing import tracer
+from reporter.utils import get_all_responses, dimension_values, DIMENSION_FIELDS, MULTI_VALUED_FIELDS
+
+# Metrics a cube cell can report. Award metrics use award_amount; distinct_pis
+# counts unique principal investigator names in the cell.
+CUBE_METRICS = [
+    "count",
+    "award_sum",
+    "award_mean",
+    "award_median",
+    "direct_cost_sum",
+    "indirect_cost_sum",
+    "distinct_pis",
+]
+
+# Dimensions a cube can group by. pref_terms is left out: projects carry hundreds
+# of terms, which would make every cached portfolio several times larger.
+CUBE_DIMENSIONS = {
+    **DIMENSION_FIELDS,
+    **{k: v for k, v in MULTI_VALUED_FIELDS.items() if k != "pref_terms"},
+}
+
+# Column order of the compact rows kept in the portfolio cache. Multi-valued
+# columns hold the (value, share) pairs from dimension_values.
+PORTFOLIO_COLUMNS = ["project_num"] + list(CUBE_DIMENSIONS) + [
+    "award_amount",
+    "direct_cost_amt",
+    "indirect_cost_amt",
+]
+
+# Fields fetched once per portfolio so any cube over it can be built locally.
+PORTFOLIO_INCLUDE_FIELDS = list(dict.fromkeys(
+    [field.value for field in CUBE_DIMENSIONS.values()] + [
+        IncludeField.PROJECT_NUM.value,
+        IncludeField.AWARD_AMOUNT.value,
+        IncludeField.DIRECT_COST_AMT.value,
+        IncludeField.INDIRECT_COST_AMT.value,
+    ]
+))
+
+# Projects kept across all cached portfolios (about 1-2 KB each with PIs, spending
+# categories and IC fundings); larger portfolios are not cached at all.
+CUBE_CACHE_MAX_ROWS = int(os.getenv("REPORTER_CUBE_CACHE_ROWS", "25000"))
+
+# The cache's size limit counts len(value), which for a portfolio is its rows.
+_portfolio_cache = TTLCache(
+    max_entries=int(os.getenv("REPORTER_CUBE_CACHE_SIZE", "8")),
+    ttl=float(os.getenv("REPORTER_CUBE_CACHE_TTL", "3600")),
+    max_bytes=CUBE_CACHE_MAX_ROWS,
+)
+
+# portfolio_id -> future of the rows being downloaded, shared by concurrent calls
+_portfolio_flights = {}
+
+
+@tracer.start_as_current_span("aggregate.compact_rows")
+def compact_rows(all_results):
+    """
+    Reduce API results to tuples in PORTFOLIO_COLUMNS order.
+
+    Args:
+        all_results (dict): Cleaned API response containing grant data.
+
+    Returns:
+        list[tuple]: One tuple per project.
+    """
+
+    rows = []
+    for r in all_results.get("results", []):
+        if not isinstance(r, dict):
+            continue
+        rows.append(tuple(
+            tuple(dimension_values(r, column)) if column in MULTI_VALUED_FIELDS else r.get(column)
+            for column in PORTFOLIO_COLUMNS
+        ))
+
+    return rows
+
+
+async def get_portfolio(search_params: SearchParams):
+    """
+    Fetch the rows for a portfolio, reusing the server-side cache when possible.
+
+    Concurrent calls for the same portfolio share one download. Portfolios of
+    more than CUBE_CACHE_MAX_ROWS projects are returned but not cached.
+
+    Args:
+        search_params (SearchParams): Search parameters scoping the portfolio.
+
+    Returns:
+        tuple: (portfolio_id, list of compact rows, whether the rows came from cache
+            or another call's download)
+    """
+
+    portfolio_id = fingerprint(search_params.to_api_criteria())
+
+    rows = _portfolio_cache.get(portfolio_id)
+    if rows is not None:
+        CACHE_LOOKUPS.labels("portfolio", "hit").inc()
+        return portfolio_id, rows, True
+
+    flight = _portfolio_flights.get(portfolio_id)
+    if flight is not None:
+        try:
+            rows = await asyncio.shield(flight)
+            CACHE_LOOKUPS.labels("portfolio", "coalesced").inc()
+            return portfolio_id, rows, True
+        except Exception:
+            pass  # the other download failed or was cancelled; download for ourselves
+
+    CACHE_LOOKUPS.labels("portfolio", "miss").inc()
+
+    flight = _portfolio_flights[portfolio_id] = asyncio.get_running_loop().create_future()
+    try:
+        all_results = await get_all_responses(search_params, PORTFOLIO_INCLUDE_FIELDS)
+        rows = compact_rows(all_results)
+    except BaseException:
+        flight.set_exception(RuntimeError("Portfolio download did not complete"))
+        flight.exception()  # retrieved, even if nobody was waiting
+        raise
+    finally:
+        if _portfolio_flights.get(portfolio_id) is flight:
+            del _portfolio_flights[portfolio_id]
+
+    flight.set_result(rows)
+    if len(rows) <= CUBE_CACHE_MAX_ROWS:
+        _portfolio_cache.set(portfolio_id, rows)
+
+    return portfolio_id, rows, False
+
+
+def cached_portfolio(portfolio_id: str):
+    """
+    Rows of a cached portfolio, without ever calling the API.
+
+    Args:
+        portfolio_id (str): portfolio_id returned by get_portfolio_cube.
+
+    Returns:
+        list[tuple] | None: Compact rows, or None if the portfolio is not cached (any more).
+    """
+
+    rows = _portfolio_cache.get(portfolio_id)
+    CACHE_LOOKUPS.labels("portfolio", "miss" if rows is None else "hit").inc()
+    return rows
+
+
+def row_values(row) -> dict:
+    """A compact row as {column: value}, with multi-valued columns as plain value lists."""
+
+    return {
+        column: [v for v, _ in value] if column in MULTI_VALUED_FIELDS else value
+        for column, value in zip(PORTFOLIO_COLUMNS, row)
+    }
+
+
+@tracer.start_as_current_span("aggregate.build_cube")
+def build_cube(rows, dimensions: list[str], metrics: list[str], filters: dict = None, allocation: str = "full"):
+    """
+    Aggregate portfolio rows over any number of dimensions in a single pass.
+
+    Multi-valued dimensions are exploded, so a project contributes to one cell
+    per combination of its values.
+
+    Args:
+        rows (list[tuple]): Compact rows from get_portfolio.
+        dimensions (list[str]): Dimensions to group by (keys of CUBE_DIMENSIONS).
+            An empty list rolls the whole portfolio up into one cell.
+        metrics (list[str]): Metrics to compute (see CUBE_METRICS).
+        filters (dict): Optional slice, {dimension: [allowed values]}. A project with a
+            multi-valued dimension is kept if any of its values is allowed.
+        allocation (str): "full" or "split" attribution of amounts across the values
+            of multi-valued dimensions (see reporter.utils.ALLOCATIONS).
+
+    Returns:
+        list[dict]: One dict per non-empty cell with the dimension values and metrics,
+            sorted by dimension values.
+    """
+
+    dim_idx = [PORTFOLIO_COLUMNS.index(d) for d in dimensions]
+    multi = [d in MULTI_VALUED_FIELDS for d in dimensions]
+    filter_idx = [
+        (PORTFOLIO_COLUMNS.index(d), d in MULTI_VALUED_FIELDS, {str(v) for v in values})
+        for d, values in (filters or {}).items()
+    ]
+    award_idx = PORTFOLIO_COLUMNS.index("award_amount")
+    direct_idx = PORTFOLIO_COLUMNS.index("direct_cost_amt")
+    indirect_idx = PORTFOLIO_COLUMNS.index("indirect_cost_amt")
+    pi_idx = PORTFOLIO_COLUMNS.index("principal_investigators")
+
+    split = allocation == "split"
+    want_median = "award_median" in metrics
+    want_pis = "distinct_pis" in metrics
+
+    cells = {}
+    for row in rows:
+        if not all(
+            any(str(v) in allowed for v, _ in row[i]) if is_multi else str(row[i]) in allowed
+            for i, is_multi, allowed in filter_idx
+        ):
+            continue
+
+        values = [
+            row[i] if is_multi else ([(row[i], 1.0)] if row[i] else [])
+            for i, is_multi in zip(dim_idx, multi)
+        ]
+
+        award = row[award_idx]
+        for combo in product(*values):
+            key = tuple(v for v, _ in combo)
+            share = 1
+            if split:
+                for _, s in combo:
+                    share *= s
+
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {
+                    "count": 0, "award_sum": 0, "award_n": 0,
+                    "direct_cost_sum": 0, "indirect_cost_sum": 0,
+                    "awards": [], "pis": set(),
+                }
+
+            cell["count"] += 1
+            if award is not None:
+                cell["award_sum"] += award * share
+                cell["award_n"] += 1
+                if want_median:
+                    cell["awards"].append(award * share)
+            cell["direct_cost_sum"] += (row[direct_idx] or 0) * share
+            cell["indirect_cost_sum"] += (row[indirect_idx] or 0) * share
+            if want_pis:
+                cell["pis"].update(pi for pi, _ in row[pi_idx])
+
+    cube = []
+    for key in sorted(cells, key=lambda k: tuple(str(v) for v in k)):
+        cell = cells[key]
+        values = {
+            "count": cell["count"],
+            "award_sum": cell["award_sum"],
+            "award_mean": cell["award_sum"] / cell["award_n"] if cell["award_n"] else 0,
+            "award_median": statistics.median(cell["awards"]) if cell["awards"] else 0,
+            "direct_cost_sum": cell["direct_cost_sum"],
+            "indirect_cost_sum": cell["indirect_cost_sum"],
+            "distinct_pis": len(cell["pis"]),
+        }
+        entry = dict(zip(dimensions, key))
+        entry.update({m: values[m] for m in metrics})
+        cube.append(entry)
+
+    return cube
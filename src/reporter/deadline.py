@@ -0,0 +1,88 @@
+import os
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds a call to one of PARTIAL_RESULT_TOOLS may run before its upstream requests
+# are cut off and it returns partial results. 0 disables.
+TOOL_DEADLINE = float(os.getenv("REPORTER_TOOL_DEADLINE", "120"))
+
+# Tools that aggregate page by page and can return partial results at a deadline.
+# Other tools only get a deadline when the caller asks for one, since they would fail.
+PARTIAL_RESULT_TOOLS = {
+    "get_search_summary",
+    "get_portfolio_crosstab",
+    "get_portfolio_distribution",
+}
+
+# Request header a client can send to give its calls a shorter deadline, in seconds.
+DEADLINE_HEADER = "x-reporter-deadline"
+
+# Timeout for any single upstream request, within or without a deadline.
+UPSTREAM_TIMEOUT = float(os.getenv("REPORTER_UPSTREAM_TIMEOUT", "60"))
+
+# time.monotonic() by which the current tool call must finish, if any.
+_deadline = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The tool call's deadline passed before an upstream request could complete."""
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """
+    Give the work inside the block a deadline `seconds` from now.
+
+    An enclosing deadline that is sooner still applies. None or 0 leaves the
+    enclosing deadline, if any, unchanged.
+    """
+
+    current = _deadline.get()
+    if seconds:
+        new = time.monotonic() + seconds
+        current = new if current is None else min(current, new)
+
+    token = _deadline.set(current)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or None if there is none."""
+
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def upstream_timeout() -> float:
+    """Timeout for the next upstream request: UPSTREAM_TIMEOUT, cut short by the deadline."""
+
+    left = remaining()
+    return UPSTREAM_TIMEOUT if left is None else max(0.1, min(UPSTREAM_TIMEOUT, left))
+
+
+async def within_deadline(awaitable):
+    """
+    Await `awaitable`, cancelling it when the current deadline passes.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first (or already has).
+    """
+
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        awaitable.close()
+        raise DeadlineExceeded("Tool deadline reached before the request was sent")
+
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except TimeoutError:
+        if remaining() > 0:
+            raise
+        raise DeadlineExceeded(f"Tool deadline reached after waiting {left:.1f}s for NIH RePORTER")
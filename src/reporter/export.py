@@ -0,0 +1,248 @@
+import os
+import csv
+import json
+import time
+import tempfile
+from datetime import datetime, timezone
+from reporter.models import SearchParams
+from reporter.cache import fingerprint
+from reporter.utils import iter_pages, record_keys
+
+# Directory for exported result sets, served as reporter://exports/{name} resources.
+EXPORT_DIR = os.getenv(
+    "REPORTER_EXPORT_DIR",
+    os.path.join(tempfile.gettempdir(), "reporter-exports"),
+)
+
+# Exports are deleted after this many seconds...
+EXPORT_RETENTION = float(os.getenv("REPORTER_EXPORT_RETENTION", str(24 * 3600)))
+
+# ...or once there are more than this many, oldest first.
+EXPORT_MAX_FILES = int(os.getenv("REPORTER_EXPORT_MAX_FILES", "20"))
+
+EXPORT_FORMATS = ["csv", "ndjson", "parquet"]
+
+EXPORT_URI_PREFIX = "reporter://exports/"
+
+
+def column_type(value) -> str:
+    """Schema type of one record value; nested values are exported as JSON text."""
+
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, (dict, list)):
+        return "json"
+    return "string"
+
+
+def infer_schema(include_fields: list[str], records: list[dict]) -> dict:
+    """
+    Columns and their types: one column per record key of the include fields, in
+    their order, typed from the values in a page of records.
+
+    Columns that are missing or null throughout the page are typed "string"; an
+    integer column with any fractional values is typed "number".
+    """
+
+    schema = dict.fromkeys(key for field in include_fields for key in record_keys(field))
+    for record in records:
+        for key in schema:
+            value = record.get(key)
+            seen = schema[key]
+            if value is None:
+                continue
+            if seen is None:
+                schema[key] = column_type(value)
+            elif seen == "integer" and column_type(value) == "number":
+                schema[key] = "number"
+
+    return {key: t or "string" for key, t in schema.items()}
+
+
+def flat_value(value, type_: str):
+    """
+    A record value as written to CSV and Parquet columns.
+
+    Values are converted to the column type, since the schema comes from the
+    first page and later pages may hold other types (e.g. numbers in a column
+    that was null on the first page).
+    """
+
+    if value is None:
+        return None
+    if type_ == "json" or isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if type_ == "number":
+        return float(value)
+    if type_ == "integer" and isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type_ == "string" and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+class CsvWriter:
+    def __init__(self, path, schema):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.schema = schema
+        self.writer.writerow(schema)
+
+    def write(self, records):
+        self.writer.writerows(
+            [flat_value(r.get(key), t) for key, t in self.schema.items()]
+            for r in records
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class NdjsonWriter:
+    def __init__(self, path, schema):
+        self.file = open(path, "w", encoding="utf-8")
+        self.schema = schema
+
+    def write(self, records):
+        self.file.writelines(
+            json.dumps({**dict.fromkeys(self.schema), **r}, separators=(",", ":")) + "\n"
+            for r in records
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each page as a Parquet row group (requires pyarrow, see the parquet extra)."""
+
+    def __init__(self, path, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {"boolean": pa.bool_(), "integer": pa.int64(), "number": pa.float64()}
+        self.pa = pa
+        self.schema = schema
+        self.arrow_schema = pa.schema([(key, arrow_types.get(t, pa.string())) for key, t in schema.items()])
+        self.writer = pq.ParquetWriter(path, self.arrow_schema)
+
+    def write(self, records):
+        columns = {key: [flat_value(r.get(key), t) for r in records] for key, t in self.schema.items()}
+        self.writer.write_table(self.pa.table(columns, schema=self.arrow_schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "ndjson": NdjsonWriter, "parquet": ParquetWriter}
+
+
+def prune_exports():
+    """Delete exports older than EXPORT_RETENTION and all but the newest EXPORT_MAX_FILES."""
+
+    if not os.path.isdir(EXPORT_DIR):
+        return
+
+    now = time.time()
+    paths = sorted(
+        (os.path.join(EXPORT_DIR, f) for f in os.listdir(EXPORT_DIR) if not f.endswith(".tmp")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for i, path in enumerate(paths):
+        if i >= EXPORT_MAX_FILES or now - os.path.getmtime(path) > EXPORT_RETENTION:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def export_path(name: str) -> str | None:
+    """Path of an export by name, or None if it does not exist (or has expired)."""
+
+    if os.path.basename(name) != name or name.endswith(".tmp"):
+        return None
+    path = os.path.join(EXPORT_DIR, name)
+    if not os.path.isfile(path) or time.time() - os.path.getmtime(path) > EXPORT_RETENTION:
+        return None
+    return path
+
+
+def read_export(path: str, start: int = 0, end: int | None = None) -> bytes:
+    """Bytes start (inclusive) to end (exclusive) of an export file, reading only that range."""
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(-1 if end is None else max(0, end - start))
+
+
+async def export_results(search_params: SearchParams, include_fields: list[str], format: str = "csv") -> dict:
+    """
+    Stream every matching project to a file in EXPORT_DIR, one page at a time.
+
+    Only the current page is held in memory. Columns come from include_fields,
+    so every requested field has a column even if a page leaves it out (it is
+    then null); column types are taken from the first page.
+
+    Args:
+        search_params (SearchParams): Search parameters to export.
+        include_fields (list[str]): Fields to return from the API.
+        format (str): One of EXPORT_FORMATS.
+
+    Returns:
+        dict: uri, name, format, rows, bytes, schema and expires_at of the export
+    """
+
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format '{format}'. Valid options: {EXPORT_FORMATS}")
+    if format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow (install the 'parquet' extra); use csv or ndjson")
+
+    prune_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+    created = datetime.now(timezone.utc)
+    key = fingerprint({"criteria": search_params.to_api_criteria(), "include_fields": include_fields})
+    name = f"{created.strftime('%Y%m%dT%H%M%S')}-{key[:12]}.{format}"
+    path = os.path.join(EXPORT_DIR, name)
+    tmp_path = f"{path}.tmp"
+
+    writer = None
+    schema = {}
+    rows = 0
+    try:
+        # bulk downloads bypass the response cache so they don't evict pages users will reuse
+        async for _, page in iter_pages(search_params, include_fields, use_cache=False):
+            records = [r for r in page.get("results", []) if isinstance(r, dict)]
+            if writer is None:
+                schema = infer_schema(include_fields, records)
+                writer = WRITERS[format](tmp_path, schema)
+            writer.write(records)
+            rows += len(records)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, path)
+    print(f"Exported {rows} projects to {path}")
+
+    return {
+        "uri": EXPORT_URI_PREFIX + name,
+        "name": name,
+        "format": format,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "schema": schema,
+        "expires_at": datetime.fromtimestamp(created.timestamp() + EXPORT_RETENTION, timezone.utc).isoformat(),
+    }
@@ -0,0 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager
+from fastmcp import FastMCP
+from reporter.warmup import run_cache_warmer, WARM_TOP_N
+from reporter.baseline import run_baseline_refresher, BASELINE_ENABLED
+from reporter.workload import flush_workload
+from reporter.metrics import mark_process_dead
+from reporter.readiness import monitor_loop_lag
+from reporter.transport import close_http_client
+
+
+@asynccontextmanager
+async def lifespan(mcp: FastMCP):
+    """Start background tasks with the server and stop them on shutdown."""
+
+    tasks = [asyncio.create_task(monitor_loop_lag())]
+    if WARM_TOP_N > 0:
+        tasks.append(asyncio.create_task(run_cache_warmer()))
+    if BASELINE_ENABLED:
+        tasks.append(asyncio.create_task(run_baseline_refresher()))
+
+    try:
+        yield {}
+    finally:
+        for task in tasks:
+            task.cancel()
+        flush_workload()
+        mark_process_dead()
+        await close_http_client()
@@ -0,0 +1,148 @@
+import os
+from collections import Counter
+from reporter.cache import TTLCache
+from reporter.models import SearchParams, ProjectNum, IncludeField
+from reporter.metrics import CACHE_LOOKUPS
+from reporter.similarity import core_project_num
+from reporter.utils import get_all_responses
+
+# Core project numbers one get_project_lineage call may resolve.
+LINEAGE_MAX_CORES = int(os.getenv("REPORTER_LINEAGE_MAX_CORES", "50"))
+
+# Award types that mark a lineage event (see models.ApplicationType).
+RENEWAL_TYPES = {"2"}
+SUPPLEMENT_TYPES = {"3"}
+
+LINEAGE_INCLUDE_FIELDS = [
+    IncludeField.PROJECT_NUM.value,
+    IncludeField.CORE_PROJECT_NUM.value,
+    IncludeField.FISCAL_YEAR.value,
+    IncludeField.AWARD_TYPE.value,
+    IncludeField.ACTIVITY_CODE.value,
+    IncludeField.AWARD_AMOUNT.value,
+    IncludeField.PROJECT_TITLE.value,
+    IncludeField.ORGANIZATION.value,
+    IncludeField.PRINCIPAL_INVESTIGATORS.value,
+]
+
+# Every fiscal year of a grant, keyed by core project number.
+_lineage_cache = TTLCache(
+    max_entries=int(os.getenv("REPORTER_LINEAGE_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("REPORTER_LINEAGE_CACHE_TTL", "3600")),
+)
+
+
+def compact_project(record: dict) -> dict:
+    return {
+        "project_num": record.get("project_num"),
+        "fiscal_year": record.get("fiscal_year"),
+        "award_type": record.get("award_type"),
+        "activity_code": record.get("activity_code"),
+        "award_amount": record.get("award_amount") or 0,
+        "project_title": record.get("project_title"),
+        "org_name": record.get("org_name"),
+        "principal_investigators": record.get("principal_investigators") or [],
+    }
+
+
+async def get_lineages(project_nums: list[str]):
+    """
+    Every fiscal year, supplement and renewal of each grant, from cache or in one batched search.
+
+    Grants not in the cache are fetched together with one project_nums wildcard per
+    core project number; grants with no projects are cached as empty too.
+
+    Args:
+        project_nums (list[str]): Core or full project numbers (e.g. 'R01CA123456' or '5R01CA123456-05').
+
+    Returns:
+        tuple: ({core project number: compact projects sorted by fiscal year}, number fetched from the API)
+    """
+
+    cores = list(dict.fromkeys(core_project_num({"project_num": ProjectNum(project_num=p).project_num}) for p in project_nums))
+    if len(cores) > LINEAGE_MAX_CORES:
+        raise ValueError(f"Too many grants ({len(cores)}); at most {LINEAGE_MAX_CORES} can be resolved per call")
+
+    lineages = {}
+    missing = []
+    for core in cores:
+        projects = _lineage_cache.get(core)
+        CACHE_LOOKUPS.labels("lineage", "miss" if projects is None else "hit").inc()
+        if projects is None:
+            missing.append(core)
+        else:
+            lineages[core] = projects
+
+    if missing:
+        search_params = SearchParams(project_nums=[ProjectNum(project_num=f"*{core}*") for core in missing])
+        all_results = await get_all_responses(search_params, LINEAGE_INCLUDE_FIELDS)
+
+        # the wildcards can match longer serial numbers, so group by the core number itself
+        fetched = {core: [] for core in missing}
+        for record in all_results["results"]:
+            core = core_project_num(record)
+            if core in fetched:
+                fetched[core].append(compact_project(record))
+
+        for core, projects in fetched.items():
+            projects.sort(key=lambda p: (p["fiscal_year"] or 0, p["project_num"] or ""))
+            _lineage_cache.set(core, projects)
+            lineages[core] = projects
+
+    return {core: lineages[core] for core in cores}, len(missing)
+
+
+def build_timeline(projects: list[dict], include_projects: bool = True) -> dict:
+    """
+    Summarize one grant's lineage as a per-fiscal-year funding timeline.
+
+    Args:
+        projects (list[dict]): Compact projects from get_lineages.
+        include_projects (bool): Whether to list each year's projects in the timeline.
+
+    Returns:
+        dict: Lineage summary with a timeline of {fiscal_year, award_amount, ...} entries
+    """
+
+    years = {}
+    for p in projects:
+        year = years.setdefault(p["fiscal_year"], {"fiscal_year": p["fiscal_year"], "award_amount": 0, "project_count": 0, "projects": []})
+        year["award_amount"] += p["award_amount"]
+        year["project_count"] += 1
+        year["projects"].append({k: p[k] for k in ("project_num", "award_type", "activity_code", "award_amount")})
+
+    timeline = list(years.values())
+    if not include_projects:
+        for year in timeline:
+            del year["projects"]
+
+    latest = projects[-1] if projects else {}
+    pis = Counter(pi for p in projects for pi in p["principal_investigators"])
+    return {
+        "project_title": latest.get("project_title"),
+        "activity_codes": list(dict.fromkeys(p["activity_code"] for p in projects if p["activity_code"])),
+        "first_fiscal_year": projects[0]["fiscal_year"] if projects else None,
+        "last_fiscal_year": latest.get("fiscal_year"),
+        "total_award_amount": sum(p["award_amount"] for p in projects),
+        "renewals": sum(1 for p in projects if p["award_type"] in RENEWAL_TYPES),
+        "supplements": sum(1 for p in projects if p["award_type"] in SUPPLEMENT_TYPES),
+        "organizations": list(dict.fromkeys(p["org_name"] for p in projects if p["org_name"])),
+        "principal_investigators": [pi for pi, _ in pis.most_common()],
+        "timeline": timeline,
+    }
+
+
+def rollup(lineages: dict) -> list[dict]:
+    """Funding and grant counts per fiscal year across several lineages."""
+
+    years = {}
+    for core, projects in lineages.items():
+        for p in projects:
+            year = years.setdefault(p["fiscal_year"], {"fiscal_year": p["fiscal_year"], "award_amount": 0, "grants": set()})
+            year["award_amount"] += p["award_amount"]
+            year["grants"].add(core)
+
+    return [
+        {"fiscal_year": y["fiscal_year"], "award_amount": y["award_amount"], "grant_count": len(y["grants"])}
+        for y in sorted(years.values(), key=lambda y: y["fiscal_year"] or 0)
+    ]
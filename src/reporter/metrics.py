@@ -0,0 +1,128 @@
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    REGISTRY,
+)
+
+# With several uvicorn workers, every worker writes its samples to this directory and
+# /metrics aggregates them. It must exist and be emptied before the workers start
+# (see Procfile / manifest.yaml).
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Buckets for per-call counts such as pages per tool call.
+_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+TOOL_CALLS = Counter(
+    "reporter_tool_calls_total",
+    "MCP tool calls, by tool and outcome (ok, error).",
+    ["tool", "status"],
+)
+
+TOOL_LATENCY = Histogram(
+    "reporter_tool_duration_seconds",
+    "Wall time of MCP tool calls.",
+    ["tool"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+TOOL_PAGES = Histogram(
+    "reporter_tool_pages",
+    "RePORTER result pages (cached or fetched) read per tool call.",
+    ["tool"],
+    buckets=_COUNT_BUCKETS,
+)
+
+TOOL_RECORDS = Counter(
+    "reporter_records_total",
+    "Project records processed, by tool.",
+    ["tool"],
+)
+
+TOOLS_IN_PROGRESS = Gauge(
+    "reporter_tool_calls_in_progress",
+    "MCP tool calls currently running.",
+    multiprocess_mode="livesum",
+)
+
+UPSTREAM_REQUESTS = Counter(
+    "reporter_upstream_requests_total",
+    "Requests to the NIH RePORTER API, by HTTP status code ('error' if no response).",
+    ["status"],
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "reporter_upstream_duration_seconds",
+    "Latency of NIH RePORTER API requests, excluding time queued for a slot.",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+UPSTREAM_BYTES = Counter(
+    "reporter_upstream_bytes_total",
+    "Response bytes received from the NIH RePORTER API.",
+)
+
+UPSTREAM_IN_FLIGHT = Gauge(
+    "reporter_upstream_requests_in_flight",
+    "NIH RePORTER API requests currently in flight.",
+    multiprocess_mode="livesum",
+)
+
+UPSTREAM_QUEUED = Gauge(
+    "reporter_upstream_requests_queued",
+    "NIH RePORTER API requests waiting for a concurrency slot.",
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMIT_WAIT = Histogram(
+    "reporter_rate_limit_wait_seconds",
+    "Time requests waited for an upstream concurrency slot.",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+CACHE_LOOKUPS = Counter(
+    "reporter_cache_lookups_total",
+    "Cache lookups, by cache (response, portfolio, text_index) and result (hit, revalidate, stale, coalesced, miss).",
+    ["cache", "result"],
+)
+
+
+SPILLED_BYTES = Counter(
+    "reporter_spilled_bytes_total",
+    "Bytes of API records written to disk by result sets over the memory budget.",
+)
+
+
+ADMISSION_REJECTIONS = Counter(
+    "reporter_admission_rejections_total",
+    "Heavy tool calls rejected by admission control, by tool and reason (queue_wait, session_limit).",
+    ["tool", "reason"],
+)
+
+
+def render_metrics():
+    """
+    Render every metric in the Prometheus text format.
+
+    Returns:
+        tuple: (body bytes, content type)
+    """
+
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the multiprocess directory on shutdown."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
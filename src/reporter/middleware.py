@@ -0,0 +1,188 @@
+import os
+import json
+import time
+from mcp.types import TextContent
+from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.tools.tool import ToolResult
+from reporter.utils import upstream_usage, MAX_CONCURRENT_REQUESTS
+from reporter.metrics import TOOL_CALLS, TOOL_LATENCY, TOOL_PAGES, TOOL_RECORDS, TOOLS_IN_PROGRESS
+from reporter.tracing import tracer
+from reporter.readiness import track_tool_call
+from reporter.profiling import PROFILING_ENABLED, profile_trigger, profile_call
+from reporter.admission import admit
+from reporter.deadline import deadline, TOOL_DEADLINE, DEADLINE_HEADER, PARTIAL_RESULT_TOOLS
+
+# Add each tool call's upstream usage to its result, so clients such as the eval
+# runner can compare what answers cost. Off by default to keep results compact.
+REPORT_USAGE = os.getenv("REPORTER_REPORT_USAGE", "0") == "1"
+
+
+def annotate(result: ToolResult, notice: dict) -> ToolResult:
+    """
+    Attach a notice to a tool result without mixing it into the tool's own data.
+
+    structured_content is left as the tool returned it. The notice is merged into
+    the result's meta and also appended to content as its own JSON text block:
+    most clients (the Anthropic MCP connector among them) pass only content to
+    the model, which has to know that an answer is stale or partial, and the
+    eval runner reads upstream_usage from that block.
+    """
+
+    return ToolResult(
+        content=[*result.content, TextContent(type="text", text=json.dumps(notice))],
+        structured_content=result.structured_content,
+        meta={**(result.meta or {}), **notice},
+    )
+
+
+class TracingMiddleware(Middleware):
+    """Run every tool call in its own trace span (see reporter.tracing)."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+
+        with tracer.start_as_current_span(f"tool {tool}", attributes={"mcp.tool.name": tool}) as span:
+            with upstream_usage() as usage:
+                result = await call_next(context)
+            span.set_attributes({f"reporter.upstream_{key}": value for key, value in usage.items()})
+
+        return result
+
+
+class MetricsMiddleware(Middleware):
+    """Record Prometheus metrics for every tool call (see reporter.metrics)."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        start = time.perf_counter()
+        status = "error"
+
+        try:
+            with TOOLS_IN_PROGRESS.track_inprogress(), track_tool_call(), upstream_usage() as usage:
+                result = await call_next(context)
+            status = "ok"
+            return result
+        finally:
+            TOOL_CALLS.labels(tool, status).inc()
+            TOOL_LATENCY.labels(tool).observe(time.perf_counter() - start)
+            TOOL_PAGES.labels(tool).observe(usage["pages"])
+            TOOL_RECORDS.labels(tool).inc(usage["records"])
+
+
+class DeadlineMiddleware(Middleware):
+    """
+    Give tool calls a deadline (see reporter.deadline): REPORTER_TOOL_DEADLINE for
+    tools that can return partial results, or the X-Reporter-Deadline request
+    header for any tool, whichever is sooner.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        seconds = TOOL_DEADLINE if context.message.name in PARTIAL_RESULT_TOOLS else 0
+        try:
+            requested = float(get_http_headers().get(DEADLINE_HEADER, 0))
+        except ValueError:
+            requested = 0
+        if requested > 0:
+            seconds = min(seconds, requested) if seconds else requested
+
+        with deadline(seconds):
+            return await call_next(context)
+
+
+class AdmissionMiddleware(Middleware):
+    """Queue tool calls fairly per client session and shed heavy ones under load (see reporter.admission)."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        async with admit(context.message.name, MAX_CONCURRENT_REQUESTS):
+            return await call_next(context)
+
+
+class StaleResultMiddleware(Middleware):
+    """
+    Mark tool results that were built from stale cached RePORTER responses
+    because the API failed (see reporter.utils.search_nih_reporter).
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        with upstream_usage() as usage:
+            result = await call_next(context)
+
+        if not usage["stale"]:
+            return result
+
+        return annotate(result, {
+            "stale": True,
+            "stale_age_seconds": usage["stale_age_seconds"],
+            "stale_reason": "NIH RePORTER API request failed; some results were served from cache",
+        })
+
+
+class PartialResultMiddleware(Middleware):
+    """
+    Mark tool results that were aggregated from fewer pages than matched because
+    the tool deadline passed (see reporter.utils.iter_pages).
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        with upstream_usage() as usage:
+            result = await call_next(context)
+
+        if not usage["partial"]:
+            return result
+
+        return annotate(result, {
+            "partial": True,
+            "coverage": {
+                "pages_done": usage["pull_pages"],
+                "pages_total": usage["pull_pages_total"],
+                "fraction": round(usage["pull_pages"] / usage["pull_pages_total"], 3),
+            },
+            "partial_reason": "Tool deadline reached; results cover only the pages fetched in time",
+        })
+
+
+class UsageReportMiddleware(Middleware):
+    """Attach the upstream requests, bytes and pages behind a tool result to the result."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        with upstream_usage() as usage:
+            result = await call_next(context)
+
+        return annotate(result, {"upstream_usage": {key: usage[key] for key in ("requests", "bytes", "pages", "records")}})
+
+
+class ProfilingMiddleware(Middleware):
+    """Profile tool calls selected by REPORTER_PROFILE (see reporter.profiling)."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        trigger = profile_trigger()
+        if trigger is None:
+            return await call_next(context)
+
+        with profile_call(context.message.name, context.message.arguments or {}, trigger) as profile:
+            result = await call_next(context)
+
+        if profile.summary is None:
+            return result
+
+        return annotate(result, {"profile": {
+            "name": profile.summary["name"],
+            "seconds": profile.summary["seconds"],
+            "peak_memory_bytes": profile.summary["peak_memory_bytes"],
+        }})
+
+
+def register_middleware(mcp: FastMCP):
+    mcp.add_middleware(TracingMiddleware())
+    mcp.add_middleware(MetricsMiddleware())
+    mcp.add_middleware(DeadlineMiddleware())
+    mcp.add_middleware(AdmissionMiddleware())
+    mcp.add_middleware(StaleResultMiddleware())
+    mcp.add_middleware(PartialResultMiddleware())
+    if REPORT_USAGE:
+        mcp.add_middleware(UsageReportMiddleware())
+    # registered only when enabled, so unprofiled deployments pay nothing for it
+    if PROFILING_ENABLED:
+        mcp.add_middleware(ProfilingMiddleware())
@@ -352,7 +352,9 @@ class ApplicationType(str, Enum):
     COMPETING_EXTENSION = "4C"
     NONCOMPETING_EXTENSION = "4N"
     NONCOMPETING_CONTINUATION = "5"
+    CHANGE_OF_ORGANIZATION_STATUS = "6"
     CHANGE_OF_INSTITUTION = "7"
+    NONCOMPETING_CHANGE_OF_IC = "8"
     CHANGE_OF_DIVISION = "9"
 
 
@@ -368,6 +370,7 @@ class SearchParams(BaseModel):
     advanced_text_search: Optional[AdvancedTextSearch] = Field(None, description="text search string and search parameters")
     years: Optional[List[int]] = Field(None, description="List of fiscal years where projects are active (e.g. [2023, 2024])")
     agencies: Optional[List[NIHAgency]] = Field([NIHAgency.NIH], description="the agency providing funding for the grant")
+    is_agency_admin: Optional[bool] = Field(None, description="If true, match agencies against the administering institute only (not co-funding institutes)")
     organizations: Optional[List[str]] = Field(None, description="List of organization names who received funding (e.g. ['Johns Hopkins University'])")
     pi_name: Optional[str] = Field(None, description="Name of the grant's principal investigator (e.g. 'Allyson Sgro')")
     po_names: Optional[List[POName]] = Field(None, description="List of program officer name criteria to filter by (e.g. [{'any_name': 'Smith'}])")
@@ -409,6 +412,8 @@ class SearchParams(BaseModel):
             criteria["fiscal_years"] = self.years
         if self.agencies:
             criteria["agencies"] = [a.value if hasattr(a, 'value') else a for a in self.agencies]
+        if self.is_agency_admin:
+            criteria["is_agency_admin"] = True
         if self.organizations:
             criteria["org_names"] = self.organizations
         if self.pi_name:
@@ -0,0 +1,223 @@
+import os
+import io
+import json
+import hmac
+import time
+import random
+import pstats
+import cProfile
+import tracemalloc
+import tempfile
+from datetime import datetime, timezone
+from fastmcp.server.dependencies import get_http_headers
+
+# When tool calls are profiled:
+#   off    - never; no profiling code runs at all
+#   header - calls whose HTTP request carries PROFILE_HEADER with PROFILE_TOKEN
+#   sample - a random PROFILE_SAMPLE_RATE fraction of calls, plus header requests
+#   always - every call
+PROFILE_MODE = os.getenv("REPORTER_PROFILE", "off").lower()
+
+PROFILE_MODES = ["off", "header", "sample", "always"]
+
+# Fraction of tool calls profiled in sample mode.
+PROFILE_SAMPLE_RATE = float(os.getenv("REPORTER_PROFILE_SAMPLE_RATE", "0.01"))
+
+# Request header that asks for a profile of the tool call it carries, and that
+# authorizes the /profiles routes; its value must be PROFILE_TOKEN.
+PROFILE_HEADER = "x-reporter-profile"
+
+# Shared secret for PROFILE_HEADER. Profiling slows the whole process and profiles
+# reveal what callers ran, so without a token no request can trigger a profile
+# or read one.
+PROFILE_TOKEN = os.getenv("REPORTER_PROFILE_TOKEN", "")
+
+# Directory for profile artifacts: a cProfile stats file and a JSON summary per call.
+PROFILE_DIR = os.getenv(
+    "REPORTER_PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "reporter-profiles"),
+)
+
+# Number of profiles kept; older ones are deleted as new ones are saved.
+PROFILE_KEEP = int(os.getenv("REPORTER_PROFILE_KEEP", "50"))
+
+# Functions listed in each profile summary, by cumulative time.
+PROFILE_TOP_FUNCTIONS = 25
+
+if PROFILE_MODE not in PROFILE_MODES:
+    raise ValueError(f"Invalid REPORTER_PROFILE '{PROFILE_MODE}'. Valid options: {PROFILE_MODES}")
+if PROFILE_MODE == "header" and not PROFILE_TOKEN:
+    raise ValueError("REPORTER_PROFILE=header requires REPORTER_PROFILE_TOKEN")
+
+PROFILING_ENABLED = PROFILE_MODE != "off"
+
+# Only one profiler can be active per process, so calls overlapping a profiled one run unprofiled
+_active = False
+
+
+def authorized(headers: dict) -> bool:
+    """Whether a request's headers carry PROFILE_TOKEN in PROFILE_HEADER (never, without a token)."""
+
+    supplied = headers.get(PROFILE_HEADER, "")
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+def profile_trigger() -> str | None:
+    """
+    Why the current tool call should be profiled, or None if it should not.
+
+    Returns:
+        str | None: "always", "header" or "sample"
+    """
+
+    if PROFILE_MODE == "always":
+        return "always"
+    if authorized(get_http_headers()):
+        return "header"
+    if PROFILE_MODE == "sample" and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+class profile_call:
+    """
+    Context manager that profiles the enclosed tool call with cProfile and
+    tracemalloc, then saves the profile under PROFILE_DIR.
+
+    Profiles record the names of the call's arguments, not their values, since
+    any holder of PROFILE_TOKEN can read every caller's profiles.
+
+    cProfile is deterministic and sees this thread only: other tasks that run
+    on the event loop while the call awaits are included, and time spent waiting
+    on upstream requests (async httpx calls) shows up in the event loop's select.
+
+    Attributes:
+        profiled (bool): False if another profile was already running.
+        summary (dict | None): The saved summary, once the block exits.
+    """
+
+    def __init__(self, tool: str, arguments: dict, trigger: str):
+        self.tool = tool
+        self.argument_names = sorted(arguments)
+        self.trigger = trigger
+        self.profiled = False
+        self.summary = None
+
+    def __enter__(self):
+        global _active
+        if _active:
+            return self
+        _active = self.profiled = True
+
+        # leave tracemalloc alone if something else (such as bench/) is already tracing
+        self.owns_tracemalloc = not tracemalloc.is_tracing()
+        if self.owns_tracemalloc:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        if not self.profiled:
+            return False
+
+        self.profiler.disable()
+        seconds = time.perf_counter() - self.start
+        _, peak = tracemalloc.get_traced_memory()
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+        _active = False
+
+        try:
+            self.summary = save_profile(self, seconds, peak, error=repr(exc) if exc else None)
+            print(f"Profiled {self.tool} in {seconds:.2f}s (peak {peak / 1e6:.1f} MB): {self.summary['name']}")
+        except OSError as e:
+            print(f"Could not save profile of {self.tool}: {e}")
+
+        return False
+
+
+def save_profile(call: profile_call, seconds: float, peak_bytes: int, error: str | None = None) -> dict:
+    """Write the stats file and JSON summary for one profiled call, then prune old profiles."""
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{call.started_at.strftime('%Y%m%dT%H%M%S%f')}-{call.tool}-{os.getpid()}"
+
+    stats_path = os.path.join(PROFILE_DIR, f"{name}.prof")
+    call.profiler.dump_stats(stats_path)
+
+    top = io.StringIO()
+    pstats.Stats(call.profiler, stream=top).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+    summary = {
+        "name": name,
+        "tool": call.tool,
+        "argument_names": call.argument_names,
+        "trigger": call.trigger,
+        "started_at": call.started_at.isoformat(),
+        "seconds": round(seconds, 4),
+        "peak_memory_bytes": peak_bytes,
+        "error": error,
+        "stats_file": os.path.basename(stats_path),
+        "top_functions": top.getvalue(),
+    }
+
+    with open(os.path.join(PROFILE_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+
+    prune_profiles()
+    return summary
+
+
+def prune_profiles():
+    """Delete all but the newest PROFILE_KEEP profiles."""
+
+    names = sorted(f[:-5] for f in os.listdir(PROFILE_DIR) if f.endswith(".json"))
+    for name in names[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else names:
+        for suffix in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 20) -> list[dict]:
+    """
+    Summaries of the most recent profiles, newest first, without their function listings.
+
+    Args:
+        limit (int): Maximum number of profiles to return.
+
+    Returns:
+        list[dict]: One summary per profile.
+    """
+
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for f in sorted((f for f in os.listdir(PROFILE_DIR) if f.endswith(".json")), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(PROFILE_DIR, f), encoding="utf-8") as fh:
+                summary = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        summary.pop("top_functions", None)
+        profiles.append(summary)
+
+    return profiles
+
+
+def profile_file(name: str) -> str | None:
+    """Path of a saved profile artifact by file name, or None if there is no such file."""
+
+    if os.path.basename(name) != name or not name.endswith((".json", ".prof")):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
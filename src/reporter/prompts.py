@@ -19,6 +19,9 @@ def register_prompts(mcp):
 
             3. Use find_project_ids to get the list of project IDs for detailed queries
                - Returns up to 500 project IDs matching the search criteria
+               - For "grants like this one", use find_similar_projects with the project IDs instead
+                 of several keyword searches
+               - For the funding history of a grant across years, use get_project_lineage
 
             4. Use get_project_information with only the IncludeFields needed to answer the query:
                - For funding questions: AWARD_AMOUNT, FISCAL_YEAR, DIRECT_COST_AMT, INDIRECT_COST_AMT
@@ -26,6 +29,8 @@ def register_prompts(mcp):
                - For organization questions: ORGANIZATION, CONG_DIST, ORGANIZATION_TYPE
                - For grant type questions: ACTIVITY_CODE, FUNDING_MECHANISM, AGENCY_IC_ADMIN
                - Always include PROJECT_NUM for reference
+               - If the user wants the full list of thousands of projects, use export_projects instead:
+                 it writes them to a CSV/NDJSON/Parquet file and returns a reporter://exports/ resource URI
 
             5. Use the returned information to answer the user's question."""
 
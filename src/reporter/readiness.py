@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+
+# /ready fails when any signal crosses its threshold. Signals are per worker process,
+# so the platform router sheds load from the workers that are actually saturated.
+MAX_IN_FLIGHT_TOOLS = int(os.getenv("REPORTER_READY_MAX_IN_FLIGHT", "32"))
+MAX_QUEUED_UPSTREAM = int(os.getenv("REPORTER_READY_MAX_QUEUED", "64"))
+MAX_UPSTREAM_P95 = float(os.getenv("REPORTER_READY_MAX_P95_SECONDS", "30"))
+MAX_UPSTREAM_ERROR_RATE = float(os.getenv("REPORTER_READY_MAX_ERROR_RATE", "0.5"))
+MAX_LOOP_LAG = float(os.getenv("REPORTER_READY_MAX_LOOP_LAG_SECONDS", "1"))
+MAX_CACHE_MB = float(os.getenv("REPORTER_READY_MAX_CACHE_MB", "0"))  # 0: no limit
+
+# Upstream latency and error rate are computed over requests from the last this many seconds.
+UPSTREAM_WINDOW = float(os.getenv("REPORTER_READY_WINDOW_SECONDS", "300"))
+
+# Latency and error thresholds only apply once the window holds this many requests.
+MIN_UPSTREAM_SAMPLES = 10
+
+# Seconds between event loop lag probes.
+LOOP_LAG_INTERVAL = 0.5
+
+_state = {"tool_calls": 0, "queued_upstream": 0, "loop_lag": 0.0}
+
+# (completed at, latency seconds, succeeded) for recent upstream requests.
+_upstream_samples = deque()
+
+
+@contextmanager
+def track_tool_call():
+    """Count a tool call as in flight for the duration of the block."""
+    _state["tool_calls"] += 1
+    try:
+        yield
+    finally:
+        _state["tool_calls"] -= 1
+
+
+@contextmanager
+def track_upstream_queue():
+    """Count an upstream request as queued for the duration of the block."""
+    _state["queued_upstream"] += 1
+    try:
+        yield
+    finally:
+        _state["queued_upstream"] -= 1
+
+
+def record_upstream(latency: float, ok: bool):
+    """Record the outcome of one upstream request."""
+    now = time.monotonic()
+    _upstream_samples.append((now, latency, ok))
+    while _upstream_samples and _upstream_samples[0][0] < now - UPSTREAM_WINDOW:
+        _upstream_samples.popleft()
+
+
+def estimated_upstream_wait(slots: int) -> float:
+    """
+    Seconds a new upstream request can expect to queue: the requests ahead of it,
+    served `slots` at a time at the recent mean latency.
+
+    Returns 0 until the window holds MIN_UPSTREAM_SAMPLES requests.
+    """
+
+    cutoff = time.monotonic() - UPSTREAM_WINDOW
+    latencies = [latency for completed, latency, _ in _upstream_samples if completed >= cutoff]
+    if len(latencies) < MIN_UPSTREAM_SAMPLES:
+        return 0.0
+    return _state["queued_upstream"] / max(1, slots) * (sum(latencies) / len(latencies))
+
+
+async def monitor_loop_lag():
+    """Measure how late the event loop wakes up from a short sleep, forever."""
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        _state["loop_lag"] = max(0.0, time.monotonic() - start - LOOP_LAG_INTERVAL)
+
+
+def readiness_report(cache_bytes: int):
+    """
+    Collect this worker's load signals and compare them with the thresholds.
+
+    Args:
+        cache_bytes (int): Memory held by the response cache.
+
+    Returns:
+        tuple: (whether the worker is ready, report dict with each signal and the
+            reasons it is not ready)
+    """
+
+    cutoff = time.monotonic() - UPSTREAM_WINDOW
+    samples = [s for s in _upstream_samples if s[0] >= cutoff]
+    latencies = sorted(latency for _, latency, _ in samples)
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+    error_rate = sum(not ok for _, _, ok in samples) / len(samples) if samples else None
+    cache_mb = cache_bytes / (1024 * 1024)
+
+    reasons = []
+    if _state["tool_calls"] > MAX_IN_FLIGHT_TOOLS:
+        reasons.append(f"{_state['tool_calls']} tool calls in flight (max {MAX_IN_FLIGHT_TOOLS})")
+    if _state["queued_upstream"] > MAX_QUEUED_UPSTREAM:
+        reasons.append(f"{_state['queued_upstream']} upstream requests queued (max {MAX_QUEUED_UPSTREAM})")
+    if len(samples) >= MIN_UPSTREAM_SAMPLES:
+        if p95 > MAX_UPSTREAM_P95:
+            reasons.append(f"upstream p95 latency {p95:.1f}s (max {MAX_UPSTREAM_P95:g}s)")
+        if error_rate > MAX_UPSTREAM_ERROR_RATE:
+            reasons.append(f"upstream error rate {error_rate:.0%} (max {MAX_UPSTREAM_ERROR_RATE:.0%})")
+    if _state["loop_lag"] > MAX_LOOP_LAG:
+        reasons.append(f"event loop lag {_state['loop_lag']:.2f}s (max {MAX_LOOP_LAG:g}s)")
+    if MAX_CACHE_MB and cache_mb > MAX_CACHE_MB:
+        reasons.append(f"response cache {cache_mb:.0f} MB (max {MAX_CACHE_MB:g} MB)")
+
+    report = {
+        "status": "not ready" if reasons else "ready",
+        "reasons": reasons,
+        "in_flight_tool_calls": _state["tool_calls"],
+        "queued_upstream_requests": _state["queued_upstream"],
+        "upstream_requests_in_window": len(samples),
+        "upstream_p95_seconds": round(p95, 3) if p95 is not None else None,
+        "upstream_error_rate": round(error_rate, 3) if error_rate is not None else None,
+        "event_loop_lag_seconds": round(_state["loop_lag"], 3),
+        "response_cache_mb": round(cache_mb, 1),
+        "pid": os.getpid(),
+    }
+
+    return not reasons, report
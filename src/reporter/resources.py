@@ -0,0 +1,118 @@
+import os
+import json
+import asyncio
+from fastmcp import FastMCP
+from fastmcp.exceptions import ResourceError
+from reporter.export import export_path, read_export
+from reporter.cube import cached_portfolio, row_values, PORTFOLIO_COLUMNS, MULTI_VALUED_FIELDS
+
+# Most rows one reporter://results/{handle}/rows/{start}-{end} read may return.
+MAX_RESOURCE_ROWS = int(os.getenv("REPORTER_RESOURCE_MAX_ROWS", "1000"))
+
+# Most bytes one export read may return; larger exports are read in byte ranges
+# (reporter://exports/{name}/bytes/{start}-{end}) rather than held in memory whole.
+MAX_RESOURCE_BYTES = int(os.getenv("REPORTER_RESOURCE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+def portfolio_or_error(handle: str):
+    rows = cached_portfolio(handle)
+    if rows is None:
+        raise ResourceError(
+            f"Result set '{handle}' is not cached; call get_portfolio_cube again for a new portfolio_id"
+        )
+    return rows
+
+
+def export_or_error(name: str) -> str:
+    path = export_path(name)
+    if path is None:
+        raise ResourceError(f"Export '{name}' not found or expired")
+    return path
+
+
+def register_resources(mcp: FastMCP) -> None:
+
+    # Files written by the export_projects tool
+    @mcp.resource("reporter://exports/{name}")
+    async def exported_results(name: str) -> str | bytes:
+        """
+        An exported result set: CSV or NDJSON text, or Parquet bytes.
+
+        Exports larger than REPORTER_RESOURCE_MAX_BYTES must be read in byte ranges
+        through reporter://exports/{name}/bytes/{start}-{end}. Exports expire after a
+        retention period; call export_projects again for a new one.
+        """
+
+        path = export_or_error(name)
+        size = os.path.getsize(path)
+        if size > MAX_RESOURCE_BYTES:
+            raise ResourceError(
+                f"Export '{name}' is {size} bytes, more than one read returns ({MAX_RESOURCE_BYTES}); "
+                f"read it in parts from reporter://exports/{name}/bytes/0-{MAX_RESOURCE_BYTES} onwards"
+            )
+
+        data = await asyncio.to_thread(read_export, path)
+        return data if name.endswith(".parquet") else data.decode("utf-8")
+
+    @mcp.resource("reporter://exports/{name}/bytes/{start}-{end}", mime_type="application/octet-stream")
+    async def exported_bytes(name: str, start: str, end: str) -> bytes:
+        """
+        Bytes start (inclusive) to end (exclusive) of an export, for files too large to read at once.
+
+        At most REPORTER_RESOURCE_MAX_BYTES bytes are returned per read; the export's size
+        is in the "bytes" field returned by export_projects.
+        """
+
+        path = export_or_error(name)
+        try:
+            start, end = int(start), int(end)
+        except ValueError:
+            raise ResourceError(f"Invalid byte range '{start}-{end}'; expected integers such as 0-1048576")
+        if start < 0 or end < start:
+            raise ResourceError(f"Invalid byte range '{start}-{end}'")
+
+        return await asyncio.to_thread(read_export, path, start, min(end, start + MAX_RESOURCE_BYTES))
+
+    # Slices of cached portfolios, by the portfolio_id from get_portfolio_cube.
+    # Served from the portfolio cache only; they never call the NIH RePORTER API.
+    @mcp.resource("reporter://results/{handle}/rows/{start}-{end}", mime_type="application/json")
+    def result_rows(handle: str, start: str, end: str) -> str:
+        """
+        Rows start (inclusive) to end (exclusive) of a cached portfolio, one object per project.
+
+        At most REPORTER_RESOURCE_MAX_ROWS rows are returned per read.
+        """
+
+        rows = portfolio_or_error(handle)
+        try:
+            start, end = int(start), int(end)
+        except ValueError:
+            raise ResourceError(f"Invalid row range '{start}-{end}'; expected integers such as 0-100")
+        if start < 0 or end < start:
+            raise ResourceError(f"Invalid row range '{start}-{end}'")
+        end = min(end, start + MAX_RESOURCE_ROWS, len(rows))
+
+        return json.dumps({
+            "handle": handle,
+            "total_rows": len(rows),
+            "start": start,
+            "end": max(end, start),
+            "columns": PORTFOLIO_COLUMNS,
+            "rows": [row_values(row) for row in rows[start:end]],
+        })
+
+    @mcp.resource("reporter://results/{handle}/column/{name}", mime_type="application/json")
+    def result_column(handle: str, name: str) -> str:
+        """One column of a cached portfolio, with a value per project in row order."""
+
+        rows = portfolio_or_error(handle)
+        if name not in PORTFOLIO_COLUMNS:
+            raise ResourceError(f"Invalid column '{name}'. Valid options: {PORTFOLIO_COLUMNS}")
+
+        i = PORTFOLIO_COLUMNS.index(name)
+        if name in MULTI_VALUED_FIELDS:
+            values = [[v for v, _ in row[i]] for row in rows]
+        else:
+            values = [row[i] for row in rows]
+
+        return json.dumps({"handle": handle, "column": name, "total_rows": len(rows), "values": values})
@@ -1,10 +1,46 @@
 from fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, FileResponse
+from reporter.metrics import render_metrics
+from reporter.readiness import readiness_report
+from reporter.utils import response_cache_bytes
+from reporter.profiling import PROFILING_ENABLED, authorized, list_profiles, profile_file
 
 def register_routes(mcp: FastMCP) -> None:
 
     # Health check endpoint
     @mcp.custom_route("/health", methods=["GET"])
     async def health_check(request: Request) -> JSONResponse:
-        return JSONResponse({"status": "healthy", "service": "nih-reporter-mcp-server"})
\ No newline at end of file
+        return JSONResponse({"status": "healthy", "service": "nih-reporter-mcp-server"})
+
+    # Readiness check: 503 while this worker is overloaded or RePORTER is failing
+    @mcp.custom_route("/ready", methods=["GET"])
+    async def readiness_check(request: Request) -> JSONResponse:
+        ready, report = readiness_report(response_cache_bytes())
+        return JSONResponse(report, status_code=200 if ready else 503)
+
+    # Prometheus metrics, aggregated across workers
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request) -> Response:
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+    if PROFILING_ENABLED:
+        # Recent tool call profiles saved by this instance (see reporter.profiling);
+        # both routes need X-Reporter-Profile: <REPORTER_PROFILE_TOKEN>
+        @mcp.custom_route("/profiles", methods=["GET"])
+        async def profiles(request: Request) -> JSONResponse:
+            if not authorized(request.headers):
+                return JSONResponse({"error": "Forbidden"}, status_code=403)
+            limit = int(request.query_params.get("limit", "20"))
+            return JSONResponse({"profiles": list_profiles(limit)})
+
+        # One profile artifact: <name>.prof for pstats/snakeviz, or <name>.json
+        @mcp.custom_route("/profiles/{file}", methods=["GET"])
+        async def profile_download(request: Request) -> Response:
+            if not authorized(request.headers):
+                return JSONResponse({"error": "Forbidden"}, status_code=403)
+            path = profile_file(request.path_params["file"])
+            if path is None:
+                return JSONResponse({"error": "Profile not found"}, status_code=404)
+            return FileResponse(path)
@@ -0,0 +1,206 @@
+import os
+import re
+import math
+from collections import OrderedDict
+from reporter.models import IncludeField
+from reporter.text_index import tokenize
+
+# Projects kept in the similarity index, least recently added first out. Every page
+# fetched with abstracts or terms is added as it arrives; 0 disables the index.
+SIMILARITY_MAX_DOCS = int(os.getenv("REPORTER_SIMILARITY_MAX_DOCS", "5000"))
+
+# BM25 term-frequency saturation and length normalization.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Highest-weighted features of the query projects used for ranking.
+QUERY_FEATURES = 50
+
+# Fields a project needs to be indexed and described in results.
+SIMILARITY_INCLUDE_FIELDS = [
+    IncludeField.PROJECT_NUM.value,
+    IncludeField.CORE_PROJECT_NUM.value,
+    IncludeField.FISCAL_YEAR.value,
+    IncludeField.PROJECT_TITLE.value,
+    IncludeField.ABSTRACT_TEXT.value,
+    IncludeField.PREF_TERMS.value,
+    IncludeField.ORGANIZATION.value,
+]
+
+# Words too common in abstracts to say anything about a project.
+STOPWORDS = set("""
+a about above after again all also am an and any are as at be been before being below between both but by
+can could did do does doing during each few for from further had has have having here how if in into is it
+its itself may might more most must no nor not of off on once only or other our out over own same shall
+should so some such than that the their them then there these they this those through to too under until
+up very was we were what when where which while who whom why will with within would you your
+aim aims project proposal proposed research study studies specific will using use used understanding
+""".split())
+
+# application type, then the core: activity code (e.g. R01, UG1), IC code, serial number
+_PROJECT_NUM = re.compile(r"^\d?([A-Z][0-9A-Z]{2}[A-Z]{2}\d+)")
+
+
+def core_project_num(record: dict) -> str | None:
+    """Core project number of a record, derived from project_num if it was not fetched."""
+
+    if record.get("core_project_num"):
+        return record["core_project_num"]
+    match = _PROJECT_NUM.match(record.get("project_num") or "")
+    return match.group(1) if match else record.get("project_num")
+
+
+def features(record: dict) -> list[str]:
+    """
+    Features of a project: title and abstract words, and each preferred term whole.
+
+    Preferred terms are prefixed "term:" so a concept like "Breast Cancer" is one feature.
+    """
+
+    text = f"{record.get('project_title') or ''} {record.get('abstract_text') or ''}"
+    words = [w for w in tokenize(text) if len(w) > 2 and not w.isdigit() and w not in STOPWORDS]
+    terms = record.get("pref_terms") or ""
+    return words + [f"term:{t.strip().lower()}" for t in terms.split(";") if t.strip()]
+
+
+class SimilarityIndex:
+    """
+    BM25 index over project abstracts and terms, updated one project at a time.
+
+    Each project (one per core project number, the latest fiscal year seen) is a
+    sparse vector of feature counts. Postings map each feature to {core: count},
+    so scoring a query only touches the projects that share a feature with it.
+    """
+
+    def __init__(self, max_docs: int = SIMILARITY_MAX_DOCS):
+        self.max_docs = max_docs
+        self.docs = OrderedDict()  # core -> (features, length, summary)
+        self.postings = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _remove(self, core):
+        feats, length, _ = self.docs.pop(core)
+        for f in feats:
+            posting = self.postings[f]
+            del posting[core]
+            if not posting:
+                del self.postings[f]
+        self.total_length -= length
+
+    def add(self, records):
+        """Add or update projects; records without abstract or terms are skipped."""
+
+        if self.max_docs <= 0:
+            return
+        for record in records:
+            if not isinstance(record, dict) or not (record.get("abstract_text") or record.get("pref_terms")):
+                continue
+            core = core_project_num(record)
+            if core is None:
+                continue
+            if core in self.docs:
+                if (self.docs[core][2].get("fiscal_year") or 0) > (record.get("fiscal_year") or 0):
+                    continue
+                self._remove(core)
+
+            counts = {}
+            for f in features(record):
+                counts[f] = counts.get(f, 0) + 1
+            length = sum(counts.values())
+            for f, tf in counts.items():
+                self.postings.setdefault(f, {})[core] = tf
+            summary = {
+                "project_num": record.get("project_num"),
+                "core_project_num": core,
+                "project_title": record.get("project_title"),
+                "fiscal_year": record.get("fiscal_year"),
+                "org_name": record.get("org_name"),
+            }
+            self.docs[core] = (tuple(counts), length, summary)
+            self.total_length += length
+
+            while len(self.docs) > self.max_docs:
+                self._remove(next(iter(self.docs)))
+
+    def idf(self, feature: str) -> float:
+        df = len(self.postings.get(feature, ()))
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def weight(self, feature: str, core: str) -> float:
+        """BM25 weight of a feature in one project."""
+
+        tf = self.postings.get(feature, {}).get(core, 0)
+        if not tf:
+            return 0.0
+        length = self.docs[core][1]
+        avg_length = self.total_length / len(self.docs)
+        return self.idf(feature) * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+
+    def query_vector(self, cores: list[str]) -> dict:
+        """
+        The mean BM25 vector of the given projects, cut to its QUERY_FEATURES strongest features.
+
+        Returns:
+            dict: {feature: weight}, empty if none of the projects are indexed
+        """
+
+        vector = {}
+        found = [c for c in cores if c in self.docs]
+        for core in found:
+            for f in self.docs[core][0]:
+                vector[f] = vector.get(f, 0.0) + self.weight(f, core) / len(found)
+        return dict(sorted(vector.items(), key=lambda kv: -kv[1])[:QUERY_FEATURES])
+
+    def rank(self, vector: dict, exclude=(), candidates=None, limit: int = 20) -> list[dict]:
+        """
+        Projects most similar to a query vector: the sum, over shared features, of the
+        query weight times the project's BM25 weight.
+
+        Args:
+            vector (dict): Query vector from query_vector.
+            exclude: Core project numbers to leave out (the query projects).
+            candidates: Core project numbers to rank among (default: the whole index).
+            limit (int): Number of projects to return.
+
+        Returns:
+            list[dict]: Project summaries with score and the features they share with the query
+        """
+
+        scores = {}
+        shared = {}
+        for f, q in vector.items():
+            for core in self.postings.get(f, ()):
+                if core in exclude or (candidates is not None and core not in candidates):
+                    continue
+                w = q * self.weight(f, core)
+                scores[core] = scores.get(core, 0.0) + w
+                shared.setdefault(core, []).append((w, f))
+
+        top = sorted(scores.items(), key=lambda kv: -kv[1])[:limit]
+        return [
+            {
+                **self.docs[core][2],
+                "score": round(score, 3),
+                "shared_terms": list(dict.fromkeys(display(f) for _, f in sorted(shared[core], reverse=True)))[:5],
+            }
+            for core, score in top
+        ]
+
+
+def display(feature: str) -> str:
+    return feature.removeprefix("term:")
+
+
+def search_text(vector: dict, n: int = 8) -> str:
+    """An 'or' search for the n strongest features, preferred terms as quoted phrases."""
+
+    return " ".join(
+        f'"{display(f)}"' if f.startswith("term:") else f
+        for f in list(vector)[:n]
+    )
+
+
+similarity_index = SimilarityIndex()
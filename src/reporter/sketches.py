@@ -0,0 +1,199 @@
+import math
+import random
+from bisect import bisect_right
+
+# Upper bucket edges for award amount histograms (1-2.5-5 series, in dollars).
+AWARD_HISTOGRAM_EDGES = [
+    10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+    1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000,
+]
+
+
+def percentile_key(q: float) -> str:
+    """Format a percentile as a response key, e.g. 50 -> 'p50', 99.9 -> 'p99.9'."""
+    return f"p{q:g}"
+
+
+def validate_percentiles(percentiles):
+    """
+    Check that requested percentiles are between 0 and 100.
+
+    Args:
+        percentiles (list[float]): Requested percentiles.
+
+    Raises:
+        ValueError: If any percentile is out of range.
+    """
+
+    for q in percentiles or []:
+        if not 0 <= q <= 100:
+            raise ValueError(f"Invalid percentile {q}. Percentiles must be between 0 and 100.")
+
+
+class KLLSketch:
+    """
+    Streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Keeps O(k log(n/k)) values regardless of how many are added; quantile
+    estimates have rank error of roughly 1.7/k. Sketches can be merged, so
+    per-page or per-shard sketches combine into one.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: int = None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.min = None
+        self.max = None
+        self._compactors = []
+        self._size = 0
+        self._max_size = 0
+        self._random = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, height: int) -> int:
+        depth = len(self._compactors) - height - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def _grow(self):
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+    def _compress(self):
+        for h, items in enumerate(self._compactors):
+            if len(items) >= self._capacity(h):
+                if h + 1 >= len(self._compactors):
+                    self._grow()
+                items.sort()
+                # keep every other item, starting at a random offset, at double weight
+                kept = items[self._random.random() < 0.5::2]
+                self._compactors[h + 1].extend(kept)
+                self._size += len(kept) - len(items)
+                self._compactors[h] = []
+                break
+
+    def update(self, value):
+        """Add one value to the sketch."""
+        self._compactors[0].append(value)
+        self._size += 1
+        self.n += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values):
+        """Add every value from an iterable."""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: "KLLSketch"):
+        """Fold another sketch into this one."""
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for h, items in enumerate(other._compactors):
+            self._compactors[h].extend(items)
+        self._size = sum(len(items) for items in self._compactors)
+        self.n += other.n
+        if other.n:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float):
+        """
+        Estimate the value at quantile q.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            float | None: Estimated value, or None if the sketch is empty.
+        """
+
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        weighted = sorted(
+            (value, 2 ** h)
+            for h, items in enumerate(self._compactors)
+            for value in items
+        )
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+
+        return self.max
+
+    def percentiles(self, percentiles):
+        """
+        Estimate several percentiles at once.
+
+        Args:
+            percentiles (list[float]): Percentiles between 0 and 100.
+
+        Returns:
+            dict: {"p50": value, "p90": value, ...}
+        """
+
+        return {percentile_key(q): self.quantile(q / 100) for q in percentiles}
+
+    def __len__(self):
+        return self.n
+
+
+class Histogram:
+    """Fixed-bucket histogram of award amounts; memory does not grow with the input."""
+
+    def __init__(self, edges=None):
+        self.edges = edges or AWARD_HISTOGRAM_EDGES
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def update(self, value):
+        """Add one value to the histogram."""
+        self.counts[bisect_right(self.edges, value)] += 1
+
+    def update_many(self, values):
+        """Add every value from an iterable."""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: "Histogram"):
+        """Fold another histogram with the same edges into this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def to_dict(self):
+        """
+        Return bucket counts keyed by a readable range label.
+
+        Returns:
+            dict: {"<10K": N, "10K-25K": N, ..., ">=25M": N}
+        """
+
+        labels = [f"<{_short_amount(self.edges[0])}"]
+        labels += [
+            f"{_short_amount(lo)}-{_short_amount(hi)}"
+            for lo, hi in zip(self.edges, self.edges[1:])
+        ]
+        labels.append(f">={_short_amount(self.edges[-1])}")
+
+        return dict(zip(labels, self.counts))
+
+
+def _short_amount(amount):
+    """Abbreviate a dollar amount, e.g. 250000 -> '250K', 2500000 -> '2.5M'."""
+    if amount >= 1_000_000:
+        return f"{amount / 1_000_000:g}M"
+    if amount >= 1_000:
+        return f"{amount / 1_000:g}K"
+    return f"{amount:g}"
@@ -0,0 +1,259 @@
+import os
+import re
+import json
+import time
+from collections import defaultdict
+from reporter.cache import TTLCache, fingerprint
+from reporter.models import SearchParams, SearchField, SearchOperator
+from reporter.spill import PARSED_SIZE_FACTOR
+
+# Answer text searches from an inverted index over already-downloaded projects.
+# Off by default: local matching is whole-word and may differ slightly from RePORTER's.
+TEXT_INDEX_ENABLED = os.getenv("REPORTER_TEXT_INDEX", "0") == "1"
+
+# Completed pulls of up to this many projects are indexed; larger ones are not kept.
+TEXT_INDEX_MAX_DOCS = int(os.getenv("REPORTER_TEXT_INDEX_MAX_DOCS", "10000"))
+
+# Number of indexed pulls kept, least recently used first out.
+TEXT_INDEX_MAX_CORPORA = int(os.getenv("REPORTER_TEXT_INDEX_MAX_CORPORA", "16"))
+
+# Seconds an indexed pull is used before searches go back to RePORTER.
+TEXT_INDEX_TTL = float(os.getenv("REPORTER_TEXT_INDEX_TTL", "3600"))
+
+# Estimated memory held by all indexed pulls together, records and postings, in MB.
+# A pull that alone would take more is not indexed.
+TEXT_INDEX_MAX_MB = float(os.getenv("REPORTER_TEXT_INDEX_MAX_MB", "128"))
+
+# Rough memory taken by one posting (a project number in a token's set).
+POSTING_BYTES = 64
+
+# Record fields searched for each SearchField, and the include fields that return them.
+SEARCH_FIELD_KEYS = {
+    SearchField.PROJECT_TITLE: ("project_title",),
+    SearchField.ABSTRACT: ("abstract_text",),
+    SearchField.TERMS: ("pref_terms", "terms"),
+}
+TEXT_INCLUDE_FIELDS = {
+    "project_title": "ProjectTitle",
+    "abstract_text": "AbstractText",
+    "pref_terms": "PrefTerms",
+    "terms": "Terms",
+}
+
+# Operators whose matches can be narrowed locally; "advanced" queries always go upstream.
+CONJUNCTIVE = {SearchOperator.AND, SearchOperator.ALL}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def corpora_bytes(corpora: list) -> int:
+    return sum(c.nbytes for c in corpora)
+
+
+# criteria fingerprint (without the text search) -> list of Corpus, newest first
+_corpora = TTLCache(
+    max_entries=TEXT_INDEX_MAX_CORPORA,
+    ttl=TEXT_INDEX_TTL,
+    max_bytes=int(TEXT_INDEX_MAX_MB * 1e6),
+    sizeof=corpora_bytes,
+)
+
+
+def tokenize(text) -> list[str]:
+    return _TOKEN.findall(text.lower()) if isinstance(text, str) else []
+
+
+def parse_query(search_text: str) -> list[tuple[str, ...]]:
+    """
+    Split search text into terms: quoted phrases and single words, each a tuple of tokens.
+
+    Returns:
+        list[tuple]: Distinct terms in order of appearance
+    """
+
+    phrases = [tuple(tokenize(p)) for p in _PHRASE.findall(search_text)]
+    words = [(w,) for w in tokenize(_PHRASE.sub(" ", search_text))]
+    return list(dict.fromkeys(t for t in phrases + words if t))
+
+
+def _text_spec(search_params: SearchParams):
+    """(operator, search fields, terms) of the text search, or None if there is none."""
+
+    ats = search_params.advanced_text_search
+    if ats is None:
+        return None
+    terms = frozenset(parse_query(ats.search_text))
+    try:
+        operator = SearchOperator(ats.operator)
+        fields = frozenset(SearchField(f) for f in ats.search_field)
+    except ValueError:
+        # a field or operator the index does not know is left to RePORTER, like "advanced"
+        return SearchOperator.ADVANCED, frozenset(), terms
+    return operator, fields, terms
+
+
+def _base_key(search_params: SearchParams) -> str:
+    criteria = search_params.to_api_criteria()
+    criteria.pop("advanced_text_search", None)
+    return fingerprint(criteria)
+
+
+class Corpus:
+    """
+    Every project matching one search, with an inverted index over its text fields.
+
+    Postings map each token to the projects containing it, per record field. Phrases
+    are matched by intersecting the postings of their tokens, then checking the
+    candidates' text for the tokens in sequence.
+
+    Attributes:
+        nbytes (int): Estimated memory held by the records and postings.
+    """
+
+    def __init__(self, search_params: SearchParams, include_fields: list[str], meta: dict, records: list):
+        self.spec = _text_spec(search_params)
+        self.include_fields = set(include_fields)
+        self.meta = {k: v for k, v in meta.items() if k not in ("search_id", "total", "offset", "limit")}
+        self.records = list(records)
+        self.text_keys = {k for k, f in TEXT_INCLUDE_FIELDS.items() if f in self.include_fields}
+
+        self.postings = defaultdict(lambda: defaultdict(set))
+        n_postings = 0
+        for i, record in enumerate(self.records):
+            for key in self.text_keys:
+                tokens = set(tokenize(record.get(key)))
+                n_postings += len(tokens)
+                for token in tokens:
+                    self.postings[token][key].add(i)
+
+        record_bytes = sum(len(json.dumps(r, default=str)) for r in self.records)
+        self.nbytes = record_bytes * PARSED_SIZE_FACTOR + n_postings * POSTING_BYTES
+
+    def covers(self, search_params: SearchParams, include_fields: list[str]) -> bool:
+        """
+        Whether every project the search would match upstream is in this corpus, with
+        the requested fields and the text needed to decide if it matches.
+
+        A corpus without a text search covers any text search on the same criteria.
+        One with an and/all search covers and/all searches over the same or fewer
+        fields that include all of its terms, since those match a subset.
+        """
+
+        query = _text_spec(search_params)
+        if query is None or query[0] == SearchOperator.ADVANCED or not query[2]:
+            return False
+        if not set(include_fields) <= self.include_fields:
+            return False
+        if not all(self.text_keys.intersection(SEARCH_FIELD_KEYS[f]) for f in query[1]):
+            return False
+        if self.spec is None:
+            return True
+
+        operator, fields, terms = self.spec
+        return (
+            operator in CONJUNCTIVE and query[0] in CONJUNCTIVE
+            and query[1] <= fields and query[2] >= terms
+        )
+
+    def _docs(self, term, keys) -> set[int]:
+        """Projects containing the term in any of the record fields."""
+
+        docs = set()
+        for key in keys:
+            candidates = None
+            for token in term:
+                found = self.postings.get(token, {}).get(key, set())
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    break
+            if not candidates:
+                continue
+            if len(term) == 1:
+                docs |= candidates
+                continue
+            needle = " " + " ".join(term) + " "
+            docs |= {
+                i for i in candidates - docs
+                if needle in " " + " ".join(tokenize(self.records[i].get(key))) + " "
+            }
+        return docs
+
+    def search(self, search_params: SearchParams) -> list:
+        """Projects matching the text search, in the order they were downloaded."""
+
+        operator, fields, terms = _text_spec(search_params)
+        keys = [k for f in fields for k in SEARCH_FIELD_KEYS[f] if k in self.text_keys]
+
+        matches = None
+        for term in terms:
+            docs = self._docs(term, keys)
+            if operator == SearchOperator.OR:
+                matches = docs if matches is None else matches | docs
+            else:
+                matches = docs if matches is None else matches & docs
+                if not matches:
+                    break
+        return [self.records[i] for i in sorted(matches)]
+
+
+def can_index(search_params: SearchParams, include_fields: list[str], total: int) -> bool:
+    """Whether a pull with these parameters should be collected for the index."""
+
+    if not TEXT_INDEX_ENABLED or total > TEXT_INDEX_MAX_DOCS:
+        return False
+    spec = _text_spec(search_params)
+    if spec is not None and spec[0] not in CONJUNCTIVE:
+        return False
+    return any(f in include_fields for f in TEXT_INCLUDE_FIELDS.values())
+
+
+def add(search_params: SearchParams, include_fields: list[str], meta: dict, records: list):
+    """
+    Index every project matching a search, once all of them have been downloaded.
+
+    Skipped if an indexed corpus already holds or covers the search.
+    """
+
+    if not can_index(search_params, include_fields, len(records)):
+        return
+    key = _base_key(search_params)
+    corpora = _corpora.get(key) or []
+    spec = _text_spec(search_params)
+    if any(
+        (c.spec == spec and c.include_fields >= set(include_fields)) or (spec and c.covers(search_params, include_fields))
+        for c in corpora
+    ):
+        return
+
+    started = time.perf_counter()
+    corpus = Corpus(search_params, include_fields, meta, records)
+    if corpus.nbytes > _corpora.max_bytes:
+        print(f"Not indexing {len(records)} projects: {corpus.nbytes / 1e6:.0f} MB exceeds REPORTER_TEXT_INDEX_MAX_MB")
+        return
+    _corpora.set(key, [corpus] + corpora[:3])
+    print(f"Indexed {len(records)} projects ({corpus.nbytes / 1e6:.1f} MB) for local text search in {time.perf_counter() - started:.2f}s")
+
+
+def lookup(search_params: SearchParams, include_fields: list[str]):
+    """
+    Answer a text search from an indexed corpus that covers it.
+
+    Returns:
+        tuple: (meta, matching records, include fields the records hold), or None
+            if no corpus covers the search. The records may hold more fields than
+            were requested.
+    """
+
+    if not TEXT_INDEX_ENABLED or search_params.advanced_text_search is None:
+        return None
+
+    for corpus in _corpora.get(_base_key(search_params)) or []:
+        if corpus.covers(search_params, include_fields):
+            return corpus.meta, corpus.search(search_params), corpus.include_fields
+    return None
+
+
+def clear():
+    """Drop every indexed corpus (e.g. after a RePORTER data refresh)."""
+    _corpora.clear()
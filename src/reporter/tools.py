@@ -1,6 +1,14 @@
-from typing import List
-from reporter.utils import get_all_responses, get_initial_response, get_project_distributions, build_crosstab, DIMENSION_FIELDS
-from reporter.models import SearchParams, ProjectNum, IncludeField, IncludeFields
+from typing import List, Optional
+from collections import Counter
+from reporter.utils import get_all_responses, get_initial_response, count_projects, count_groups, get_project_distributions, build_sharded_crosstab, summarize_all_responses, get_value_distribution, AGGREGATION_FIELDS, ALLOCATIONS
+from reporter.sketches import validate_percentiles
+from reporter.export import export_results, EXPORT_FORMATS
+from reporter.deadline import deadline
+from reporter.cube import get_portfolio, build_cube, CUBE_METRICS, CUBE_DIMENSIONS
+from reporter.baseline import baseline_lookup, BASELINE_DIMENSIONS
+from reporter.lineage import get_lineages, build_timeline, rollup
+from reporter.similarity import similarity_index, core_project_num, search_text, display, SIMILARITY_INCLUDE_FIELDS
+from reporter.models import SearchParams, ProjectNum, IncludeField, IncludeFields, AdvancedTextSearch
 from fastmcp import Context
 
 def register_tools(mcp):
@@ -28,8 +36,45 @@ def register_tools(mcp):
             - funding_mechanism_distribution: Breakdown by funding mechanism
             - active_status_distribution: Breakdown of active vs inactive projects
             - award_amount_stats: Funding statistics (total, average, min, max)
+            - source: "live" or "baseline"
+            - sample_size: Number of projects the distributions and award statistics were
+              computed from (up to the first 500 matches), for live answers
+
+            When the criteria only use years, agencies, activity_codes and funding_mechanisms,
+            the answer comes instantly from a precomputed baseline table: distributions and the
+            award total and average are then complete (not sampled), organization_distribution,
+            active_status_distribution and the award min and max are null, and
+            baseline_as_of / baseline_age_seconds state how old the table is.
         """
 
+        baseline = baseline_lookup(search_params, ["fiscal_year", "agency_ic_admin", "activity_code", "funding_mechanism"])
+        if baseline is not None:
+            def distribution(dimension):
+                counts = Counter()
+                for group in baseline["groups"]:
+                    counts[group[dimension]] += group["count"]
+                return counts
+
+            return {
+                "total_projects": baseline["total_projects"],
+                "year_distribution": dict(sorted(distribution("fiscal_year").items(), reverse=True)),
+                "institute_distribution": dict(distribution("agency_ic_admin").most_common(15)),
+                "activity_code_distribution": dict(distribution("activity_code").most_common(15)),
+                "organization_distribution": None,
+                "funding_mechanism_distribution": dict(distribution("funding_mechanism").most_common()),
+                "active_status_distribution": None,
+                "award_amount_stats": {
+                    "total": baseline["total_funding"],
+                    "average": baseline["total_funding"] / baseline["total_projects"] if baseline["total_projects"] else 0,
+                    "min": None,
+                    "max": None,
+                    "count": baseline["total_projects"],
+                },
+                "source": "baseline",
+                "baseline_as_of": baseline["baseline_as_of"],
+                "baseline_age_seconds": baseline["baseline_age_seconds"],
+            }
+
         # Get data with fields needed for distributions
         include_fields = [
             IncludeField.PROJECT_NUM.value,
@@ -61,12 +106,17 @@ def register_tools(mcp):
             "funding_mechanism_distribution": dict(distributions["funding_mechanism_distribution"].most_common()),
             "active_status_distribution": dict(distributions["active_status_distribution"]),
             "award_amount_stats": distributions["award_amount_stats"],
+            "source": "live",
+            "sample_size": len(all_results["results"]),
         }
 
     @mcp.tool()
     async def get_search_summary(
         ctx: Context,
         search_params: SearchParams,
+        percentiles: List[float] = None,
+        include_histogram: bool = False,
+        deadline_seconds: float = None,
     ):
         """
         Tool to get a comprehensive summary of ALL projects matching search criteria.
@@ -74,11 +124,18 @@ def register_tools(mcp):
         Unlike search_projects (which samples the first 500 results for a quick preview),
         this tool fetches all matching projects to provide accurate, complete statistics.
         Use this when you need exact totals (e.g., "total funding for cancer research").
+        Use percentiles for questions like "median R01 award" instead of pulling raw amounts.
 
         Note: This may be slower for large result sets as it pages through all results.
 
         Args:
             search_params (SearchParams): Search parameters including search term, years, agencies, organizations, pi_name, po_names, and award_types.
+            percentiles (List[float]): Optional award amount percentiles to estimate, between 0 and 100 (e.g. [50, 90]).
+            include_histogram (bool): Whether to include a histogram of award amounts.
+            deadline_seconds (float): Optional time budget in seconds. If it runs out while
+                paging, the result covers only the pages fetched so far. A "partial" notice
+                giving "coverage" (pages done / total) is then added to the result's meta
+                and as its own content block after the tool's output.
 
         Returns:
             dict: API response containing complete statistics:
@@ -89,9 +146,12 @@ def register_tools(mcp):
             - organization_distribution: Complete breakdown by institution/organization
             - funding_mechanism_distribution: Complete breakdown by funding mechanism
             - active_status_distribution: Complete breakdown of active vs inactive projects
-            - award_amount_stats: Complete funding statistics (total, average, min, max)
+            - award_amount_stats: Complete funding statistics (total, average, min, max),
+              plus estimated percentiles and histogram when requested
         """
 
+        validate_percentiles(percentiles)
+
         # Get data with fields needed for distributions
         include_fields = [
             IncludeField.PROJECT_NUM.value,
@@ -104,17 +164,17 @@ def register_tools(mcp):
             IncludeField.AWARD_AMOUNT.value,
         ]
 
-        # Fetch ALL results (pages through entire result set)
-        all_results = await get_all_responses(
-            search_params,
-            include_fields,
-        )
-
-        distributions = get_project_distributions(all_results)
-        total_projects = len(distributions["project_ids"])
+        # Page through ALL results, summarizing each page as it arrives
+        with deadline(deadline_seconds):
+            distributions = await summarize_all_responses(
+                search_params,
+                include_fields,
+                percentiles,
+                include_histogram,
+            )
 
         return {
-            "total_projects": total_projects,
+            "total_projects": distributions["project_count"],
             "year_distribution": dict(sorted(distributions["year_distribution"].items(), reverse=True)),
             "institute_distribution": dict(distributions["institute_distribution"].most_common(15)),
             "activity_code_distribution": dict(distributions["activity_code_distribution"].most_common(15)),
@@ -183,6 +243,8 @@ def register_tools(mcp):
     async def get_project_information(
         project_ids: list[str],
         include_fields: List[str],
+        offset: int = 0,
+        limit: int = 500,
     ):
         """
         Tool to get specified metadata for a project based on project number.
@@ -193,9 +255,12 @@ def register_tools(mcp):
             include_fields (List[str]): List of fields to return from the API.
                 Choose fields relevant to the query (e.g., AWARD_AMOUNT for funding questions,
                 PRINCIPAL_INVESTIGATORS for PI questions, ORGANIZATION for institution questions).
+            offset (int): Index of the first matching project to return (default 0).
+            limit (int): Number of matching projects to return (default 500).
 
         Returns:
-            dict: API response with specified project metadata
+            dict: API response with specified project metadata, plus total_results and
+                next_offset (the offset of the next page, or None on the last page)
         """
 
         # add project_ids to a search_params object
@@ -206,8 +271,160 @@ def register_tools(mcp):
         # Validate and convert include_fields strings to IncludeField enum values
         fields = IncludeFields(fields=include_fields)
 
-        # Call the API
-        return await get_all_responses(search_params, [f.value for f in fields.fields])
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be 0 or more and limit 1 or more")
+
+        # Call the API; only the requested page is read back if the records were spilled
+        all_results = await get_all_responses(search_params, [f.value for f in fields.fields])
+        results = all_results["results"]
+
+        return {
+            "meta": all_results["meta"],
+            "results": results[offset:offset + limit],
+            "total_results": len(results),
+            "next_offset": offset + limit if offset + limit < len(results) else None,
+        }
+
+    @mcp.tool()
+    async def find_similar_projects(
+        ctx: Context,
+        project_ids: list[str],
+        search_params: SearchParams = None,
+        limit: int = 20,
+        search_upstream: bool = True,
+    ):
+        """
+        Tool to find projects similar to one or more given projects ("grants like this one").
+
+        Projects are ranked by BM25 similarity of their titles, abstracts and NIH terms to
+        those of the given projects. Candidates are the projects the server has already
+        downloaded with abstracts or terms, plus (unless search_upstream is false) the
+        most recent 500 projects matching the given projects' most distinctive terms.
+        Use this instead of several keyword searches.
+
+        Args:
+            project_ids (list[str]): Project numbers to find similar projects for.
+            search_params (SearchParams): Optional scope for the candidate search (e.g. years,
+                agencies); its text search is replaced. When given, only projects found in
+                this scope are ranked.
+            limit (int): Number of similar projects to return (1-100, default 20).
+            search_upstream (bool): Whether to search RePORTER for candidates (default true).
+                Set to false to rank all already-downloaded projects (search_params is then
+                not used) with no API request beyond fetching the given projects.
+
+        Returns:
+            dict: Similar projects containing:
+            - query_terms: The most distinctive terms of the given projects
+            - candidates_ranked: Number of projects compared
+            - similar_projects: List of {project_num, core_project_num, project_title,
+              fiscal_year, org_name, score, shared_terms}, most similar first. Each grant
+              appears once, as its latest fiscal year seen.
+        """
+
+        if not 1 <= limit <= 100:
+            raise ValueError(f"Invalid limit {limit}. Valid options: 1 to 100")
+
+        seeds = await get_all_responses(
+            SearchParams(project_nums=[ProjectNum(project_num=p) for p in project_ids]),
+            SIMILARITY_INCLUDE_FIELDS,
+        )
+        cores = {core_project_num(r) for r in seeds["results"]}
+        vector = similarity_index.query_vector(list(cores))
+        if not vector:
+            raise ValueError(f"No abstracts or terms found for projects {project_ids}")
+
+        candidates = None
+        if search_upstream:
+            scope = (search_params or SearchParams()).model_copy(update={
+                "advanced_text_search": AdvancedTextSearch(operator="or", search_text=search_text(vector)),
+            })
+            _, results = await get_initial_response(scope, SIMILARITY_INCLUDE_FIELDS, 500)
+            if search_params is not None:
+                candidates = {core_project_num(r) for r in results["results"]}
+
+        similar = similarity_index.rank(vector, exclude=cores, candidates=candidates, limit=limit)
+
+        return {
+            "query_terms": list(dict.fromkeys(display(f) for f in vector))[:10],
+            "candidates_ranked": len(similarity_index) - len(cores) if candidates is None else len(candidates - cores),
+            "similar_projects": similar,
+        }
+
+    @mcp.tool()
+    async def get_project_lineage(
+        project_nums: list[str],
+        include_projects: bool = True,
+    ):
+        """
+        Tool to get the full funding history of one or more grants across fiscal years.
+
+        Resolves every year, supplement and renewal of each grant by its core project number
+        (e.g. R01CA123456) in a single search, and caches it: asking again about the same
+        grants, alone or as part of a larger set, needs no new API requests. Use this instead
+        of several searches plus get_project_information for "funding history" questions.
+
+        Args:
+            project_nums (list[str]): Core or full project numbers (e.g. ['R01CA123456'] or
+                ['5R01CA123456-05']); up to 50 grants.
+            include_projects (bool): Whether to list each year's individual projects
+                (project_num, award_type, activity_code, award_amount). Default true.
+
+        Returns:
+            dict: Lineages containing:
+            - grants: {core_project_num: {project_title, activity_codes, first_fiscal_year,
+              last_fiscal_year, total_award_amount, renewals, supplements, organizations,
+              principal_investigators, timeline}}, where timeline lists
+              {fiscal_year, award_amount, project_count} by year. Grants with no projects
+              found have an empty timeline.
+            - by_year: Award amount and grant count per fiscal year across all the grants
+            - fetched: Number of grants that were not cached and had to be searched
+        """
+
+        lineages, fetched = await get_lineages(project_nums)
+
+        return {
+            "grants": {core: build_timeline(projects, include_projects) for core, projects in lineages.items()},
+            "by_year": rollup(lineages),
+            "fetched": fetched,
+        }
+
+    @mcp.tool()
+    async def export_projects(
+        ctx: Context,
+        search_params: SearchParams,
+        include_fields: List[str],
+        format: str = "csv",
+    ):
+        """
+        Export ALL projects matching the search to a file on the server and return its resource URI.
+
+        Use this instead of get_project_information when the user needs a full list of
+        projects (thousands of rows) rather than an answer: the rows are written to a file,
+        not returned inline. Read the file through the returned reporter://exports/ URI, or
+        in byte ranges (<uri>/bytes/{start}-{end}) if it is larger than one read allows.
+
+        Args:
+            search_params (SearchParams): Search parameters to scope the export.
+            include_fields (List[str]): List of fields to export (see get_project_information).
+                Always include PROJECT_NUM for reference.
+            format (str): "csv", "ndjson" or "parquet" (default "csv"). Nested fields such as
+                PRINCIPAL_INVESTIGATORS are written as JSON text in csv and parquet.
+
+        Returns:
+            dict: Export containing:
+            - uri: MCP resource URI of the file
+            - rows: Number of projects exported
+            - bytes: File size
+            - schema: {column: type} with types string, integer, number, boolean or json
+            - expires_at: When the file will be deleted
+        """
+
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format '{format}'. Valid options: {EXPORT_FORMATS}")
+
+        fields = IncludeFields(fields=include_fields)
+
+        return await export_results(search_params, [f.value for f in fields.fields], format)
 
     @mcp.tool()
     async def get_portfolio_crosstab(
@@ -215,6 +432,10 @@ def register_tools(mcp):
         search_params: SearchParams,
         row_field: str,
         col_field: str,
+        include_funding: bool = True,
+        percentiles: List[float] = None,
+        allocation: str = "full",
+        deadline_seconds: float = None,
     ):
         """
         Return a cross-tabulation of grant counts and total funding by any two project fields.
@@ -222,29 +443,238 @@ def register_tools(mcp):
         Use this to generate stacked bar charts, heatmaps, or tables comparing any two
         dimensions of the portfolio (e.g. fiscal year x activity code, org state x funding mechanism).
 
+        When a dimension is also a search filter (fiscal_year with years set, agency_ic_admin,
+        funding_mechanism, org_state, award_type), cells are computed from parallel filtered
+        sub-queries. Set include_funding to False when only counts are needed; this is much
+        faster for large portfolios.
+
         Args:
             search_params (SearchParams): Search parameters to scope the portfolio.
             row_field (str): Field to use as rows. Valid options:
                 fiscal_year, activity_code, funding_mechanism, agency_ic_admin,
-                org_name, org_state, organization_type, award_type
+                org_name, org_state, organization_type, award_type, and the multi-valued
+                fields principal_investigators, spending_categories_desc (RCDC categories),
+                agency_ic_fundings, pref_terms
             col_field (str): Field to use as columns. Same valid options as row_field.
+            include_funding (bool): Whether to include total_funding in each cell (default True).
+            percentiles (List[float]): Optional award amount percentiles to estimate per cell,
+                between 0 and 100 (e.g. [50, 90] for median and 90th percentile award).
+            allocation (str): How funding is attributed for multi-valued fields. "full" credits
+                every value with the project's full award (totals overlap); "split" divides the
+                award between the values (by each IC's own cost for agency_ic_fundings).
+                Project counts are always full. Default "full".
+            deadline_seconds (float): Optional time budget in seconds. If it runs out while
+                paging, the result covers only the pages fetched so far. A "partial" notice
+                giving "coverage" (pages done / total) is then added to the result's meta
+                and as its own content block after the tool's output.
 
         Returns:
             dict: Nested dict of {row: {col: {"count": N, "total_funding": X}}}, sorted by row.
+                Cells include "award_percentiles" when percentiles are requested.
         """
 
-        valid = list(DIMENSION_FIELDS.keys())
-        if row_field not in DIMENSION_FIELDS:
+        validate_percentiles(percentiles)
+
+        valid = list(AGGREGATION_FIELDS.keys())
+        if row_field not in AGGREGATION_FIELDS:
             raise ValueError(f"Invalid row_field '{row_field}'. Valid options: {valid}")
-        if col_field not in DIMENSION_FIELDS:
+        if col_field not in AGGREGATION_FIELDS:
             raise ValueError(f"Invalid col_field '{col_field}'. Valid options: {valid}")
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Invalid allocation '{allocation}'. Valid options: {ALLOCATIONS}")
 
-        # Deduplicate include fields (org_name and org_state both map to Organization)
-        include_fields = list({
-            DIMENSION_FIELDS[row_field].value,
-            DIMENSION_FIELDS[col_field].value,
-            IncludeField.AWARD_AMOUNT.value,
-        })
+        with deadline(deadline_seconds):
+            return await build_sharded_crosstab(search_params, row_field, col_field, include_funding, percentiles, allocation)
+
+    @mcp.tool()
+    async def get_portfolio_cube(
+        ctx: Context,
+        search_params: SearchParams,
+        dimensions: List[str],
+        metrics: Optional[List[str]] = None,
+        filters: dict[str, list] = None,
+        allocation: str = "full",
+    ):
+        """
+        Aggregate a portfolio over any number of dimensions and several metrics at once.
+
+        The portfolio is fetched once and cached on the server. Calling this tool again with
+        the same search_params answers roll-ups (fewer dimensions), slices (filters) and
+        drill-downs (more dimensions) locally, without new API requests.
+
+        Args:
+            search_params (SearchParams): Search parameters to scope the portfolio.
+            dimensions (List[str]): Fields to group by, in order. Valid options:
+                fiscal_year, activity_code, funding_mechanism, agency_ic_admin,
+                org_name, org_state, organization_type, award_type, and the multi-valued
+                fields principal_investigators, spending_categories_desc, agency_ic_fundings.
+                Pass an empty list for portfolio-wide totals.
+            metrics (List[str]): Metrics to compute per cell. Valid options:
+                count, award_sum, award_mean, award_median, direct_cost_sum,
+                indirect_cost_sum, distinct_pis (default: count, award_sum).
+            filters (dict[str, list]): Optional slice restricting dimensions to the listed
+                values, e.g. {"fiscal_year": [2023], "activity_code": ["R01", "R21"]}.
+            allocation (str): "full" or "split" attribution of amounts across the values of
+                multi-valued dimensions (see get_portfolio_crosstab). Default "full".
+
+        Returns:
+            dict: Cube containing:
+            - portfolio_id: Identifier of the cached portfolio. Its project-level rows can be
+              read without re-running the search through the resources
+              reporter://results/{portfolio_id}/rows/{start}-{end} and
+              reporter://results/{portfolio_id}/column/{name}
+            - total_projects: Number of projects in the portfolio
+            - cached: Whether the portfolio was served from the server-side cache
+            - cells: List of {dimension: value, ..., metric: value, ...}
+        """
+
+        metrics = metrics or ["count", "award_sum"]
+
+        valid = list(CUBE_DIMENSIONS.keys())
+        for d in list(dimensions) + list((filters or {}).keys()):
+            if d not in CUBE_DIMENSIONS:
+                raise ValueError(f"Invalid dimension '{d}'. Valid options: {valid}")
+        for m in metrics:
+            if m not in CUBE_METRICS:
+                raise ValueError(f"Invalid metric '{m}'. Valid options: {CUBE_METRICS}")
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Invalid allocation '{allocation}'. Valid options: {ALLOCATIONS}")
+
+        portfolio_id, rows, cached = await get_portfolio(search_params)
+
+        return {
+            "portfolio_id": portfolio_id,
+            "total_projects": len(rows),
+            "cached": cached,
+            "dimensions": dimensions,
+            "metrics": metrics,
+            "cells": build_cube(rows, dimensions, metrics, filters, allocation),
+        }
+
+    @mcp.tool()
+    async def get_portfolio_distribution(
+        ctx: Context,
+        search_params: SearchParams,
+        field: str,
+        allocation: str = "full",
+        top_n: int = 25,
+        deadline_seconds: float = None,
+    ):
+        """
+        Count projects and total funding by one field across ALL matching projects.
+
+        Works for multi-valued fields, which other tools cannot break down: use it for
+        RCDC spending category, per-PI, co-funding IC or scientific term breakdowns
+        instead of downloading raw project records.
 
-        all_results = await get_all_responses(search_params, include_fields)
-        return build_crosstab(all_results, row_field, col_field)
+        Args:
+            search_params (SearchParams): Search parameters to scope the portfolio.
+            field (str): Field to break down by. Valid options: fiscal_year, activity_code,
+                funding_mechanism, agency_ic_admin, org_name, org_state, organization_type,
+                award_type, principal_investigators, spending_categories_desc,
+                agency_ic_fundings, pref_terms
+            allocation (str): How funding is attributed for multi-valued fields. "full" credits
+                every value with the project's full award (totals overlap); "split" divides the
+                award between the values (by each IC's own cost for agency_ic_fundings).
+                Project counts are always full. Default "full".
+            top_n (int): Number of values to return, by descending project count (default 25).
+            deadline_seconds (float): Optional time budget in seconds. If it runs out while
+                paging, the result covers only the pages fetched so far. A "partial" notice
+                giving "coverage" (pages done / total) is then added to the result's meta
+                and as its own content block after the tool's output.
+
+        Returns:
+            dict: Distribution containing:
+            - total_projects: Number of matching projects
+            - distinct_values: Number of distinct values of the field
+            - distribution: {value: {"count": N, "total_funding": X}} for the top_n values
+        """
+
+        valid = list(AGGREGATION_FIELDS.keys())
+        if field not in AGGREGATION_FIELDS:
+            raise ValueError(f"Invalid field '{field}'. Valid options: {valid}")
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Invalid allocation '{allocation}'. Valid options: {ALLOCATIONS}")
+
+        with deadline(deadline_seconds):
+            total_projects, distribution = await get_value_distribution(search_params, field, allocation)
+        top = sorted(distribution.items(), key=lambda item: item[1]["count"], reverse=True)[:top_n]
+
+        return {
+            "total_projects": total_projects,
+            "distinct_values": len(distribution),
+            "distribution": dict(top),
+        }
+
+    @mcp.tool()
+    async def get_project_counts(
+        ctx: Context,
+        search_params: SearchParams,
+        group_by: Optional[List[str]] = None,
+        include_funding: bool = True,
+    ):
+        """
+        Tool to get exact project counts and total funding, optionally grouped by up to four fields.
+
+        Use this for questions like "How many projects in FY2024?" or "How many NCI R01s in
+        FY2023?". Criteria that only use years, agencies, activity_codes and funding_mechanisms
+        are answered instantly from a precomputed baseline table (set is_agency_admin to true
+        when filtering by specific institutes). Other criteria are counted live; set
+        include_funding to False when only counts are needed, which avoids downloading the
+        matching projects unless a group_by field (e.g. activity_code) cannot be counted by filter.
+
+        Args:
+            search_params (SearchParams): Search parameters to scope the count.
+            group_by (List[str]): Fields to break the totals down by. Valid options:
+                fiscal_year, agency_ic_admin, activity_code, funding_mechanism.
+            include_funding (bool): Whether live counts include total_funding (default True).
+
+        Returns:
+            dict: Counts containing:
+            - total_projects: Number of matching projects
+            - total_funding: Total award amount of matching projects
+            - groups: List of {field: value, ..., "count": N, "total_funding": X}
+              (live counts without include_funding leave out total_funding)
+            - source: "baseline" or "live"
+            - baseline_as_of / baseline_age_seconds: Age of the table, for baseline answers
+        """
+
+        group_by = group_by or []
+        for d in group_by:
+            if d not in BASELINE_DIMENSIONS:
+                raise ValueError(f"Invalid group_by field '{d}'. Valid options: {BASELINE_DIMENSIONS}")
+
+        baseline = baseline_lookup(search_params, group_by)
+        if baseline is not None:
+            return {**baseline, "source": "baseline"}
+
+        # counts alone need no rows: one limit=1 query for the total, plus one per
+        # group when every group_by field is also a search filter and that is cheaper
+        if not include_funding:
+            groups = await count_groups(search_params, group_by) if group_by else []
+            if groups is not None:
+                total, _ = await count_projects(search_params)
+                return {
+                    "total_projects": total,
+                    "groups": sorted(groups, key=lambda g: g["count"], reverse=True),
+                    "source": "live",
+                }
+
+        _, rows, _ = await get_portfolio(search_params)
+        totals = build_cube(rows, [], ["award_sum"])
+        groups = build_cube(rows, group_by, ["count", "award_sum"]) if group_by else []
+
+        counts = {
+            "total_projects": len(rows),
+            "total_funding": totals[0]["award_sum"] if totals else 0,
+            "groups": [
+                {**{d: g[d] for d in group_by}, "count": g["count"], "total_funding": g["award_sum"]}
+                for g in sorted(groups, key=lambda g: g["count"], reverse=True)
+            ],
+            "source": "live",
+        }
+        if not include_funding:
+            del counts["total_funding"]
+            for g in counts["groups"]:
+                del g["total_funding"]
+        return counts
@@ -0,0 +1,66 @@
+import os
+import tempfile
+from opentelemetry import trace
+from fastmcp.tools.tool import default_serializer
+
+# Span exporter: "otlp", "console", "file", or empty to disable tracing.
+# The OTLP exporter reads the standard OTEL_EXPORTER_OTLP_* variables (endpoint, headers).
+TRACE_EXPORTER = os.getenv("REPORTER_TRACE_EXPORTER", "").lower()
+
+# File the "file" exporter appends spans to, one JSON object per line.
+TRACE_FILE = os.getenv(
+    "REPORTER_TRACE_FILE",
+    os.path.join(tempfile.gettempdir(), "reporter-traces.jsonl"),
+)
+
+TRACE_EXPORTERS = ["otlp", "console", "file"]
+
+# Without a configured SDK this tracer is a no-op, so spans cost next to nothing.
+tracer = trace.get_tracer("reporter")
+
+
+def configure_tracing():
+    """
+    Install a tracer provider exporting to TRACE_EXPORTER.
+
+    Needs the optional tracing dependencies (pip install "reporter[tracing]").
+    Does nothing if REPORTER_TRACE_EXPORTER is not set.
+    """
+
+    if not TRACE_EXPORTER:
+        return
+
+    if TRACE_EXPORTER not in TRACE_EXPORTERS:
+        raise ValueError(f"Invalid REPORTER_TRACE_EXPORTER '{TRACE_EXPORTER}'. Valid options: {TRACE_EXPORTERS}")
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        print('Tracing disabled: install the tracing extra (pip install "reporter[tracing]")')
+        return
+
+    if TRACE_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif TRACE_EXPORTER == "file":
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(TRACE_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "nih-reporter-mcp-server"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def traced_serializer(data) -> str:
+    """FastMCP tool result serializer that records serialization in its own span."""
+    with tracer.start_as_current_span("serialize") as span:
+        text = default_serializer(data)
+        span.set_attribute("reporter.bytes", len(text))
+    return text
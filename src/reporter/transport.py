@@ -0,0 +1,150 @@
+import os
+import gzip
+import json
+import time
+import asyncio
+import tempfile
+import httpx
+from datetime import datetime, timezone
+from reporter.cache import fingerprint
+from reporter.deadline import upstream_timeout
+
+# NIH RePORTER search endpoint; point it at a local stand-in (see bench/) for offline runs.
+API_URL = os.getenv("REPORTER_API_URL", "https://api.reporter.nih.gov/v2/projects/search")
+
+# How requests reach RePORTER:
+#   live   - send every request to API_URL
+#   record - send to API_URL and save each successful response in FIXTURE_DIR
+#   replay - serve responses from FIXTURE_DIR only, never touching the network
+TRANSPORT = os.getenv("REPORTER_TRANSPORT", "live").lower()
+
+TRANSPORTS = ["live", "record", "replay"]
+
+# Directory of recorded responses, one gzipped JSON file per request payload.
+FIXTURE_DIR = os.getenv(
+    "REPORTER_FIXTURE_DIR",
+    os.path.join(tempfile.gettempdir(), "reporter-fixtures"),
+)
+
+# Replayed responses wait their recorded latency times this factor (0 replays instantly).
+REPLAY_LATENCY_SCALE = float(os.getenv("REPORTER_REPLAY_LATENCY_SCALE", "1"))
+
+if TRANSPORT not in TRANSPORTS:
+    raise ValueError(f"Invalid REPORTER_TRANSPORT '{TRANSPORT}'. Valid options: {TRANSPORTS}")
+
+# Shared HTTP client and the event loop it belongs to (connections cannot move between loops).
+_client = None
+_client_loop = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """The shared HTTP client for the running event loop, created on first use."""
+
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(headers={"Content-Type": "application/json"})
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (on server shutdown)."""
+
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = _client_loop = None
+
+
+def fixture_path(payload: dict) -> str:
+    """
+    Path of the fixture for a request payload.
+
+    Fixtures are keyed by the canonical payload fingerprint, the same key the
+    response cache uses, so payloads built by reporter.utils.search_payload map
+    to the same file however their criteria were ordered.
+    """
+
+    return os.path.join(FIXTURE_DIR, f"{fingerprint(payload)}.json.gz")
+
+
+def save_fixture(payload: dict, response: httpx.Response, latency: float):
+    """
+    Record one response, with the payload it answers and how long it took.
+
+    Writes the file synchronously; send_search runs it in a worker thread.
+    """
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = fixture_path(payload)
+    fixture = {
+        "payload": payload,
+        "status": response.status_code,
+        "latency": round(latency, 4),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "body": response.content.decode("utf-8"),
+    }
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_fixture(path: str) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def replay_fixture(payload: dict) -> httpx.Response:
+    """
+    Serve a recorded response, after its recorded latency scaled by REPLAY_LATENCY_SCALE.
+
+    Raises:
+        httpx.ConnectError: If no response was recorded for the payload.
+    """
+
+    path = fixture_path(payload)
+    request = httpx.Request("POST", API_URL, json=payload)
+    try:
+        fixture = await asyncio.to_thread(load_fixture, path)
+    except FileNotFoundError:
+        raise httpx.ConnectError(f"No recorded response for this request in {path}", request=request)
+
+    if REPLAY_LATENCY_SCALE > 0:
+        await asyncio.sleep(fixture["latency"] * REPLAY_LATENCY_SCALE)
+
+    return httpx.Response(
+        fixture["status"],
+        content=fixture["body"].encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        request=request,
+    )
+
+
+async def send_search(payload: dict) -> httpx.Response:
+    """
+    Send one search request through the configured TRANSPORT.
+
+    Live requests time out after UPSTREAM_TIMEOUT, or sooner if the tool
+    deadline is nearer (see reporter.deadline). Cancelling the calling task
+    aborts the request and frees its connection.
+
+    Args:
+        payload (dict): Search request body.
+
+    Returns:
+        httpx.Response: The live or recorded response.
+    """
+
+    if TRANSPORT == "replay":
+        return await replay_fixture(payload)
+
+    start = time.perf_counter()
+    response = await http_client().post(API_URL, json=payload, timeout=upstream_timeout())
+
+    if TRANSPORT == "record" and response.is_success:
+        await asyncio.to_thread(save_fixture, payload, response, time.perf_counter() - start)
+
+    return response
@@ -1,8 +1,126 @@
-import requests
+import os
+import re
+import json
+import math
+import time
+import httpx
 import asyncio
-from reporter.models import SearchParams, IncludeField
+from itertools import product
+from contextlib import contextmanager
+import contextvars
+from contextvars import ContextVar
+from reporter.models import SearchParams, IncludeField, NIHAgency, FundingMechanism, StateCode, ApplicationType
+from collections import Counter
+from reporter.cache import TTLCache, fingerprint
+from reporter.sketches import KLLSketch, Histogram
+from reporter.workload import record_query
+from reporter.tracing import tracer
+from reporter.transport import send_search
+from reporter.readiness import track_upstream_queue, record_upstream
+from reporter.spill import SpilledResults, SPILL_BUDGET_MB, PARSED_SIZE_FACTOR
+from reporter.coordination import coordinator
+from reporter.admission import FairSlots, current_session
+from reporter.deadline import DeadlineExceeded, within_deadline
+from reporter import text_index
+from reporter.similarity import similarity_index
+from reporter.metrics import (
+    UPSTREAM_REQUESTS, UPSTREAM_LATENCY, UPSTREAM_BYTES, UPSTREAM_IN_FLIGHT, UPSTREAM_QUEUED,
+    RATE_LIMIT_WAIT, CACHE_LOOKUPS,
+)
 from fastmcp import Context
 
+# Maximum number of RePORTER requests in flight at once (shared by all tool calls).
+MAX_CONCURRENT_REQUESTS = int(os.getenv("REPORTER_MAX_CONCURRENCY", "4"))
+
+# Upper bound on the number of limit=1 count queries a single sharded crosstab may issue.
+MAX_SHARD_REQUESTS = int(os.getenv("REPORTER_MAX_SHARD_REQUESTS", "200"))
+
+# Page size used when downloading full result sets.
+PAGE_LIMIT = 500
+
+# Slots are handed out round-robin between client sessions (see reporter.admission)
+_request_semaphore = FairSlots(MAX_CONCURRENT_REQUESTS)
+
+# Cached responses younger than this many seconds are served without contacting RePORTER.
+CACHE_FRESH_TTL = float(os.getenv("REPORTER_RESPONSE_CACHE_TTL", "3600"))
+
+# Older responses, up to this age, are still served immediately while a background
+# request refreshes them (stale-while-revalidate).
+CACHE_REVALIDATE_TTL = float(os.getenv("REPORTER_CACHE_REVALIDATE_TTL", "86400"))
+
+# When RePORTER fails, cached responses up to this age are served instead and the
+# tool result is marked stale.
+CACHE_MAX_STALE_AGE = float(os.getenv("REPORTER_CACHE_MAX_STALE_AGE", str(7 * 86400)))
+
+# Raw API responses keyed by request payload. Bounded by size, and cleared when a
+# RePORTER data refresh is detected (see reporter.warmup).
+_response_cache = TTLCache(
+    max_entries=int(os.getenv("REPORTER_RESPONSE_CACHE_SIZE", "1000")),
+    ttl=max(CACHE_FRESH_TTL, CACHE_REVALIDATE_TTL, CACHE_MAX_STALE_AGE),
+    max_bytes=int(os.getenv("REPORTER_RESPONSE_CACHE_MB", "64")) * 1024 * 1024,
+)
+
+# Background refreshes in progress, keyed by payload fingerprint (one per key).
+_refreshing = {}
+
+# Usage counters of the enclosing upstream_usage() blocks.
+_usage_counters = ContextVar("usage_counters", default=())
+
+# Set for background work (e.g. cache warming) that should yield to user requests.
+_background = ContextVar("background", default=False)
+
+
+@contextmanager
+def upstream_usage():
+    """
+    Count the RePORTER requests made inside the block, including by child tasks.
+
+    Yields:
+        dict: Counters updated as requests complete:
+            - requests, bytes: Upstream requests made and response bytes received
+            - pages, records: Result pages read (cached or fetched) and the records in them
+            - page_bytes: Size of those pages as received, before parsing
+            - stale: Responses served from cache because RePORTER failed
+            - stale_age_seconds: Age of the oldest of those responses
+            - partial: Paged pulls cut short by the tool deadline
+            - pull_pages, pull_pages_total: Pages read by paged pulls, and the pages they needed
+    """
+
+    usage = {
+        "requests": 0, "bytes": 0, "pages": 0, "records": 0, "page_bytes": 0, "stale": 0, "stale_age_seconds": 0,
+        "partial": 0, "pull_pages": 0, "pull_pages_total": 0,
+    }
+    token = _usage_counters.set(_usage_counters.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _usage_counters.reset(token)
+
+
+@contextmanager
+def background_priority():
+    """
+    Mark work inside the block as background: its requests wait until no user
+    request is waiting for an upstream slot, and its queries are not recorded
+    in the workload.
+    """
+
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+def clear_response_cache():
+    """Drop every cached API response, and the text index built from them."""
+    _response_cache.clear()
+    text_index.clear()
+
+def response_cache_bytes():
+    """Total size of the cached API responses, in bytes."""
+    return _response_cache.nbytes
+
 # Maps response field keys (after clean_json) to the IncludeField needed to fetch them.
 # org_name and org_state both come from the Organization include field.
 DIMENSION_FIELDS = {
@@ -16,6 +134,37 @@ DIMENSION_FIELDS = {
     "award_type":        IncludeField.AWARD_TYPE,
 }
 
+# Multi-valued response fields that can be exploded into one group per value.
+# principal_investigators is a list of names after clean_json; spending_categories_desc
+# and pref_terms are semicolon-separated strings; agency_ic_fundings is a list of ICs.
+MULTI_VALUED_FIELDS = {
+    "principal_investigators":  IncludeField.PRINCIPAL_INVESTIGATORS,
+    "spending_categories_desc": IncludeField.SPENDING_CATEGORIES_DESC,
+    "agency_ic_fundings":       IncludeField.AGENCY_IC_FUNDINGS,
+    "pref_terms":               IncludeField.PREF_TERMS,
+}
+
+# Every field the aggregation tools can group by.
+AGGREGATION_FIELDS = {**DIMENSION_FIELDS, **MULTI_VALUED_FIELDS}
+
+# How a project's funding is attributed when it has several values of a multi-valued field:
+#   full  - every value is credited with the project's full award (values overlap)
+#   split - the award is divided between the values (equally, or by each IC's own
+#           total_cost for agency_ic_fundings), so totals add up to the portfolio total
+# Project counts are always full: a project counts once for every value it has.
+ALLOCATIONS = ["full", "split"]
+
+# Dimensions that can also be expressed as a SearchParams filter, so each crosstab
+# cell can be computed from its own filtered sub-query.
+SHARD_FILTERS = {
+    "fiscal_year":       "years",
+    "agency_ic_admin":   "agencies",
+    "funding_mechanism": "funding_mechanisms",
+    "org_state":         "org_states",
+    "award_type":        "award_types",
+}
+
+@tracer.start_as_current_span("clean_json")
 def clean_json(response):
     """
     Cleans JSON response by simplyfing fields with subfields. 
@@ -46,6 +195,50 @@ def clean_json(response):
 
     return response 
 
+def record_keys(include_field: str) -> list[str]:
+    """Keys an include field adds to a cleaned record (see clean_json)."""
+
+    if include_field == "Organization":
+        return ["org_name", "org_state"]
+    return [re.sub(r"(?<!^)(?=[A-Z])", "_", include_field).lower()]
+
+def dimension_values(record, field):
+    """
+    List the values of a (possibly multi-valued) field for one project.
+
+    Args:
+        record (dict): Cleaned project record.
+        field (str): Response field key (a key of AGGREGATION_FIELDS).
+
+    Returns:
+        list[tuple]: (value, share) pairs, where share is the fraction of the
+            project's funding attributed to the value under "split" allocation.
+            Empty if the project has no value for the field.
+    """
+
+    value = record.get(field)
+
+    if field not in MULTI_VALUED_FIELDS:
+        return [(value, 1.0)] if value else []
+
+    if field == "agency_ic_fundings":
+        costs = {}
+        for funding in value or []:
+            ic = funding.get("abbreviation") or funding.get("code")
+            if ic:
+                costs[ic] = costs.get(ic, 0) + (funding.get("total_cost") or 0)
+        total_cost = sum(costs.values())
+        return [
+            (ic, cost / total_cost if total_cost else 1 / len(costs))
+            for ic, cost in costs.items()
+        ]
+
+    # spending categories and preferred terms arrive as "a; b; c"
+    items = value.split(";") if isinstance(value, str) else (value or [])
+    items = list(dict.fromkeys(item.strip() for item in items if item and item.strip()))
+
+    return [(item, 1 / len(items)) for item in items]
+
 def get_total_amount(response):
     """
     Calculates the total award amount from the API response.
@@ -64,65 +257,229 @@ def get_total_amount(response):
     
     return str(total_amount)
 
-async def search_nih_reporter(payload):
+async def post_search(payload):
+    """
+    Send one search request to the NIH RePORTER API.
+
+    Args:
+        payload (dict): Search criteria
+
+    Returns:
+        bytes: Raw JSON response body
+    """
+
+    queued_at = time.perf_counter()
+
+    try:
+        with UPSTREAM_QUEUED.track_inprogress(), track_upstream_queue():
+            # Background work only takes a free slot, so user requests never queue behind it
+            if _background.get():
+                while _request_semaphore.locked():
+                    await asyncio.sleep(0.25)
+            await _request_semaphore.acquire(current_session())
+            try:
+                # rate-limit tokens are shared with the other workers (see reporter.coordination)
+                await coordinator.acquire_token()
+            except BaseException:
+                _request_semaphore.release()
+                raise
+        queue_wait = time.perf_counter() - queued_at
+        RATE_LIMIT_WAIT.observe(queue_wait)
+
+        sent_at = time.perf_counter()
+        try:
+            with (
+                tracer.start_as_current_span("upstream", attributes={"reporter.queue_wait_seconds": queue_wait}) as span,
+                UPSTREAM_IN_FLIGHT.track_inprogress(),
+                UPSTREAM_LATENCY.time(),
+            ):
+                response = await send_search(payload)
+                span.set_attribute("http.status_code", response.status_code)
+                span.set_attribute("reporter.bytes", len(response.content))
+        except httpx.HTTPError:
+            UPSTREAM_REQUESTS.labels("error").inc()
+            record_upstream(time.perf_counter() - sent_at, ok=False)
+            raise
+        finally:
+            _request_semaphore.release()
+
+        UPSTREAM_REQUESTS.labels(str(response.status_code)).inc()
+        record_upstream(time.perf_counter() - sent_at, ok=response.is_success)
+        response.raise_for_status()  # Raise an exception for bad status codes
+
+    except httpx.HTTPError as e:
+        raise Exception(f"NIH RePORTER API request failed: {e}")
+
+    UPSTREAM_BYTES.inc(len(response.content))
+    for usage in _usage_counters.get():
+        usage["requests"] += 1
+        usage["bytes"] += len(response.content)
+
+    return response.content
+
+def _read_page(body):
+    """Parse a response body and count it in the enclosing upstream_usage() blocks."""
+    with tracer.start_as_current_span("parse", attributes={"reporter.bytes": len(body)}):
+        page = json.loads(body)
+    for usage in _usage_counters.get():
+        usage["pages"] += 1
+        usage["records"] += len(page.get("results") or [])
+        usage["page_bytes"] += len(body)
+    return page
+
+async def _fetch_shared(key, payload):
+    """
+    Fetch a response, sharing the request with any worker already fetching the same payload.
+
+    Returns:
+        bytes: Raw JSON response body
+    """
+    body, coalesced = await coordinator.single_flight(key, lambda: post_search(payload))
+    if coalesced:
+        CACHE_LOOKUPS.labels("response", "coalesced").inc()
+    return body
+
+async def _refresh_response(key, payload):
+    """Re-fetch a cached response in the background, replacing it on success."""
+    try:
+        with background_priority():
+            _response_cache.set(key, await _fetch_shared(key, payload))
+    except Exception as e:
+        print(f"Background refresh failed: {e}")
+    finally:
+        _refreshing.pop(key, None)
+
+async def search_nih_reporter(payload, use_cache=True):
     """
     Search NIH Reporter API for grant information
+
+    Cached responses are served as-is up to CACHE_FRESH_TTL, and served while being
+    refreshed in the background up to CACHE_REVALIDATE_TTL. If the request fails,
+    a cached response up to CACHE_MAX_STALE_AGE is served instead and counted as
+    stale in the enclosing upstream_usage() blocks.
     
     Args:
         payload (dict): Search criteria
+        use_cache (bool): Whether to serve and store the response in the response cache
     
     Returns:
         dict: API response containing grant data
     """
-    
-    # NIH Reporter API endpoint
-    url = "https://api.reporter.nih.gov/v2/projects/search"
-    
+
+    if not use_cache:
+        return _read_page(await within_deadline(post_search(payload)))
+
+    key = fingerprint(payload)
+    entry = _response_cache.get_entry(key)
+
+    if entry is not None:
+        body, age = entry
+        if age <= CACHE_FRESH_TTL:
+            CACHE_LOOKUPS.labels("response", "hit").inc()
+            return _read_page(body)
+        if age <= CACHE_REVALIDATE_TTL:
+            CACHE_LOOKUPS.labels("response", "revalidate").inc()
+            if key not in _refreshing:
+                # run outside the caller's context so the refresh is not billed to its tool call
+                _refreshing[key] = asyncio.create_task(
+                    _refresh_response(key, payload), context=contextvars.Context()
+                )
+            return _read_page(body)
+
     try:
-        # Run the synchronous requests call in a thread pool
-        response = await asyncio.to_thread(
-            requests.post, 
-            url, 
-            json=payload,
-            headers={'Content-Type': 'application/json'}
-        )
-        response.raise_for_status()  # Raise an exception for bad status codes
-        
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"NIH RePORTER API request failed: {e}")
+        body = await within_deadline(_fetch_shared(key, payload))
+    except Exception as e:
+        if entry is None or entry[1] > CACHE_MAX_STALE_AGE:
+            raise
+        body, age = entry
+        print(f"{e}; serving cached response from {age:.0f}s ago")
+        CACHE_LOOKUPS.labels("response", "stale").inc()
+        for usage in _usage_counters.get():
+            usage["stale"] += 1
+            usage["stale_age_seconds"] = max(usage["stale_age_seconds"], round(age))
+        return _read_page(body)
+
+    CACHE_LOOKUPS.labels("response", "miss").inc()
+    _response_cache.set(key, body)
+    return _read_page(body)
     
-async def paged_query(search_params:SearchParams, include_fields: list[str], limit=100, offset=0, all_results=None):
+def search_payload(search_params: SearchParams, include_fields: list[str], limit=100, offset=0):
+    """
+    Build the request body for one page of a search.
+
+    The response cache and recorded fixtures (see reporter.transport) are keyed by
+    this payload, so every page request should be built here. include_fields are
+    sorted so the same fields in any order share cache entries and fixtures.
+
+    Args:
+        search_params (SearchParams): Search parameters to query.
+        include_fields (list[str]): Fields to return from the API.
+        limit (int): Number of results to return (max 500).
+        offset (int): Offset for pagination.
+
+    Returns:
+        dict: Request body for the search endpoint
+    """
+
+    return {
+        "criteria": search_params.to_api_criteria(),
+        "offset": offset,
+        "limit": limit,
+        "include_fields": sorted(include_fields),
+        "sort_field": "project_start_date",
+        "sort_order": "desc"
+    }
+
+async def paged_query(search_params:SearchParams, include_fields: list[str], limit=100, offset=0, all_results=None, use_cache=True):
     """
     Perform the initial query to get the total number of projects matching the criteria.
+
+    Text searches covered by an indexed download (see reporter.text_index) are
+    answered locally without contacting RePORTER.
     
     Args:
         search_params (SearchParams): Search parameters including years, agencies, organizations, and pi_name.
         limit (int): Number of results to return per request (max 500).
         offset (int): Offset for pagination.
+        use_cache (bool): Whether to use the response cache for this page.
         
     Returns:
         dict: API response containing grant data
     """
     
-    payload = {
-        "criteria": search_params.to_api_criteria(),
-        "offset": offset,
-        "limit": limit,
-        "include_fields": include_fields,
-        "sort_field": "project_start_date",
-        "sort_order": "desc"
-    }
+    local = text_index.lookup(search_params, include_fields) if use_cache else None
+    if local is not None:
+        meta, records, held_fields = local
+        CACHE_LOOKUPS.labels("text_index", "hit").inc()
+        # the index may hold more fields than were asked for; return only those requested
+        drop = {k for f in held_fields - set(include_fields) for k in record_keys(f)}
+        response = {
+            "meta": {**meta, "total": len(records), "offset": offset, "limit": limit},
+            "results": [{k: v for k, v in r.items() if k not in drop} for r in records[offset:offset + limit]],
+        }
+        for usage in _usage_counters.get():
+            usage["pages"] += 1
+            usage["records"] += len(response["results"])
+        if all_results is None:
+            return len(records), response
+        all_results['results'].extend(response['results'])
+        return len(records), all_results
+
+    payload = search_payload(search_params, include_fields, limit, offset)
 
-    response = await search_nih_reporter(payload)
+    with tracer.start_as_current_span("page", attributes={"reporter.offset": offset, "reporter.limit": limit}) as span:
+        response = await search_nih_reporter(payload, use_cache)
 
-    if response is None:
-        raise Exception("NIH RePORTER API request failed - no response received")
+        if response is None:
+            raise Exception("NIH RePORTER API request failed - no response received")
 
-    response = clean_json(response)
+        response = clean_json(response)
+        # pages with abstracts or terms feed find_similar_projects (see reporter.similarity)
+        similarity_index.add(response.get('results', []))
 
-    total_responses = response['meta']['total']
+        total_responses = response['meta']['total']
+        span.set_attribute("reporter.results", len(response.get('results', [])))
+        span.set_attribute("reporter.total", total_responses)
     
     # if initial call, create empty list to collect results
     if all_results is None:
@@ -141,28 +498,164 @@ async def get_initial_response(search_params:SearchParams, include_fields: list[
     offset = 0 
     total_responses, all_results = await paged_query(search_params, include_fields, limit, offset)
 
+    if total_responses <= len(all_results['results']):
+        text_index.add(search_params, include_fields, all_results['meta'], all_results['results'])
+
     return total_responses, all_results
 
-async def get_all_responses(search_params:SearchParams, include_fields: list[str], limit=500):
+async def iter_pages(search_params:SearchParams, include_fields: list[str], limit=PAGE_LIMIT, use_cache=True, allow_partial=False):
+    """
+    Page through all results, yielding one cleaned page at a time.
 
-    offset = 0 
-    total_responses, all_results = await paged_query(search_params, include_fields, limit, offset)
+    Lets callers aggregate large result sets without holding every record in memory.
+
+    Args:
+        search_params (SearchParams): Search parameters to query.
+        include_fields (list[str]): Fields to return from the API.
+        limit (int): Number of results per page (max 500).
+        use_cache (bool): Whether to use the response cache; bulk background jobs
+            turn it off so they do not evict pages users are likely to reuse.
+        allow_partial (bool): If the tool deadline passes after the first page, stop
+            early instead of raising DeadlineExceeded. The pull is counted as partial
+            in the enclosing upstream_usage() blocks, with the pages it covered.
+
+    Yields:
+        tuple: (total number of matching projects, page dict with 'meta' and 'results')
+    """
+
+    if not _background.get():
+        record_query(search_params, include_fields)
+
+    offset = 0
+    total_responses, page = await paged_query(search_params, include_fields, limit, offset, use_cache=use_cache)
+
+    counters = _usage_counters.get()
+    for usage in counters:
+        usage["pull_pages"] += 1
+        usage["pull_pages_total"] += max(1, math.ceil(total_responses / limit))
+
+    # complete downloads small enough to index are kept for local text search
+    indexed = list(page.get('results', [])) if use_cache and text_index.can_index(search_params, include_fields, total_responses) else None
 
     print(f"Total results: {total_responses}")
-    
+    yield total_responses, page
 
     # Loop through remaining pages
     while offset + limit < total_responses:
         offset += limit
         print(f"Fetching results {offset} to {offset + limit}...")
-        
-        total_responses, all_results = await paged_query(search_params, include_fields, limit, offset, all_results)
-    
-    print(f"Retrieved {len(all_results)} total results")
+
+        try:
+            total_responses, page = await paged_query(search_params, include_fields, limit, offset, use_cache=use_cache)
+        except DeadlineExceeded:
+            if not allow_partial:
+                raise
+            print(f"Deadline reached at result {offset} of {total_responses}; returning partial results")
+            for usage in counters:
+                usage["partial"] += 1
+            return
+
+        for usage in counters:
+            usage["pull_pages"] += 1
+        if indexed is not None:
+            indexed.extend(page.get('results', []))
+        yield total_responses, page
+
+    if indexed is not None:
+        text_index.add(search_params, include_fields, page['meta'], indexed)
+
+async def get_all_responses(search_params:SearchParams, include_fields: list[str], limit=PAGE_LIMIT):
+    """
+    Download every matching project.
+
+    Records are held in memory up to an estimated SPILL_BUDGET_MB once parsed; past
+    that, they move to a memory-mapped file (see reporter.spill) and 'results'
+    becomes a SpilledResults, which reads like a list. Pages answered from the
+    text index are not counted, since the index already holds their records.
+
+    Returns:
+        dict: API response with 'meta' and all 'results'
+    """
+
+    budget = SPILL_BUDGET_MB * 1024 * 1024
+
+    all_results = None
+    # page_bytes measures the pages of this pull as they arrive, without re-serializing them
+    with upstream_usage() as usage:
+        async for _, page in iter_pages(search_params, include_fields, limit):
+            results = page.get('results', [])
+            if all_results is None:
+                all_results = page
+            else:
+                all_results['results'].extend(results)
+
+            held_bytes = usage["page_bytes"] * PARSED_SIZE_FACTOR
+            if budget > 0 and not isinstance(all_results['results'], SpilledResults) and held_bytes > budget:
+                all_results['results'] = SpilledResults(all_results['results'])
+                print(f"Spilled {len(all_results['results'])} results to disk (~{held_bytes / 1e6:.1f} MB parsed, over the {SPILL_BUDGET_MB} MB budget)")
+
+    print(f"Retrieved {len(all_results['results'])} total results")
 
     return all_results
 
-def build_crosstab(all_results, row_field, col_field):
+@tracer.start_as_current_span("aggregate.update_crosstab")
+def update_crosstab(crosstab, results, row_field, col_field, percentiles=None, allocation="full"):
+    """
+    Add a batch of results to a crosstab under construction.
+
+    Multi-valued fields (see MULTI_VALUED_FIELDS) are exploded, so a project
+    contributes to one cell per combination of its row and column values.
+
+    Args:
+        crosstab (dict): Crosstab being built, {row: {col: cell}}; updated in place.
+        results (list[dict]): Cleaned API results.
+        row_field (str): Response field key to use as rows.
+        col_field (str): Response field key to use as columns.
+        percentiles (list[float]): If set, track an award amount sketch per cell.
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
+    """
+
+    split = allocation == "split"
+
+    for r in results:
+        if not isinstance(r, dict):
+            continue
+
+        award = r.get("award_amount")
+        for row, row_share in dimension_values(r, row_field):
+            for col, col_share in dimension_values(r, col_field):
+                cell = crosstab.setdefault(row, {}).get(col)
+                if cell is None:
+                    cell = crosstab[row][col] = {"count": 0, "total_funding": 0}
+                    if percentiles:
+                        cell["_sketch"] = KLLSketch()
+
+                cell["count"] += 1
+                cell["total_funding"] += (award or 0) * (row_share * col_share if split else 1)
+                if percentiles and award is not None:
+                    cell["_sketch"].update(award)
+
+@tracer.start_as_current_span("aggregate.finalize_crosstab")
+def finalize_crosstab(crosstab, percentiles=None):
+    """
+    Sort crosstab rows and replace per-cell sketches with award percentiles.
+
+    Args:
+        crosstab (dict): Crosstab built with update_crosstab.
+        percentiles (list[float]): Percentiles to report, if sketches were tracked.
+
+    Returns:
+        dict: Nested dict of {row: {col: {"count": N, "total_funding": X}}}, sorted by row.
+    """
+
+    if percentiles:
+        for cols in crosstab.values():
+            for cell in cols.values():
+                cell["award_percentiles"] = cell.pop("_sketch").percentiles(percentiles)
+
+    return {row: dict(cols) for row, cols in sorted(crosstab.items(), key=lambda x: str(x[0]))}
+
+def build_crosstab(all_results, row_field, col_field, percentiles=None, allocation="full"):
     """
     Build a cross-tabulation of grant counts and total funding by any two project fields.
 
@@ -170,26 +663,312 @@ def build_crosstab(all_results, row_field, col_field):
         all_results (dict): API response containing grant data.
         row_field (str): Response field key to use as rows (e.g. "fiscal_year", "org_state").
         col_field (str): Response field key to use as columns (e.g. "activity_code", "funding_mechanism").
+        percentiles (list[float]): Optional award amount percentiles to report per cell.
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
 
     Returns:
         dict: Nested dict of {row: {col: {"count": N, "total_funding": X}}}, sorted by row.
     """
-    from collections import defaultdict
 
-    crosstab = defaultdict(lambda: defaultdict(lambda: {"count": 0, "total_funding": 0}))
+    crosstab = {}
+    update_crosstab(crosstab, all_results.get("results", []), row_field, col_field, percentiles, allocation)
 
-    for r in all_results.get("results", []):
-        if not isinstance(r, dict):
-            continue
-        row = r.get(row_field)
-        col = r.get(col_field)
-        if row and col:
-            crosstab[row][col]["count"] += 1
-            crosstab[row][col]["total_funding"] += r.get("award_amount") or 0
+    return finalize_crosstab(crosstab, percentiles)
 
-    return {row: dict(cols) for row, cols in sorted(crosstab.items(), key=lambda x: str(x[0]))}
+async def stream_crosstab(crosstab, search_params:SearchParams, include_fields: list[str], row_field, col_field, percentiles=None, allocation="full"):
+    """
+    Page through a query and fold every page into a crosstab, without keeping the records.
+
+    Args:
+        crosstab (dict): Crosstab being built; updated in place.
+        search_params (SearchParams): Search parameters to query.
+        include_fields (list[str]): Fields to return from the API.
+        row_field (str): Response field key to use as rows.
+        col_field (str): Response field key to use as columns.
+        percentiles (list[float]): If set, track an award amount sketch per cell.
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
+    """
+
+    async for _, page in iter_pages(search_params, include_fields, allow_partial=True):
+        update_crosstab(crosstab, page.get("results", []), row_field, col_field, percentiles, allocation)
+
+
+def get_shard_values(search_params: SearchParams, dimension: str):
+    """
+    List the filter values a crosstab dimension can be sharded on.
+
+    Args:
+        search_params (SearchParams): Search parameters scoping the portfolio.
+        dimension (str): Crosstab dimension (a key of DIMENSION_FIELDS).
+
+    Returns:
+        list | None: The caller's filter values, or every listed value of an unfiltered
+            dimension, or None if the dimension cannot be enumerated (e.g. fiscal_year
+            without years). Listed values can miss codes RePORTER uses but the enums
+            do not, so callers check that their shard counts add up to the total.
+    """
+
+    filter_name = SHARD_FILTERS.get(dimension)
+    if filter_name is None:
+        return None
+
+    current = getattr(search_params, filter_name)
+
+    if dimension == "fiscal_year":
+        return list(current) if current else None
+
+    if dimension == "agency_ic_admin":
+        # an explicit agencies filter also matches co-funding ICs, so per-IC
+        # administering shards would not add up to the same portfolio
+        if current and current != [NIHAgency.NIH]:
+            return None
+        return [a for a in NIHAgency if a is not NIHAgency.NIH]
+
+    if current:
+        return list(current)
+
+    enums = {
+        "funding_mechanism": FundingMechanism,
+        "org_state":         StateCode,
+        "award_type":        ApplicationType,
+    }
+    return list(enums[dimension])
+
+
+def shard_params(search_params: SearchParams, dimension: str, value) -> SearchParams:
+    """
+    Restrict search parameters to a single value of a shardable dimension.
+
+    Args:
+        search_params (SearchParams): Search parameters scoping the portfolio.
+        dimension (str): Crosstab dimension (a key of SHARD_FILTERS).
+        value: Filter value returned by get_shard_values.
+
+    Returns:
+        SearchParams: Copy of search_params filtered to the given value.
+    """
+
+    update = {SHARD_FILTERS[dimension]: [value]}
+    if dimension == "agency_ic_admin":
+        update["is_agency_admin"] = True
+
+    return search_params.model_copy(update=update)
 
 
+async def run_parallel(coros):
+    """
+    Run coroutines concurrently and return their results in order, like asyncio.gather.
+
+    Uses a TaskGroup so a cancelled tool call cancels each request once. The MCP
+    server keeps re-cancelling a cancelled call, and gather passes every one of
+    those on, interrupting httpx while it closes the aborted connection.
+
+    Raises:
+        Exception: The first error raised by any coroutine; the others are cancelled.
+    """
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(c) for c in coros]
+    except ExceptionGroup as e:
+        raise e.exceptions[0] from None
+    return [t.result() for t in tasks]
+
+
+async def count_projects(search_params: SearchParams, include_fields: list[str] = None, use_cache=True):
+    """
+    Count matching projects with a single limit=1 query.
+
+    Args:
+        search_params (SearchParams): Search parameters to count.
+        include_fields (list[str]): Fields to return for the single sample record.
+        use_cache (bool): Whether to use the response cache.
+
+    Returns:
+        tuple: (total number of matching projects, sample record or None)
+    """
+
+    include_fields = include_fields or [IncludeField.PROJECT_NUM.value]
+    total, response = await paged_query(search_params, include_fields, limit=1, use_cache=use_cache)
+    results = response.get('results', [])
+
+    return total, (results[0] if results else None)
+
+
+async def count_groups(search_params: SearchParams, group_by: list[str]):
+    """
+    Count projects per combination of group_by values with parallel limit=1 queries.
+
+    Args:
+        search_params (SearchParams): Search parameters scoping the portfolio.
+        group_by (list[str]): Shardable dimensions (keys of SHARD_FILTERS) to group by.
+
+    Returns:
+        list[dict] | None: {dimension: value, ..., "count": N} for each non-empty group,
+            or None if a dimension cannot be enumerated exactly, or counting the groups
+            would take as many round trips as downloading the portfolio.
+    """
+
+    values = [get_shard_values(search_params, d) for d in group_by]
+    if any(v is None for v in values):
+        return None
+
+    n_groups = math.prod(len(v) for v in values)
+    if n_groups > MAX_SHARD_REQUESTS:
+        return None
+
+    total, _ = await count_projects(search_params)
+    if total == 0:
+        return []
+    if math.ceil(n_groups / MAX_CONCURRENT_REQUESTS) >= math.ceil(total / PAGE_LIMIT):
+        return None
+
+    include_fields = list(dict.fromkeys(AGGREGATION_FIELDS[d].value for d in group_by))
+
+    combos = list(product(*values))
+    group_params = []
+    for combo in combos:
+        params = search_params
+        for d, v in zip(group_by, combo):
+            params = shard_params(params, d, v)
+        group_params.append(params)
+
+    counts = await run_parallel(count_projects(p, include_fields) for p in group_params)
+    if sum(n for n, _ in counts) != total:
+        print(f"Group counts for {group_by} do not add up to {total}; counting from a download")
+        return None
+
+    return [
+        {**{d: _shard_label(rec, d, v) for d, v in zip(group_by, combo)}, "count": n}
+        for combo, (n, rec) in zip(combos, counts)
+        if n > 0
+    ]
+
+
+def _counts_only(crosstab):
+    """Drop total_funding from every crosstab cell."""
+    return {row: {col: {"count": cell["count"]} for col, cell in cols.items()} for row, cols in crosstab.items()}
+
+
+def _shard_label(record, dimension, value):
+    """Label a shard with the value the API reports, so labels match a full download."""
+    if record and record.get(dimension):
+        return record[dimension]
+    return value.value if hasattr(value, 'value') else value
+
+
+async def build_sharded_crosstab(search_params: SearchParams, row_field: str, col_field: str, include_funding: bool = True, percentiles=None, allocation="full"):
+    """
+    Build a crosstab from filtered sub-queries when that is cheaper than a full download.
+
+    Cells are counted with parallel limit=1 queries when both dimensions are
+    shardable and funding totals are not needed. Otherwise the portfolio is
+    split on one shardable dimension and the shards are downloaded in parallel.
+    Falls back to a single serial download when neither plan is cheaper.
+
+    Args:
+        search_params (SearchParams): Search parameters to scope the portfolio.
+        row_field (str): Response field key to use as rows.
+        col_field (str): Response field key to use as columns.
+        include_funding (bool): Whether to fetch award amounts for total_funding.
+        percentiles (list[float]): Optional award amount percentiles to report per cell.
+            Requires award amounts, so implies include_funding.
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
+
+    Returns:
+        dict: Nested dict of {row: {col: {"count": N, "total_funding": X}}}, sorted by row.
+            total_funding is omitted when include_funding is False.
+    """
+
+    include_funding = include_funding or bool(percentiles)
+
+    # Deduplicate include fields (org_name and org_state both map to Organization), keeping
+    # a fixed order: payloads are fingerprinted for the cache and recorded fixtures
+    include_fields = list(dict.fromkeys([AGGREGATION_FIELDS[row_field].value, AGGREGATION_FIELDS[col_field].value]))
+    if include_funding:
+        include_fields.append(IncludeField.AWARD_AMOUNT.value)
+
+    async def full_download():
+        crosstab = {}
+        await stream_crosstab(crosstab, search_params, include_fields, row_field, col_field, percentiles, allocation)
+        crosstab = finalize_crosstab(crosstab, percentiles)
+        return crosstab if include_funding else _counts_only(crosstab)
+
+    shard_values = {d: get_shard_values(search_params, d) for d in (row_field, col_field)}
+    # a single-valued dimension would produce one shard equal to the whole portfolio
+    shardable = [d for d in dict.fromkeys((row_field, col_field)) if shard_values[d] and len(shard_values[d]) > 1]
+    if not shardable:
+        return await full_download()
+
+    total, _ = await count_projects(search_params)
+    if total == 0:
+        return {}
+
+    # A serial download costs one round trip per page
+    serial_rounds = math.ceil(total / PAGE_LIMIT)
+
+    # Shard on the dimension with the fewest values
+    outer = min(shardable, key=lambda d: len(shard_values[d]))
+    inner = col_field if outer == row_field else row_field
+    outer_rounds = math.ceil(len(shard_values[outer]) / MAX_CONCURRENT_REQUESTS)
+
+    if serial_rounds <= 1 or outer_rounds >= serial_rounds:
+        return await full_download()
+
+    print(f"Sharding crosstab on {outer} ({len(shard_values[outer])} shards, {total} projects)")
+
+    outer_counts = await run_parallel(
+        count_projects(shard_params(search_params, outer, v), include_fields)
+        for v in shard_values[outer]
+    )
+    # listed values of an unfiltered dimension may miss some projects (e.g. an
+    # application type the enum lacks), so the shards must cover the whole total
+    if sum(n for n, _ in outer_counts) != total:
+        print(f"Shards on {outer} cover {sum(n for n, _ in outer_counts)} of {total} projects; downloading in full")
+        return await full_download()
+    nonempty = [(v, n, rec) for v, (n, rec) in zip(shard_values[outer], outer_counts) if n > 0]
+
+    # Count-only cells: one limit=1 query per (outer, inner) pair
+    inner_values = shard_values[inner] if inner != outer else None
+    if not include_funding and inner_values:
+        n_cells = len(nonempty) * len(inner_values)
+        if n_cells <= MAX_SHARD_REQUESTS and outer_rounds + math.ceil(n_cells / MAX_CONCURRENT_REQUESTS) < serial_rounds:
+            cell_params = [
+                (outer_value, inner_value, shard_params(shard_params(search_params, outer, outer_value), inner, inner_value))
+                for outer_value, _, _ in nonempty
+                for inner_value in inner_values
+            ]
+            cell_counts = await run_parallel(count_projects(p, include_fields) for _, _, p in cell_params)
+            if sum(n for n, _ in cell_counts) != total:
+                print(f"Cells on {inner} cover {sum(n for n, _ in cell_counts)} of {total} projects; downloading in full")
+                return await full_download()
+
+            crosstab = {}
+            for (outer_value, inner_value, _), (n, rec) in zip(cell_params, cell_counts):
+                if n == 0:
+                    continue
+                labels = {outer: _shard_label(rec, outer, outer_value), inner: _shard_label(rec, inner, inner_value)}
+                crosstab.setdefault(labels[row_field], {})[labels[col_field]] = {"count": n}
+
+            return {row: crosstab[row] for row in sorted(crosstab, key=str)}
+
+    # Otherwise download each non-empty shard; shards run in parallel
+    shard_pages = [math.ceil(n / PAGE_LIMIT) for _, n, _ in nonempty]
+    shard_rounds = max(max(shard_pages), math.ceil(sum(shard_pages) / MAX_CONCURRENT_REQUESTS))
+    if outer_rounds + shard_rounds >= serial_rounds:
+        return await full_download()
+
+    crosstab = {}
+    await run_parallel(
+        stream_crosstab(crosstab, shard_params(search_params, outer, v), include_fields, row_field, col_field, percentiles, allocation)
+        for v, _, _ in nonempty
+    )
+
+    crosstab = finalize_crosstab(crosstab, percentiles)
+    return crosstab if include_funding else _counts_only(crosstab)
+
+
+@tracer.start_as_current_span("aggregate.get_project_distributions")
 def get_project_distributions(all_results):
     """
     Calculate distributions of project years, institutes, activity codes,
@@ -295,4 +1074,146 @@ def get_project_distributions(all_results):
         "funding_mechanism_distribution": funding_mech_dist,
         "active_status_distribution": active_dist,
         "award_amount_stats": award_stats
-    }
\ No newline at end of file
+    }
+
+@tracer.start_as_current_span("aggregate.merge_project_distributions")
+def merge_project_distributions(summary, distributions):
+    """
+    Fold the distributions of one page of results into a running summary.
+
+    Args:
+        summary (dict | None): Summary built so far, or None for the first page.
+        distributions (dict): Output of get_project_distributions for one page.
+
+    Returns:
+        dict: Summary with the same keys as get_project_distributions, except that
+            project_ids is replaced by a project_count.
+    """
+
+    counter_keys = [
+        "year_distribution",
+        "institute_distribution",
+        "activity_code_distribution",
+        "organization_distribution",
+        "funding_mechanism_distribution",
+        "active_status_distribution",
+    ]
+
+    if summary is None:
+        summary = {key: Counter() for key in counter_keys}
+        summary["project_count"] = 0
+        summary["award_amount_stats"] = {"total": 0, "average": 0, "min": 0, "max": 0, "count": 0}
+
+    summary["project_count"] += len(distributions["project_ids"])
+    for key in counter_keys:
+        summary[key].update(distributions[key])
+
+    stats = summary["award_amount_stats"]
+    page_stats = distributions["award_amount_stats"]
+    if page_stats["count"]:
+        stats["min"] = min(stats["min"], page_stats["min"]) if stats["count"] else page_stats["min"]
+        stats["max"] = max(stats["max"], page_stats["max"]) if stats["count"] else page_stats["max"]
+        stats["total"] += page_stats["total"]
+        stats["count"] += page_stats["count"]
+        stats["average"] = stats["total"] / stats["count"]
+
+    return summary
+
+
+async def summarize_all_responses(search_params:SearchParams, include_fields: list[str], percentiles=None, histogram=False):
+    """
+    Page through all matching projects and summarize them in bounded memory.
+
+    Each page is reduced to distributions and discarded. Award percentiles come
+    from a streaming KLL sketch and the histogram uses fixed buckets, so memory
+    does not grow with the number of projects.
+
+    Args:
+        search_params (SearchParams): Search parameters to query.
+        include_fields (list[str]): Fields to return from the API.
+        percentiles (list[float]): Optional award amount percentiles (0-100) to estimate.
+        histogram (bool): Whether to add an award amount histogram.
+
+    Returns:
+        dict: Summary from merge_project_distributions. award_amount_stats gains
+            "percentiles" and/or "histogram" when requested.
+    """
+
+    summary = None
+    award_sketch = KLLSketch() if percentiles else None
+    award_histogram = Histogram() if histogram else None
+
+    async for _, page in iter_pages(search_params, include_fields, allow_partial=True):
+        summary = merge_project_distributions(summary, get_project_distributions(page))
+
+        if award_sketch is not None or award_histogram is not None:
+            amounts = [
+                r.get("award_amount")
+                for r in page.get("results", [])
+                if isinstance(r, dict) and r.get("award_amount") is not None
+            ]
+            if award_sketch is not None:
+                award_sketch.update_many(amounts)
+            if award_histogram is not None:
+                award_histogram.update_many(amounts)
+
+    if award_sketch is not None:
+        summary["award_amount_stats"]["percentiles"] = award_sketch.percentiles(percentiles)
+    if award_histogram is not None:
+        summary["award_amount_stats"]["histogram"] = award_histogram.to_dict()
+
+    return summary
+
+
+@tracer.start_as_current_span("aggregate.update_value_distribution")
+def update_value_distribution(distribution, results, field, allocation="full"):
+    """
+    Add a batch of results to a distribution of counts and funding by one field.
+
+    Unlike get_project_distributions this handles multi-valued fields: a
+    project counts once for each of its values.
+
+    Args:
+        distribution (dict): Distribution being built, {value: cell}; updated in place.
+        results (list[dict]): Cleaned API results.
+        field (str): Response field key (a key of AGGREGATION_FIELDS).
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
+    """
+
+    split = allocation == "split"
+
+    for r in results:
+        if not isinstance(r, dict):
+            continue
+        award = r.get("award_amount") or 0
+        for value, share in dimension_values(r, field):
+            cell = distribution.setdefault(value, {"count": 0, "total_funding": 0})
+            cell["count"] += 1
+            cell["total_funding"] += award * share if split else award
+
+
+async def get_value_distribution(search_params:SearchParams, field: str, allocation="full"):
+    """
+    Page through all matching projects and count them by one (possibly multi-valued) field.
+
+    Args:
+        search_params (SearchParams): Search parameters to query.
+        field (str): Response field key (a key of AGGREGATION_FIELDS).
+        allocation (str): "full" or "split" funding attribution for multi-valued fields.
+
+    Returns:
+        tuple: (number of projects, {value: {"count": N, "total_funding": X}})
+    """
+
+    include_fields = list(dict.fromkeys([
+        IncludeField.PROJECT_NUM.value,
+        AGGREGATION_FIELDS[field].value,
+        IncludeField.AWARD_AMOUNT.value,
+    ]))
+
+    distribution = {}
+    total_projects = 0
+    async for total_projects, page in iter_pages(search_params, include_fields, allow_partial=True):
+        update_value_distribution(distribution, page.get("results", []), field, allocation)
+
+    return total_projects, distribution
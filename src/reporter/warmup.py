@@ -0,0 +1,98 @@
+import os
+import asyncio
+from reporter.models import SearchParams, IncludeField
+from reporter.utils import iter_pages, search_nih_reporter, upstream_usage, background_priority, clear_response_cache
+from reporter.workload import top_queries, flush_workload
+
+# Number of hot queries re-run after startup and after each data refresh (0 disables warming).
+WARM_TOP_N = int(os.getenv("REPORTER_WARM_TOP_N", "10"))
+
+# Number of hot queries warmed at the same time.
+WARM_CONCURRENCY = int(os.getenv("REPORTER_WARM_CONCURRENCY", "1"))
+
+# Maximum number of upstream requests one warm-up run may spend.
+WARM_BUDGET = int(os.getenv("REPORTER_WARM_BUDGET", "200"))
+
+# Seconds between checks for a RePORTER data refresh.
+REFRESH_CHECK_INTERVAL = float(os.getenv("REPORTER_REFRESH_CHECK_INTERVAL", "3600"))
+
+
+async def get_data_version():
+    """
+    Probe RePORTER for a value that changes when its weekly data refresh lands.
+
+    Returns:
+        int: Total number of projects in the database.
+    """
+
+    payload = {
+        "criteria": {},
+        "offset": 0,
+        "limit": 1,
+        "include_fields": [IncludeField.PROJECT_NUM.value],
+    }
+    response = await search_nih_reporter(payload, use_cache=False)
+
+    return response['meta']['total']
+
+
+async def warm_cache(top_n: int = WARM_TOP_N, concurrency: int = WARM_CONCURRENCY, budget: int = WARM_BUDGET):
+    """
+    Re-run the most frequent full result-set queries to fill the response cache.
+
+    Runs at background priority and stops once the upstream budget is spent;
+    pages fetched before that point stay cached.
+
+    Args:
+        top_n (int): Number of hot queries to warm.
+        concurrency (int): Number of queries warmed at the same time.
+        budget (int): Maximum number of upstream requests to spend.
+
+    Returns:
+        dict: Upstream usage of the warm-up, {"requests": N, "bytes": N}.
+    """
+
+    queries = top_queries(top_n)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with upstream_usage() as usage, background_priority():
+
+        async def warm(query):
+            async with semaphore:
+                if usage["requests"] >= budget:
+                    return
+                search_params = SearchParams(**query["search_params"])
+                async for _ in iter_pages(search_params, query["include_fields"]):
+                    if usage["requests"] >= budget:
+                        break
+
+        await asyncio.gather(*(warm(q) for q in queries))
+
+    print(f"Warmed {len(queries)} queries with {usage['requests']} upstream requests")
+
+    return usage
+
+
+async def run_cache_warmer():
+    """
+    Warm the cache after startup, then again whenever RePORTER refreshes its data.
+
+    Also flushes this worker's recorded workload at every check.
+    """
+
+    data_version = None
+    while True:
+        try:
+            current_version = await get_data_version()
+            if current_version != data_version:
+                if data_version is not None:
+                    print("RePORTER data refresh detected, clearing response cache")
+                    clear_response_cache()
+                data_version = current_version
+                await warm_cache()
+            else:
+                flush_workload()
+        except Exception as e:
+            print(f"Cache warm-up failed: {e}")
+
+        await asyncio.sleep(REFRESH_CHECK_INTERVAL)
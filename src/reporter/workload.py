@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import fcntl
+import tempfile
+from reporter.cache import fingerprint
+from reporter.models import SearchParams
+
+# Where recorded query counts are persisted, so they survive restarts and are
+# shared by every worker on the instance.
+WORKLOAD_FILE = os.getenv(
+    "REPORTER_WORKLOAD_FILE",
+    os.path.join(tempfile.gettempdir(), "reporter-workload.json"),
+)
+
+# Number of distinct queries kept in the workload file.
+MAX_TRACKED_QUERIES = 500
+
+# Queries not seen for this many days are dropped from the workload.
+WORKLOAD_MAX_AGE_DAYS = 30
+
+# Hits recorded by this process since the last flush, keyed by query fingerprint.
+_pending = {}
+
+
+def query_fingerprint(search_params: SearchParams, include_fields: list[str]) -> str:
+    """
+    Canonical identifier of a full result-set query.
+
+    Args:
+        search_params (SearchParams): Search parameters of the query.
+        include_fields (list[str]): Fields requested from the API.
+
+    Returns:
+        str: Fingerprint that is equal for equivalent queries.
+    """
+
+    return fingerprint(search_params.to_api_criteria(), sorted(include_fields or []))
+
+
+def record_query(search_params: SearchParams, include_fields: list[str]):
+    """
+    Count one execution of a full result-set query.
+
+    Args:
+        search_params (SearchParams): Search parameters of the query.
+        include_fields (list[str]): Fields requested from the API.
+    """
+
+    key = query_fingerprint(search_params, include_fields)
+
+    entry = _pending.get(key)
+    if entry is None:
+        entry = _pending[key] = {
+            "search_params": search_params.model_dump(mode="json", exclude_none=True),
+            # normalized like the fingerprint, so warm-ups replay the same payload in every process
+            "include_fields": sorted(include_fields or []),
+            "hits": 0,
+        }
+
+    entry["hits"] += 1
+    entry["last_seen"] = time.time()
+
+
+def flush_workload():
+    """
+    Merge this process's recorded hits into the shared workload file.
+
+    The file is locked while it is rewritten, so concurrent workers do not lose
+    each other's counts.
+
+    Returns:
+        dict: The merged workload, {fingerprint: entry}.
+    """
+
+    with open(WORKLOAD_FILE, "a+", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            content = f.read()
+            try:
+                workload = json.loads(content) if content else {}
+            except json.JSONDecodeError:
+                workload = {}
+
+            for key, entry in _pending.items():
+                if key in workload:
+                    workload[key]["hits"] += entry["hits"]
+                    workload[key]["last_seen"] = max(workload[key]["last_seen"], entry["last_seen"])
+                else:
+                    workload[key] = entry
+            _pending.clear()
+
+            cutoff = time.time() - WORKLOAD_MAX_AGE_DAYS * 86400
+            hot = sorted(
+                ((k, v) for k, v in workload.items() if v["last_seen"] >= cutoff),
+                key=lambda item: item[1]["hits"],
+                reverse=True,
+            )
+            workload = dict(hot[:MAX_TRACKED_QUERIES])
+
+            f.seek(0)
+            f.truncate()
+            json.dump(workload, f)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    return workload
+
+
+def top_queries(n: int):
+    """
+    Return the n most frequently run queries across all workers.
+
+    Args:
+        n (int): Number of queries to return.
+
+    Returns:
+        list[dict]: Entries with search_params, include_fields, hits and last_seen.
+    """
+
+    workload = flush_workload()
+    return list(workload.values())[:n]
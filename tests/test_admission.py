@@ -0,0 +1,83 @@
+"""
+Anonymous clients take turns for upstream slots: python -m unittest discover tests
+(with src on PYTHONPATH).
+"""
+
+import asyncio
+import unittest
+from contextlib import contextmanager
+from starlette.requests import Request
+from fastmcp.server.http import _current_http_request
+from reporter.admission import FairSlots, session_key, identified
+
+
+@contextmanager
+def http_request(host: str, headers: dict = None):
+    """Run the block as if handling an HTTP request from host with the given headers."""
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/mcp",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": (host, 40000),
+    }
+    token = _current_http_request.set(Request(scope))
+    try:
+        yield
+    finally:
+        _current_http_request.reset(token)
+
+
+class SessionKeyTest(unittest.TestCase):
+    def test_anonymous_clients_are_told_apart_by_address(self):
+        with http_request("10.0.0.1", {"X-Forwarded-For": "198.51.100.7, 10.0.0.1"}):
+            first = session_key()
+        with http_request("10.0.0.1", {"X-Forwarded-For": "203.0.113.9, 10.0.0.1"}):
+            second = session_key()
+
+        self.assertEqual(first, "ip:198.51.100.7")
+        self.assertEqual(second, "ip:203.0.113.9")
+        # an address may be shared, so it orders the queue but is not limited per session
+        self.assertFalse(identified(first))
+
+    def test_client_header_identifies_a_session(self):
+        with http_request("10.0.0.1", {"X-Reporter-Client": "notebook-1"}):
+            key = session_key()
+
+        self.assertEqual(key, "x-reporter-client:notebook-1")
+        self.assertTrue(identified(key))
+
+
+class FairSlotsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_two_anonymous_clients_are_scheduled_separately(self):
+        with http_request("10.0.0.1", {"X-Forwarded-For": "198.51.100.7"}):
+            busy = session_key()
+        with http_request("10.0.0.1", {"X-Forwarded-For": "203.0.113.9"}):
+            quiet = session_key()
+
+        slots = FairSlots(1)
+        await slots.acquire(busy)
+
+        served = []
+
+        async def request(session, n):
+            await slots.acquire(session)
+            served.append((session, n))
+
+        # the busy client queues three requests before the quiet client's one
+        tasks = [asyncio.create_task(request(busy, n)) for n in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request(quiet, 0)))
+        await asyncio.sleep(0)
+
+        for _ in range(4):
+            slots.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(served, [(busy, 0), (quiet, 0), (busy, 1), (busy, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
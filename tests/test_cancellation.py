@@ -0,0 +1,188 @@
+"""
+Cancelling a tool call stops its upstream work.
+
+Runs against an in-process stand-in for RePORTER that answers the first page
+of every search and never answers later pages: python -m unittest discover tests
+(with src on PYTHONPATH).
+"""
+
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+# background work would also reach the stand-in; must be set before importing reporter
+os.environ.setdefault("REPORTER_WARM_TOP_N", "0")
+os.environ.setdefault("REPORTER_BASELINE_ENABLED", "0")
+os.environ.setdefault("REPORTER_WORKLOAD_FILE", os.path.join(tempfile.gettempdir(), "reporter-test-workload.json"))
+
+from fastmcp import Client
+from fastmcp.server.middleware import Middleware
+from reporter import transport
+from reporter.app import mcp
+from reporter.cube import _portfolio_cache
+from reporter.utils import clear_response_cache
+
+# Matching projects per fiscal year in the stand-in.
+PROJECTS_PER_YEAR = 2000
+
+
+class StalledUpstream:
+    """
+    A RePORTER stand-in that answers limit=1 counts and first pages, and never
+    answers a later page.
+
+    Every fiscal year in the criteria matches PROJECTS_PER_YEAR projects.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.stalled = 0
+        self.closed = 0
+        self.stall = asyncio.Event()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v2/projects/search"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def answer(self, payload: dict) -> dict:
+        years = payload["criteria"].get("fiscal_years") or [2023]
+        total = PROJECTS_PER_YEAR * len(years)
+        count = max(0, min(payload["limit"], total - payload["offset"]))
+        return {
+            "meta": {"total": total, "offset": payload["offset"], "limit": payload["limit"]},
+            "results": [
+                {
+                    "project_num": f"5R01CA{payload['offset'] + i:06d}-01",
+                    "fiscal_year": years[(payload["offset"] + i) % len(years)],
+                    "funding_mechanism": "Non-SBIR/STTR",
+                    "agency_ic_admin": {"abbreviation": "NCI"},
+                    "activity_code": "R01",
+                    "award_amount": 100000,
+                }
+                for i in range(count)
+            ],
+        }
+
+    async def handle(self, reader, writer):
+        # httpx keeps connections alive, so serve requests until the client hangs up
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = next(
+                    int(line.split(b":", 1)[1])
+                    for line in head.split(b"\r\n")
+                    if line.lower().startswith(b"content-length:")
+                )
+                payload = json.loads(await reader.readexactly(length))
+                self.requests.append(payload)
+
+                if payload["offset"] > 0:
+                    self.stalled += 1
+                    self.stall.set()
+                    # returns at end of stream, once the client closes the connection
+                    await reader.read()
+                    break
+
+                body = json.dumps(self.answer(payload)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.closed += 1
+            writer.close()
+
+
+class RequestIds(Middleware):
+    """
+    Records the MCP request id of each tool call.
+
+    The server context reports ids as strings; the client numbers its requests.
+    """
+
+    def __init__(self):
+        self.ids = []
+
+    async def on_call_tool(self, context, call_next):
+        self.ids.append(int(context.fastmcp_context.request_id))
+        return await call_next(context)
+
+
+class CancellationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.upstream = StalledUpstream()
+        self.api_url = transport.API_URL
+        transport.API_URL = await self.upstream.start()
+        self.request_ids = RequestIds()
+        mcp.add_middleware(self.request_ids)
+        clear_response_cache()
+        _portfolio_cache.clear()
+
+    async def asyncTearDown(self):
+        mcp.middleware.remove(self.request_ids)
+        await transport.close_http_client()
+        transport.API_URL = self.api_url
+        await self.upstream.stop()
+
+    async def cancel_when_stalled(self, tool: str, arguments: dict, stalled: int):
+        """
+        Start a tool call, cancel it once `stalled` page requests hang, and check
+        that their connections close and nothing more is requested.
+        """
+
+        async with Client(mcp) as client:
+            call = asyncio.create_task(client.call_tool(tool, arguments))
+            while self.upstream.stalled < stalled:
+                await asyncio.wait_for(self.upstream.stall.wait(), timeout=10)
+                self.upstream.stall.clear()
+
+            sent = len(self.upstream.requests)
+            # what an MCP client sends when its user stops a call
+            await client.cancel(self.request_ids.ids[-1], reason="stopped by user")
+
+            # well within UPSTREAM_TIMEOUT, so the requests were aborted rather than timed out
+            for _ in range(50):
+                if self.upstream.closed >= stalled:
+                    break
+                await asyncio.sleep(0.1)
+            self.assertGreaterEqual(self.upstream.closed, stalled)
+
+            # anything still queued would have been sent by now
+            await asyncio.sleep(0.5)
+            self.assertEqual(len(self.upstream.requests), sent)
+
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+
+    async def test_cancelled_paged_pull_requests_no_more_pages(self):
+        # 2000 projects in pages of 500: the first page is answered, the second hangs
+        await self.cancel_when_stalled("get_search_summary", {"search_params": {"years": [2023]}}, stalled=1)
+
+        self.assertEqual([p["offset"] for p in self.upstream.requests], [0, 500])
+
+    async def test_cancelled_sharded_crosstab_requests_no_more_shards(self):
+        # 6000 projects, sharded by year: each shard's second page hangs
+        arguments = {
+            "search_params": {"years": [2022, 2023, 2024]},
+            "row_field": "fiscal_year",
+            "col_field": "funding_mechanism",
+        }
+        await self.cancel_when_stalled("get_portfolio_crosstab", arguments, stalled=3)
+
+        pages = [p for p in self.upstream.requests if p["limit"] > 1]
+        self.assertEqual(sorted(p["offset"] for p in pages), [0, 0, 0, 500, 500, 500])
+
+
+if __name__ == "__main__":
+    unittest.main()